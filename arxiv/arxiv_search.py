@@ -4,13 +4,22 @@ Enhanced ArXiv Search with deduplication and category filtering
 Focuses on quantum physics and quantum computing papers
 """
 
-import urllib.request
 import urllib.parse
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Iterator, IO, Tuple
 from datetime import datetime
 import hashlib
 import json
+import re
+
+from http_client import HTTPClient, get_http_client
+
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+OPENSEARCH_NS = '{http://a9.com/-/spec/opensearch/1.1/}'
 
 
 class ArxivSearcher:
@@ -26,9 +35,22 @@ class ArxivSearcher:
         'physics.atom-ph',    # Atomic Physics
     ]
 
-    def __init__(self):
+    def __init__(self, http_client: Optional[HTTPClient] = None):
+        """
+        Initialize searcher
+
+        Args:
+            http_client: HTTP client to use (default: shared rate-limited client)
+        """
         self.seen_papers: Set[str] = set()  # Track arxiv_ids
         self.base_url = "http://export.arxiv.org/api/query?"
+        self.http_client = http_client or get_http_client()
+
+    def _fetch(self, params: Dict) -> bytes:
+        """Fetch an API response body through the shared transport"""
+        response = self.http_client.get(self.base_url + urllib.parse.urlencode(params))
+        response.raise_for_status()
+        return response.content
 
     def _generate_paper_hash(self, paper: Dict) -> str:
         """Generate unique hash for a paper based on arxiv_id"""
@@ -58,6 +80,128 @@ class ArxivSearcher:
         text = (paper.get('title', '') + ' ' + paper.get('abstract', '')).lower()
         return any(keyword in text for keyword in quantum_keywords)
 
+    def _build_search_query(self, keywords: Optional[str], category: Optional[str]) -> str:
+        """Build the API search_query expression"""
+        if category and keywords:
+            return f'cat:{category} AND all:{keywords}'
+        elif category:
+            return f'cat:{category}'
+        elif keywords:
+            return f'all:{keywords}'
+        return 'cat:quant-ph'  # Default to quantum physics
+
+    def iter_search(self,
+                    keywords: Optional[str] = None,
+                    category: Optional[str] = None,
+                    max_results: Optional[int] = 50,
+                    filter_quantum: bool = True,
+                    page_size: int = 200,
+                    deduplicate: bool = True,
+                    since: Optional[str] = None,
+                    since_id: Optional[str] = None,
+                    feed_state: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Lazily page through ArXiv search results, newest first
+
+        Each page is requested with a ``start`` offset and stream-parsed,
+        so memory stays bounded by a single entry regardless of how many
+        results are harvested.
+
+        Args:
+            keywords: Search terms (optional if category is specified)
+            category: ArXiv category (e.g., 'quant-ph')
+            max_results: Maximum number of entries to fetch (None for all)
+            filter_quantum: Only yield quantum-related papers
+            page_size: Entries requested per API call (arXiv allows up to 2000)
+            deduplicate: Skip (and record) papers already in seen_papers
+            since: Stop at the first entry published before this timestamp
+                (entries published exactly at it are still yielded)
+            since_id: ArXiv ID of the entry that set since; together they
+                form a (published, arxiv_id) watermark, and entries published
+                exactly at since are only yielded if their ID sorts above it
+            feed_state: Optional dict that receives 'newest_published' and
+                'newest_arxiv_id' of the newest entry seen (before any
+                filtering; the highest ID among ties), and 'error' if
+                fetching stopped on a failure
+
+        Yields:
+            Unique paper dictionaries
+        """
+        search_query = self._build_search_query(keywords, category)
+        start = 0
+        if feed_state is None:
+            feed_state = {}
+        newest = None
+        watermark = (since, _VERSION_SUFFIX.sub('', since_id)) if since and since_id else None
+
+        while max_results is None or start < max_results:
+            batch_size = page_size if max_results is None else min(page_size, max_results - start)
+            params = {
+                'search_query': search_query,
+                'start': start,
+                'max_results': batch_size,
+                'sortBy': 'submittedDate',
+                'sortOrder': 'descending'
+            }
+
+            try:
+                response = self.http_client.get(
+                    self.base_url + urllib.parse.urlencode(params), stream=True
+                )
+                response.raise_for_status()
+            except Exception as e:
+                print(f"Error fetching from ArXiv: {e}")
+                feed_state['error'] = str(e)
+                return
+
+            page_entries = 0
+            feed_info = {}
+            with response:
+                response.raw.decode_content = True
+                try:
+                    for paper in self._iter_parse_entries(response.raw, feed_info):
+                        page_entries += 1
+
+                        # Among entries tied on the newest timestamp, keep the
+                        # highest ID so the next run's watermark covers them all
+                        base_id = _VERSION_SUFFIX.sub('', paper['arxiv_id'])
+                        if newest is None or (paper['published'], base_id) > newest:
+                            newest = (paper['published'], base_id)
+                            feed_state['newest_published'] = paper['published']
+                            feed_state['newest_arxiv_id'] = paper['arxiv_id']
+
+                        # Results are sorted by submission date, so everything
+                        # after this point was fetched by an earlier run
+                        if since and paper['published'] < since:
+                            return
+                        # The watermark entry, and entries tied with it that
+                        # sort below it, were fetched by that run too
+                        if watermark and (paper['published'], base_id) <= watermark:
+                            continue
+
+                        paper_id = self._generate_paper_hash(paper)
+
+                        # Skip if already seen
+                        if deduplicate and paper_id in self.seen_papers:
+                            continue
+
+                        # Skip if not quantum-related (when filter is enabled)
+                        if filter_quantum and not self._is_quantum_related(paper):
+                            continue
+
+                        if deduplicate:
+                            self.seen_papers.add(paper_id)
+                        yield paper
+                except ET.ParseError as e:
+                    print(f"Error parsing ArXiv response at offset {start}: {e}")
+                    feed_state['error'] = str(e)
+                    return
+
+            start += page_entries
+            total_results = feed_info.get('total_results')
+            if page_entries < batch_size or (total_results is not None and start >= total_results):
+                return
+
     def search(self,
                keywords: Optional[str] = None,
                category: Optional[str] = None,
@@ -75,53 +219,43 @@ class ArxivSearcher:
         Returns:
             List of unique paper dictionaries
         """
-        # Build search query
-        if category and keywords:
-            search_query = f'cat:{category} AND all:{keywords}'
-        elif category:
-            search_query = f'cat:{category}'
-        elif keywords:
-            search_query = f'all:{keywords}'
-        else:
-            search_query = 'cat:quant-ph'  # Default to quantum physics
-
-        params = {
-            'search_query': search_query,
-            'start': 0,
-            'max_results': max_results,
-            'sortBy': 'submittedDate',
-            'sortOrder': 'descending'
-        }
-
-        url = self.base_url + urllib.parse.urlencode(params)
-
-        try:
-            with urllib.request.urlopen(url) as response:
-                xml_data = response.read()
-        except Exception as e:
-            print(f"Error fetching from ArXiv: {e}")
-            return []
-
-        # Parse XML
-        papers = self._parse_arxiv_response(xml_data)
-
-        # Filter and deduplicate
-        unique_papers = []
-        for paper in papers:
-            paper_id = self._generate_paper_hash(paper)
+        return list(self.iter_search(
+            keywords=keywords,
+            category=category,
+            max_results=max_results,
+            filter_quantum=filter_quantum,
+            page_size=max(1, min(max_results, 2000))
+        ))
+
+    def _iter_parse_entries(self, stream: IO[bytes], feed_info: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Stream-parse entries from an ArXiv Atom feed
 
-            # Skip if already seen
-            if paper_id in self.seen_papers:
-                continue
+        Args:
+            stream: File-like object with the XML response
+            feed_info: Optional dict that receives feed metadata ('total_results')
 
-            # Skip if not quantum-related (when filter is enabled)
-            if filter_quantum and not self._is_quantum_related(paper):
+        Yields:
+            Paper dictionaries
+        """
+        root = None
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
                 continue
 
-            self.seen_papers.add(paper_id)
-            unique_papers.append(paper)
-
-        return unique_papers
+            if elem.tag == OPENSEARCH_NS + 'totalResults' and feed_info is not None:
+                try:
+                    feed_info['total_results'] = int(elem.text)
+                except (TypeError, ValueError):
+                    pass
+            elif elem.tag == ATOM_NS + 'entry':
+                paper = self._parse_entry(elem)
+                # Drop the parsed entry so the tree never grows
+                root.clear()
+                if paper is not None:
+                    yield paper
 
     def _parse_arxiv_response(self, xml_data: bytes) -> List[Dict]:
         """Parse ArXiv XML response"""
@@ -130,75 +264,160 @@ class ArxivSearcher:
 
         papers = []
         for entry in root.findall('atom:entry', ns):
-            try:
-                # Extract basic information
-                title = entry.find('atom:title', ns)
-                summary = entry.find('atom:summary', ns)
-                id_elem = entry.find('atom:id', ns)
-                published = entry.find('atom:published', ns)
-                updated = entry.find('atom:updated', ns)
-
-                # Get authors
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.find('atom:name', ns)
-                    if name is not None:
-                        authors.append(name.text)
-
-                # Get categories
-                categories = []
-                for category in entry.findall('atom:category', ns):
-                    term = category.get('term')
-                    if term:
-                        categories.append(term)
-
-                # Get arXiv ID
-                arxiv_id = id_elem.text.split('/abs/')[-1] if id_elem is not None else 'N/A'
-
-                # Create paper dictionary
-                paper = {
-                    'arxiv_id': arxiv_id,
-                    'title': title.text.strip().replace('\n', ' ') if title is not None else 'N/A',
-                    'abstract': summary.text.strip().replace('\n', ' ') if summary is not None else 'N/A',
-                    'authors': authors,
-                    'categories': categories,
-                    'published': published.text if published is not None else 'N/A',
-                    'updated': updated.text if updated is not None else 'N/A',
-                    'pdf_link': f'https://arxiv.org/pdf/{arxiv_id}.pdf',
-                    'abstract_link': f'https://arxiv.org/abs/{arxiv_id}',
-                    'fetched_at': datetime.now().isoformat()
-                }
+            paper = self._parse_entry(entry)
+            if paper is not None:
                 papers.append(paper)
+
+        return papers
+
+    def _parse_entry(self, entry: ET.Element) -> Optional[Dict]:
+        """Parse a single Atom entry into a paper dictionary"""
+        ns = {'atom': 'http://www.w3.org/2005/Atom'}
+        try:
+            # Extract basic information
+            title = entry.find('atom:title', ns)
+            summary = entry.find('atom:summary', ns)
+            id_elem = entry.find('atom:id', ns)
+            published = entry.find('atom:published', ns)
+            updated = entry.find('atom:updated', ns)
+
+            # Get authors
+            authors = []
+            for author in entry.findall('atom:author', ns):
+                name = author.find('atom:name', ns)
+                if name is not None:
+                    authors.append(name.text)
+
+            # Get categories
+            categories = []
+            for category in entry.findall('atom:category', ns):
+                term = category.get('term')
+                if term:
+                    categories.append(term)
+
+            # Get arXiv ID
+            arxiv_id = id_elem.text.split('/abs/')[-1] if id_elem is not None else 'N/A'
+
+            # Create paper dictionary
+            return {
+                'arxiv_id': arxiv_id,
+                'title': title.text.strip().replace('\n', ' ') if title is not None else 'N/A',
+                'abstract': summary.text.strip().replace('\n', ' ') if summary is not None else 'N/A',
+                'authors': authors,
+                'categories': categories,
+                'published': published.text if published is not None else 'N/A',
+                'updated': updated.text if updated is not None else 'N/A',
+                'pdf_link': f'https://arxiv.org/pdf/{arxiv_id}.pdf',
+                'abstract_link': f'https://arxiv.org/abs/{arxiv_id}',
+                'fetched_at': datetime.now().isoformat()
+            }
+        except Exception as e:
+            print(f"Error parsing entry: {e}")
+            return None
+
+    def search_concurrent(self,
+                          queries: List[Dict],
+                          max_results_per_query: int = 50,
+                          filter_quantum: bool = True,
+                          max_workers: int = 4,
+                          mark_seen: bool = True) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Run several searches in parallel and merge their results
+
+        Workers share the HTTP client's per-host rate limiter, so the API
+        is still called at a polite global rate; the parallelism overlaps
+        response latency and parsing. Results are deduplicated centrally
+        after all queries finish.
+
+        Args:
+            queries: Search parameters, e.g. [{'category': 'quant-ph'}, {'keywords': 'qaoa'}].
+                A query may also set 'since' and 'since_id' (see iter_search)
+                and its own 'max_results' (None for no limit).
+            max_results_per_query: Max results per query
+            filter_quantum: Only return quantum-related papers
+            max_workers: Queries in flight at once
+            mark_seen: Record returned papers in seen_papers. Pass False when
+                the results may fail to be stored, and call mark_seen() once
+                they are, so a retry does not skip them as already seen.
+
+        Returns:
+            Tuple of (unique papers across all queries, per-query report
+            dictionaries with 'query', 'found', 'new', 'error' and 'newest'
+            - the (published, arxiv_id) of the newest entry fetched)
+        """
+        def run(query: Dict) -> Tuple[List[Dict], Dict]:
+            feed_state = {}
+            max_results = query.get('max_results', max_results_per_query)
+            papers = list(self.iter_search(
+                keywords=query.get('keywords'),
+                category=query.get('category'),
+                max_results=max_results,
+                filter_quantum=filter_quantum,
+                page_size=max(1, min(max_results or 200, 2000)),
+                deduplicate=False,
+                since=query.get('since'),
+                since_id=query.get('since_id'),
+                feed_state=feed_state
+            ))
+            return papers, feed_state
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(run, query) for query in queries]
+
+        unique_papers = []
+        merged_ids = set()
+        reports = []
+        for query, future in zip(queries, futures):
+            report = {'query': query, 'found': 0, 'new': 0, 'error': None, 'newest': None}
+            try:
+                papers, feed_state = future.result()
             except Exception as e:
-                print(f"Error parsing entry: {e}")
+                report['error'] = str(e)
+                reports.append(report)
                 continue
 
-        return papers
+            report['error'] = feed_state.get('error')
+            if 'newest_published' in feed_state:
+                report['newest'] = (feed_state['newest_published'], feed_state['newest_arxiv_id'])
+            report['found'] = len(papers)
+            for paper in papers:
+                paper_id = self._generate_paper_hash(paper)
+                if paper_id in self.seen_papers or paper_id in merged_ids:
+                    continue
+                merged_ids.add(paper_id)
+                unique_papers.append(paper)
+                report['new'] += 1
+            reports.append(report)
+
+        if mark_seen:
+            self.seen_papers.update(merged_ids)
+        return unique_papers, reports
+
+    def mark_seen(self, papers: List[Dict]):
+        """Record papers in the deduplication cache"""
+        self.seen_papers.update(self._generate_paper_hash(paper) for paper in papers)
 
     def search_multiple_categories(self,
                                    keywords: Optional[str] = None,
-                                   max_results_per_category: int = 20) -> List[Dict]:
+                                   max_results_per_category: int = 20,
+                                   max_workers: int = 4) -> List[Dict]:
         """
         Search across all quantum-related categories
 
         Args:
             keywords: Optional search keywords
             max_results_per_category: Max results per category
+            max_workers: Category searches in flight at once
 
         Returns:
             Combined list of unique papers across all categories
         """
-        all_papers = []
-
-        for category in self.QUANTUM_CATEGORIES:
-            papers = self.search(
-                keywords=keywords,
-                category=category,
-                max_results=max_results_per_category,
-                filter_quantum=True
-            )
-            all_papers.extend(papers)
-
+        all_papers, _ = self.search_concurrent(
+            [{'keywords': keywords, 'category': category} for category in self.QUANTUM_CATEGORIES],
+            max_results_per_query=max_results_per_category,
+            filter_quantum=True,
+            max_workers=max_workers
+        )
         return all_papers
 
     def get_paper_by_id(self, arxiv_id: str) -> Optional[Dict]:
@@ -207,11 +426,8 @@ class ArxivSearcher:
             'id_list': arxiv_id,
             'max_results': 1
         }
-        url = self.base_url + urllib.parse.urlencode(params)
-
         try:
-            with urllib.request.urlopen(url) as response:
-                xml_data = response.read()
+            xml_data = self._fetch(params)
         except Exception as e:
             print(f"Error fetching paper {arxiv_id}: {e}")
             return None
@@ -219,6 +435,10 @@ class ArxivSearcher:
         papers = self._parse_arxiv_response(xml_data)
         return papers[0] if papers else None
 
+    def query_key(self, keywords: Optional[str] = None, category: Optional[str] = None) -> str:
+        """Stable identifier for a search, used to store its harvest cursor"""
+        return self._build_search_query(keywords, category)
+
     def reset_seen_papers(self):
         """Clear the deduplication cache"""
         self.seen_papers.clear()
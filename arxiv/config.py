@@ -23,9 +23,28 @@ class Config:
     SUMMARY_API_KEY = os.getenv("SUMMARY_API_KEY", "")
     SUMMARY_BASE_URL = os.getenv("SUMMARY_BASE_URL", "https://api.example.com/v1")
     SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "openai/gpt-oss-20b")
+    # One JSON call for methodology + contributions (falls back to separate calls)
+    STRUCTURED_SUMMARIES = os.getenv("STRUCTURED_SUMMARIES", "True").lower() == "true"
+    # Long papers are split into chunks of this many tokens and summarized in parallel
+    SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+    SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+    # Relevance checks pack this many papers (within a token budget) into one request
+    RELEVANCE_BATCH_SIZE = int(os.getenv("RELEVANCE_BATCH_SIZE", "20"))
+    RELEVANCE_BATCH_TOKENS = int(os.getenv("RELEVANCE_BATCH_TOKENS", "6000"))
+    # Local classifier trained with 'classifier train'; papers it scores at or above
+    # RELEVANCE_ACCEPT or at or below RELEVANCE_REJECT skip the LLM check
+    RELEVANCE_MODEL_PATH = os.getenv("RELEVANCE_MODEL_PATH", "relevance_model.npz")
+    RELEVANCE_ACCEPT = float(os.getenv("RELEVANCE_ACCEPT", "0.9"))
+    RELEVANCE_REJECT = float(os.getenv("RELEVANCE_REJECT", "0.1"))
 
     # Database Settings
     DATABASE_PATH = os.getenv("DATABASE_PATH", "arxiv_papers.db")
+    DATABASE_BUSY_TIMEOUT = float(os.getenv("DATABASE_BUSY_TIMEOUT", "30"))
+    DATABASE_CACHE_SIZE_MB = int(os.getenv("DATABASE_CACHE_SIZE_MB", "64"))
+    DATABASE_MMAP_SIZE_MB = int(os.getenv("DATABASE_MMAP_SIZE_MB", "256"))
+    DATABASE_FETCH_SIZE = int(os.getenv("DATABASE_FETCH_SIZE", "500"))
+    FULL_TEXT_CODEC = os.getenv("FULL_TEXT_CODEC", "auto")  # auto, zstd, lzma or zlib
+    MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
 
     # Output Settings
     MARKDOWN_OUTPUT_DIR = os.getenv("MARKDOWN_OUTPUT_DIR", "papers_output")
@@ -33,10 +52,41 @@ class Config:
     # Processing Settings
     DEFAULT_MAX_PAGES = int(os.getenv("DEFAULT_MAX_PAGES", "20"))
     DEFAULT_OCR_DPI = int(os.getenv("DEFAULT_OCR_DPI", "200"))
+    OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "4"))
+    USE_TEXT_LAYER = os.getenv("USE_TEXT_LAYER", "True").lower() == "true"
+    TEXT_LAYER_MIN_QUALITY = float(os.getenv("TEXT_LAYER_MIN_QUALITY", "0.6"))
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "1800"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "300"))
+
+    # OCR Cache Settings (empty OCR_CACHE_DIR disables the cache)
+    OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", ".ocr_cache")
+    OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "512"))
+
+    # LLM Response Cache Settings (empty LLM_CACHE_DIR disables the cache)
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+    LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "720"))
+    # Also cache requests with temperature > 0 (their answers vary between calls)
+    LLM_CACHE_SAMPLED = os.getenv("LLM_CACHE_SAMPLED", "True").lower() == "true"
+
+    # PDF Store Settings (empty PDF_STORE_DIR downloads to temp files instead)
+    PDF_STORE_DIR = os.getenv("PDF_STORE_DIR", "pdf_store")
+    PDF_STORE_QUOTA_MB = int(os.getenv("PDF_STORE_QUOTA_MB", "5120"))
+
+    # Network Settings (arXiv asks for at most one API request every 3 seconds)
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "5"))
+    ARXIV_API_DELAY = float(os.getenv("ARXIV_API_DELAY", "3.0"))
+    ARXIV_PDF_DELAY = float(os.getenv("ARXIV_PDF_DELAY", "1.0"))
+
+    # OAI-PMH Harvest Settings
+    OAI_BASE_URL = os.getenv("OAI_BASE_URL", "https://oaipmh.arxiv.org/oai")
 
     # Search Settings
     DEFAULT_MAX_RESULTS = int(os.getenv("DEFAULT_MAX_RESULTS", "50"))
     FILTER_QUANTUM_ONLY = os.getenv("FILTER_QUANTUM_ONLY", "True").lower() == "true"
+    SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "4"))
 
     @classmethod
     def validate(cls) -> list:
@@ -74,13 +124,34 @@ class Config:
         print()
         print(f"Summary Model: {cls.SUMMARY_MODEL}")
         print(f"Summary Base URL: {cls.SUMMARY_BASE_URL}")
+        print(f"Structured Summaries: {cls.STRUCTURED_SUMMARIES}")
+        print(f"Summary Chunk Size: {cls.SUMMARY_CHUNK_TOKENS} tokens ({cls.SUMMARY_CONCURRENCY} concurrent)")
+        print(f"Relevance Batch: {cls.RELEVANCE_BATCH_SIZE} papers / {cls.RELEVANCE_BATCH_TOKENS} tokens")
+        print(f"Relevance Classifier: {cls.RELEVANCE_MODEL_PATH or 'disabled'} "
+              f"(accept >= {cls.RELEVANCE_ACCEPT:g}, reject <= {cls.RELEVANCE_REJECT:g})")
         print(f"Summary API Key: {'*' * 10 if cls.SUMMARY_API_KEY else 'NOT SET'}")
         print()
         print(f"Database Path: {cls.DATABASE_PATH}")
+        print(f"Database Busy Timeout: {cls.DATABASE_BUSY_TIMEOUT}s")
+        print(f"Database Cache Size: {cls.DATABASE_CACHE_SIZE_MB} MB")
+        print(f"Database mmap Size: {cls.DATABASE_MMAP_SIZE_MB} MB")
+        print(f"Database Fetch Size: {cls.DATABASE_FETCH_SIZE}")
+        print(f"Full Text Codec: {cls.FULL_TEXT_CODEC}")
+        print(f"Migration Batch Size: {cls.MIGRATION_BATCH_SIZE}")
         print(f"Markdown Output Dir: {cls.MARKDOWN_OUTPUT_DIR}")
         print()
         print(f"Default Max Pages: {cls.DEFAULT_MAX_PAGES}")
         print(f"Default OCR DPI: {cls.DEFAULT_OCR_DPI}")
+        print(f"OCR Concurrency: {cls.OCR_CONCURRENCY}")
+        print(f"Job Lease: {cls.JOB_LEASE_SECONDS}s, Max Attempts: {cls.JOB_MAX_ATTEMPTS}, "
+              f"Retry Delay: {cls.JOB_RETRY_DELAY}s")
+        print(f"Use Text Layer: {cls.USE_TEXT_LAYER} (min quality {cls.TEXT_LAYER_MIN_QUALITY})")
+        print(f"OCR Cache: {cls.OCR_CACHE_DIR or 'disabled'} (max {cls.OCR_CACHE_MAX_MB} MB)")
+        print(f"LLM Cache: {cls.LLM_CACHE_DIR or 'disabled'} (max {cls.LLM_CACHE_MAX_MB} MB, "
+              f"TTL {cls.LLM_CACHE_TTL_HOURS:g} h, sampled requests {'cached' if cls.LLM_CACHE_SAMPLED else 'not cached'})")
+        print(f"PDF Store: {cls.PDF_STORE_DIR or 'disabled'} (quota {cls.PDF_STORE_QUOTA_MB} MB)")
+        print(f"ArXiv API Delay: {cls.ARXIV_API_DELAY}s (retries: {cls.HTTP_MAX_RETRIES})")
         print(f"Default Max Results: {cls.DEFAULT_MAX_RESULTS}")
         print(f"Filter Quantum Only: {cls.FILTER_QUANTUM_ONLY}")
+        print(f"Search Concurrency: {cls.SEARCH_CONCURRENCY}")
         print("=" * 60)
@@ -19,9 +19,14 @@ from pathlib import Path
 from config import Config
 from arxiv_search import ArxivSearcher
 from pdf_ocr import PDFOCRProcessor
+from ocr_cache import OCRCache
+from llm_cache import LLMCache
+from pdf_store import PDFStore
 from summarizer import PaperSummarizer
 from database import PaperDatabase
 from markdown_exporter import MarkdownExporter
+from paper_processor import PaperProcessor, NOT_RELEVANT_SUMMARY
+from relevance_classifier import RelevanceClassifier
 
 
 class ArxivCrawler:
@@ -47,23 +52,70 @@ class ArxivCrawler:
         # Initialize components
         print("Initializing crawler components...")
         self.searcher = ArxivSearcher()
-        self.database = PaperDatabase(self.config.DATABASE_PATH)
+        self.database = PaperDatabase(
+            self.config.DATABASE_PATH,
+            busy_timeout=self.config.DATABASE_BUSY_TIMEOUT,
+            cache_size_mb=self.config.DATABASE_CACHE_SIZE_MB,
+            mmap_size_mb=self.config.DATABASE_MMAP_SIZE_MB,
+            text_codec=self.config.FULL_TEXT_CODEC,
+            fetch_size=self.config.DATABASE_FETCH_SIZE,
+            migration_batch_size=self.config.MIGRATION_BATCH_SIZE
+        )
         self.exporter = MarkdownExporter(self.config.MARKDOWN_OUTPUT_DIR)
 
         # Initialize OCR and summarizer if keys are available
         self.ocr_processor = None
         self.summarizer = None
+        self.processor = None
 
         if self.config.OCR_API_KEY and self.config.SUMMARY_API_KEY:
             self.ocr_processor = PDFOCRProcessor(
                 api_key=self.config.OCR_API_KEY,
                 base_url=self.config.OCR_BASE_URL,
-                model_name=self.config.OCR_MODEL
+                model_name=self.config.OCR_MODEL,
+                max_concurrency=self.config.OCR_CONCURRENCY,
+                use_text_layer=self.config.USE_TEXT_LAYER,
+                text_layer_min_quality=self.config.TEXT_LAYER_MIN_QUALITY,
+                cache=OCRCache(
+                    self.config.OCR_CACHE_DIR, self.config.OCR_CACHE_MAX_MB
+                ) if self.config.OCR_CACHE_DIR else None,
+                pdf_store=PDFStore(
+                    self.config.PDF_STORE_DIR, self.config.PDF_STORE_QUOTA_MB,
+                    protect_seconds=self.config.JOB_LEASE_SECONDS
+                ) if self.config.PDF_STORE_DIR else None
             )
             self.summarizer = PaperSummarizer(
                 api_key=self.config.SUMMARY_API_KEY,
                 base_url=self.config.SUMMARY_BASE_URL,
-                model_name=self.config.SUMMARY_MODEL
+                model_name=self.config.SUMMARY_MODEL,
+                structured=self.config.STRUCTURED_SUMMARIES,
+                chunk_tokens=self.config.SUMMARY_CHUNK_TOKENS,
+                map_concurrency=self.config.SUMMARY_CONCURRENCY,
+                chunk_cache=self.database,
+                llm_cache=LLMCache(
+                    self.config.LLM_CACHE_DIR,
+                    max_size_mb=self.config.LLM_CACHE_MAX_MB,
+                    ttl_hours=self.config.LLM_CACHE_TTL_HOURS,
+                    cache_sampled=self.config.LLM_CACHE_SAMPLED
+                ) if self.config.LLM_CACHE_DIR else None,
+                relevance_batch_size=self.config.RELEVANCE_BATCH_SIZE,
+                relevance_batch_tokens=self.config.RELEVANCE_BATCH_TOKENS
+            )
+            # Confident papers are triaged locally once 'classifier train' has run
+            classifier = None
+            if self.config.RELEVANCE_MODEL_PATH and Path(self.config.RELEVANCE_MODEL_PATH).exists():
+                classifier = RelevanceClassifier.load(
+                    self.config.RELEVANCE_MODEL_PATH,
+                    accept_threshold=self.config.RELEVANCE_ACCEPT,
+                    reject_threshold=self.config.RELEVANCE_REJECT
+                )
+            self.processor = PaperProcessor(
+                self.database, self.ocr_processor, self.summarizer, self.exporter,
+                lease_seconds=self.config.JOB_LEASE_SECONDS,
+                max_attempts=self.config.JOB_MAX_ATTEMPTS,
+                retry_delay=self.config.JOB_RETRY_DELAY,
+                log=self.log,
+                classifier=classifier
             )
             print("✓ All components initialized")
         else:
@@ -101,57 +153,59 @@ class ArxivCrawler:
             ]
 
         self.log(f"Starting search: {len(categories)} categories, {len(keywords)} keywords")
-        total_new_papers = 0
-
-        # Search by categories
-        for category in categories:
-            try:
-                self.log(f"Searching category: {category}")
-                papers = self.searcher.search(
-                    category=category,
-                    max_results=max_results_per_query,
-                    filter_quantum=True
-                )
-
-                # Save to database
-                new_papers = 0
-                for paper in papers:
-                    paper_id = self.database.insert_paper(paper)
-                    if paper_id:
-                        new_papers += 1
 
-                self.log(f"  Found {len(papers)} papers, {new_papers} new")
-                total_new_papers += new_papers
-                self.stats['total_searches'] += 1
-
-            except Exception as e:
-                self.log(f"  Error searching category {category}: {e}", "ERROR")
+        # Fan out all queries; the shared HTTP client keeps the global rate polite
+        queries = [{'category': category} for category in categories]
+        queries += [{'keywords': keyword} for keyword in keywords]
+
+        # Queries with a saved cursor page forward (uncapped) only as far as
+        # the newest paper seen last run, skipping that paper itself; new
+        # queries bootstrap with the cap
+        for query in queries:
+            query['key'] = self.searcher.query_key(query.get('keywords'), query.get('category'))
+            search_cursor = self.database.get_search_cursor(query['key'])
+            if search_cursor:
+                query['since'] = search_cursor['last_published']
+                query['since_id'] = search_cursor['last_arxiv_id']
+                query['max_results'] = None
+
+        papers, reports = self.searcher.search_concurrent(
+            queries,
+            max_results_per_query=max_results_per_query,
+            filter_quantum=True,
+            max_workers=self.config.SEARCH_CONCURRENCY,
+            mark_seen=False
+        )
+
+        for report in reports:
+            query = report['query']
+            label = f"category: {query['category']}" if 'category' in query else f"keyword: '{query['keywords']}'"
+            if report['error']:
+                self.log(f"Error searching {label}: {report['error']}", "ERROR")
                 self.stats['errors'] += 1
+            else:
+                since = f" since {query['since']}" if query.get('since') else ""
+                self.log(f"Searched {label}{since} - found {report['found']} papers, {report['new']} unseen")
+                self.stats['total_searches'] += 1
 
-        # Search by keywords
-        for keyword in keywords:
-            try:
-                self.log(f"Searching keyword: {keyword}")
-                papers = self.searcher.search(
-                    keywords=keyword,
-                    max_results=max_results_per_query,
-                    filter_quantum=True
-                )
+        # Save merged, deduplicated results in one transaction
+        try:
+            total_new_papers = self.database.insert_papers_bulk(papers)['inserted']
+        except Exception as e:
+            # Leave every cursor where it was so the next run fetches these again
+            self.log(f"Error storing search results: {e}", "ERROR")
+            self.stats['errors'] += 1
+            return 0
 
-                # Save to database
-                new_papers = 0
-                for paper in papers:
-                    paper_id = self.database.insert_paper(paper)
-                    if paper_id:
-                        new_papers += 1
+        # Only stored papers count as seen; a failed insert refetches them
+        self.searcher.mark_seen(papers)
 
-                self.log(f"  Found {len(papers)} papers, {new_papers} new")
-                total_new_papers += new_papers
-                self.stats['total_searches'] += 1
-
-            except Exception as e:
-                self.log(f"  Error searching keyword '{keyword}': {e}", "ERROR")
-                self.stats['errors'] += 1
+        # Advance cursors only once their results are stored; a failed query
+        # keeps its old cursor and catches up on the next run
+        for report in reports:
+            if report['error'] is None and report['newest']:
+                published, arxiv_id = report['newest']
+                self.database.save_search_cursor(report['query']['key'], published, arxiv_id)
 
         self.stats['papers_found'] += total_new_papers
         self.log(f"Search complete: {total_new_papers} new papers added to database")
@@ -173,99 +227,29 @@ class ArxivCrawler:
             return 0
 
         self.log(f"Processing up to {batch_size} papers...")
-        papers = self.database.get_unprocessed_papers(limit=batch_size)
+        counts = self.processor.run_batch(batch_size=batch_size, max_pages=max_pages)
 
-        if not papers:
+        if not counts['claimed']:
             self.log("No unprocessed papers found")
             return 0
 
-        processed = 0
-
-        for i, paper in enumerate(papers, 1):
-            try:
-                self.log(f"[{i}/{len(papers)}] Processing: {paper['title'][:60]}...")
-
-                # Check relevance
-                relevance = self.summarizer.check_quantum_relevance(paper)
-                if not relevance['is_relevant']:
-                    self.log(f"  Not relevant (score: {relevance['relevance_score']:.2f})")
-                    # Mark as processed even if not relevant
-                    self.database.insert_summary(
-                        paper['id'],
-                        "Not relevant to quantum computing",
-                        "N/A",
-                        None
-                    )
-                    continue
-
-                # OCR PDF
-                self.log(f"  OCRing PDF (max {max_pages} pages)...")
-                extracted_text_dict = self.ocr_processor.extract_text_from_url(
-                    paper['pdf_link'],
-                    max_pages=max_pages
-                )
-                full_text = self.ocr_processor.get_full_text(extracted_text_dict)
-
-                # Summarize
-                self.log("  Generating summary...")
-                methodology_summary = self.summarizer.summarize_methodology(
-                    full_text,
-                    paper
-                )
-
-                key_contributions = self.summarizer.extract_key_contributions(
-                    full_text,
-                    paper
-                )
-
-                # Save to database
-                summary_id = self.database.insert_summary(
-                    paper['id'],
-                    methodology_summary,
-                    key_contributions,
-                    full_text[:10000]  # Limit stored text size
-                )
-
-                if summary_id:
-                    # Export to markdown
-                    paper_with_summary = paper.copy()
-                    paper_with_summary.update({
-                        'methodology_summary': methodology_summary,
-                        'key_contributions': key_contributions,
-                        'relevance_score': relevance['relevance_score']
-                    })
-
-                    filepath = self.exporter.export_paper(
-                        paper_with_summary,
-                        methodology_summary=methodology_summary,
-                        key_contributions=key_contributions
-                    )
-
-                    self.log(f"  ✓ Processed and exported: {Path(filepath).name}")
-                    processed += 1
-                    self.stats['papers_processed'] += 1
-
-            except Exception as e:
-                self.log(f"  ✗ Error processing paper: {e}", "ERROR")
-                self.stats['errors'] += 1
-
-        self.log(f"Processing batch complete: {processed}/{len(papers)} successful")
-        return processed
+        self.stats['papers_processed'] += counts['processed']
+        self.stats['errors'] += counts['errors']
+        self.log(f"Processing batch complete: {counts['processed']}/{counts['claimed']} successful")
+        return counts['processed']
 
     def export_collection_summary(self):
         """Export collection summary of all processed papers"""
         try:
-            papers = self.database.search_papers(processed_only=True, limit=1000)
-            if papers:
-                papers_with_summaries = []
-                for paper in papers:
-                    full_data = self.database.get_paper_with_summary(paper['id'])
-                    if full_data and full_data.get('methodology_summary') != "Not relevant to quantum computing":
-                        papers_with_summaries.append(full_data)
-
-                if papers_with_summaries:
-                    self.exporter.create_collection_summary(papers_with_summaries)
-                    self.log(f"Collection summary updated ({len(papers_with_summaries)} papers)")
+            papers = self.database.iter_papers_with_summaries(processed_only=True, limit=1000)
+            papers_with_summaries = [
+                paper for paper in papers
+                if paper.get('methodology_summary') != NOT_RELEVANT_SUMMARY
+            ]
+
+            if papers_with_summaries:
+                self.exporter.create_collection_summary(papers_with_summaries)
+                self.log(f"Collection summary updated ({len(papers_with_summaries)} papers)")
 
         except Exception as e:
             self.log(f"Error creating collection summary: {e}", "ERROR")
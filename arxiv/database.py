@@ -1,39 +1,211 @@
 #!/usr/bin/env python3
 """
 SQLite database for storing ArXiv papers and summaries
+
+The schema is versioned by migrations.py. Opening the database applies
+pending schema changes, but migrations that must backfill existing papers
+are left to 'python main.py db migrate'. The database runs in WAL mode so one writer (the crawler) and any number
+of readers (stats, export, research) can use the same file concurrently.
+Each thread gets its own connection, and analysis commands can open the
+database read-only.
+
+Complete OCR output is kept per paper in paper_texts, compressed with
+zstd when available (Python 3.14's compression.zstd or the zstandard
+package) and lzma otherwise, and only decompressed on request.
 """
 
 import sqlite3
+import hashlib
 import json
-from typing import List, Dict, Optional, Tuple
+import lzma
+import re
+import threading
+import time
+import zlib
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from migrations import MIGRATIONS, Migrator
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
+
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+
+def compress_text(text: str, codec: str = "auto") -> Tuple[str, bytes]:
+    """
+    Compress text for storage
+
+    Args:
+        text: Text to compress
+        codec: 'zstd', 'lzma', 'zlib' or 'auto' (zstd if available, else lzma)
+
+    Returns:
+        Tuple of (codec used, compressed bytes)
+    """
+    if codec == "auto":
+        codec = "zstd" if _zstd is not None else "lzma"
+
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        if _zstd is None:
+            raise ValueError("zstd codec requested but no zstd module is installed")
+        return codec, _zstd.compress(data, 10)
+    if codec == "lzma":
+        return codec, lzma.compress(data, preset=6)
+    if codec == "zlib":
+        return codec, zlib.compress(data, 9)
+    raise ValueError(f"Unknown text codec: {codec}")
+
+
+def decompress_text(codec: str, blob: bytes) -> str:
+    """Decompress text stored with compress_text"""
+    if codec == "zstd":
+        if _zstd is None:
+            raise ValueError("Text is zstd-compressed but no zstd module is installed")
+        data = _zstd.decompress(blob)
+    elif codec == "lzma":
+        data = lzma.decompress(blob)
+    elif codec == "zlib":
+        data = zlib.decompress(blob)
+    else:
+        raise ValueError(f"Unknown text codec: {codec}")
+    return data.decode("utf-8")
+
+
+class SchemaVersionError(Exception):
+    """The database schema is older than this code and needs an explicit 'db migrate'"""
+
+    def __init__(self, db_path: str, version: int, latest: int, backfill_rows: int = 0):
+        pending = f" ({backfill_rows} existing papers to backfill)" if backfill_rows else ""
+        super().__init__(
+            f"Database {db_path} is at schema version {version}, this version needs {latest}{pending}; "
+            f"run 'python main.py db migrate' first"
+        )
+        self.version = version
+        self.latest = latest
+
+
+class LeaseLostError(Exception):
+    """A worker's job lease expired and the job now belongs to another worker"""
+
+    def __init__(self, paper_id: int, worker_id: str):
+        super().__init__(f"Lease on paper {paper_id} is no longer held by {worker_id}")
+        self.paper_id = paper_id
+        self.worker_id = worker_id
+
 
 class PaperDatabase:
     """SQLite database manager for ArXiv papers"""
 
-    def __init__(self, db_path: str = "arxiv_papers.db"):
+    def __init__(self,
+                 db_path: str = "arxiv_papers.db",
+                 read_only: bool = False,
+                 busy_timeout: float = 30.0,
+                 cache_size_mb: int = 64,
+                 mmap_size_mb: int = 256,
+                 text_codec: str = "auto",
+                 fetch_size: int = 500,
+                 auto_migrate: bool = True,
+                 migrate_backfills: bool = False,
+                 migration_batch_size: int = 5000):
         """
         Initialize database connection
 
         Args:
             db_path: Path to SQLite database file
+            read_only: Open the database read-only (for analysis commands)
+            busy_timeout: Seconds to wait for a lock held by another writer
+            cache_size_mb: Page cache size per connection in megabytes
+            mmap_size_mb: Memory-mapped I/O size per connection in megabytes
+            text_codec: Compression for stored OCR text (see compress_text)
+            fetch_size: Rows per page when streaming papers (see iter_papers)
+            auto_migrate: Bring the schema up to date on open (see migrations)
+                when no pending migration has existing papers to backfill;
+                otherwise, and for read-only opens of an outdated schema,
+                raise SchemaVersionError
+            migrate_backfills: Let auto_migrate run backfills too, which on a
+                large database blocks the open until they finish
+            migration_batch_size: Papers backfilled per migration transaction
         """
         self.db_path = db_path
-        self.conn = None
-        self._connect()
-        self._create_tables()
+        self.text_codec = text_codec
+        self.fetch_size = fetch_size
+        self.read_only = read_only
+        self.busy_timeout = busy_timeout
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
 
-    def _connect(self):
-        """Establish database connection"""
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row  # Enable column access by name
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
 
-    def _create_tables(self):
-        """Create database tables if they don't exist"""
-        cursor = self.conn.cursor()
+        if read_only and not Path(db_path).exists():
+            raise FileNotFoundError(f"Database not found: {db_path}")
+
+        if not read_only and auto_migrate:
+            migrator = Migrator(self, batch_size=migration_batch_size)
+            backfill_rows = sum(step['backfill_rows'] for step in migrator.plan())
+            if backfill_rows and not migrate_backfills:
+                # Leave long backfills to 'db migrate' instead of stalling startup
+                version = migrator.current_version()
+                self.close()
+                raise SchemaVersionError(db_path, version, MIGRATIONS[-1].version, backfill_rows)
+            migrator.migrate()
+        elif read_only:
+            # A read-only open cannot migrate; fail clearly rather than on a missing table
+            version = Migrator(self).current_version()
+            if version < MIGRATIONS[-1].version:
+                self.close()
+                raise SchemaVersionError(db_path, version, MIGRATIONS[-1].version)
+
+        # SQLite builds without FTS5 fall back to LIKE search
+        self.fts_enabled = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'"
+        ).fetchone() is not None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with the database pragmas applied"""
+        if self.read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.busy_timeout, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+
+        if not self.read_only:
+            # WAL lets readers proceed while a write is in progress; the
+            # mode is stored in the file, so read-only openers get it too
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_mb * 1024}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size_mb * 1024 * 1024}")
+        if self.read_only:
+            conn.execute("PRAGMA query_only=ON")
 
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _create_base_tables(self, cursor: sqlite3.Cursor):
+        """Create the papers, summaries and search history tables"""
         # Papers table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS papers (
@@ -93,7 +265,473 @@ class PaperDatabase:
             CREATE INDEX IF NOT EXISTS idx_paper_id ON summaries(paper_id)
         """)
 
-        self.conn.commit()
+    def _create_harvest_tables(self, cursor: sqlite3.Cursor):
+        """Create the OAI-PMH checkpoint and search cursor tables"""
+        # OAI-PMH harvest checkpoints
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS harvest_checkpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                set_spec TEXT NOT NULL,
+                from_date TEXT NOT NULL DEFAULT '',
+                until_date TEXT NOT NULL DEFAULT '',
+                resumption_token TEXT,
+                records_harvested INTEGER DEFAULT 0,
+                response_date TEXT,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                UNIQUE (set_spec, from_date, until_date)
+            )
+        """)
+
+        # Per-query "since last harvest" cursors
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_cursors (
+                query_key TEXT PRIMARY KEY,
+                last_published TEXT NOT NULL,
+                last_arxiv_id TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    @staticmethod
+    def _add_structured_summary_column(cursor: sqlite3.Cursor):
+        """Add the JSON structured_summary column to summaries"""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(summaries)").fetchall()}
+        if 'structured_summary' not in columns:
+            cursor.execute("ALTER TABLE summaries ADD COLUMN structured_summary TEXT")
+
+    @staticmethod
+    def _add_relevance_checked_column(cursor: sqlite3.Cursor):
+        """Record when a paper's relevance was scored, with an index of unscored papers"""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(papers)").fetchall()}
+        if 'relevance_checked_at' not in columns:
+            cursor.execute("ALTER TABLE papers ADD COLUMN relevance_checked_at TIMESTAMP")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_papers_untriaged ON papers(published)
+            WHERE relevance_checked_at IS NULL AND processed = 0
+        """)
+
+    @staticmethod
+    def _add_relevance_source_column(cursor: sqlite3.Cursor):
+        """Record whether a relevance score came from the LLM or the local classifier"""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(papers)").fetchall()}
+        if 'relevance_source' not in columns:
+            cursor.execute("ALTER TABLE papers ADD COLUMN relevance_source TEXT")
+
+    @staticmethod
+    def _create_chunk_summary_table(cursor: sqlite3.Cursor):
+        """Create the cache of per-chunk notes used by map-reduce summaries"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_summaries (
+                content_hash TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def _create_text_table(self, cursor: sqlite3.Cursor):
+        """Create the compressed full-text table"""
+        # Complete OCR text per paper (compressed JSON of page texts)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS paper_texts (
+                paper_id INTEGER PRIMARY KEY,
+                codec TEXT NOT NULL,
+                content BLOB NOT NULL,
+                sha256 TEXT NOT NULL,
+                page_count INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (paper_id) REFERENCES papers (id) ON DELETE CASCADE
+            )
+        """)
+
+    def _create_stats_rollups(self, cursor: sqlite3.Cursor):
+        """
+        Create trigger-maintained statistics tables
+
+        stats_counters holds totals, stats_by_category per-category counts
+        (fed by the paper_categories triggers) and stats_by_day papers per
+        publication day. The migration fills them with _rebuild_statistics,
+        and they can be checked with verify_statistics.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_by_category (
+                category TEXT PRIMARY KEY,
+                papers INTEGER NOT NULL DEFAULT 0,
+                primary_papers INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_by_day (
+                day TEXT PRIMARY KEY,
+                papers INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+
+        def bump(name: str, delta: str) -> str:
+            return f"""
+                INSERT INTO stats_counters (name, value) VALUES ('{name}', {delta})
+                ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+            """
+
+        def bump_day(published: str, delta: int) -> str:
+            return f"""
+                INSERT INTO stats_by_day (day, papers)
+                SELECT substr({published}, 1, 10), {delta} WHERE COALESCE({published}, '') <> ''
+                ON CONFLICT (day) DO UPDATE SET papers = papers + excluded.papers;
+            """
+
+        def bump_category(row: str, delta: int) -> str:
+            return f"""
+                INSERT INTO stats_by_category (category, papers, primary_papers)
+                VALUES ({row}.category, {delta}, {delta} * {row}.is_primary)
+                ON CONFLICT (category) DO UPDATE SET
+                    papers = papers + excluded.papers,
+                    primary_papers = primary_papers + excluded.primary_papers;
+            """
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_stats_insert AFTER INSERT ON papers BEGIN
+                {bump('total_papers', '1')}
+                {bump('processed_papers', 'COALESCE(new.processed, 0)')}
+                {bump_day('new.published', 1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_stats_delete AFTER DELETE ON papers BEGIN
+                {bump('total_papers', '-1')}
+                {bump('processed_papers', '-COALESCE(old.processed, 0)')}
+                {bump_day('old.published', -1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_stats_processed AFTER UPDATE OF processed ON papers
+            WHEN COALESCE(new.processed, 0) <> COALESCE(old.processed, 0) BEGIN
+                {bump('processed_papers', 'COALESCE(new.processed, 0) - COALESCE(old.processed, 0)')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_stats_published AFTER UPDATE OF published ON papers
+            WHEN substr(COALESCE(new.published, ''), 1, 10) <> substr(COALESCE(old.published, ''), 1, 10) BEGIN
+                {bump_day('old.published', -1)}
+                {bump_day('new.published', 1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS paper_categories_stats_insert AFTER INSERT ON paper_categories BEGIN
+                {bump_category('new', 1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS paper_categories_stats_delete AFTER DELETE ON paper_categories BEGIN
+                {bump_category('old', -1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS paper_texts_stats_insert AFTER INSERT ON paper_texts BEGIN
+                {bump('full_texts', '1')}
+                {bump('full_text_raw_bytes', 'new.raw_size')}
+                {bump('full_text_stored_bytes', 'new.stored_size')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS paper_texts_stats_update AFTER UPDATE ON paper_texts BEGIN
+                {bump('full_text_raw_bytes', 'new.raw_size - old.raw_size')}
+                {bump('full_text_stored_bytes', 'new.stored_size - old.stored_size')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS paper_texts_stats_delete AFTER DELETE ON paper_texts BEGIN
+                {bump('full_texts', '-1')}
+                {bump('full_text_raw_bytes', '-old.raw_size')}
+                {bump('full_text_stored_bytes', '-old.stored_size')}
+            END
+        """)
+
+    # Aggregates computed from the base tables, matching the rollup tables
+    _STATS_COUNTER_SQL = {
+        'total_papers': "SELECT COUNT(*) FROM papers",
+        'processed_papers': "SELECT COUNT(*) FROM papers WHERE processed = 1",
+        'full_texts': "SELECT COUNT(*) FROM paper_texts",
+        'full_text_raw_bytes': "SELECT COALESCE(SUM(raw_size), 0) FROM paper_texts",
+        'full_text_stored_bytes': "SELECT COALESCE(SUM(stored_size), 0) FROM paper_texts",
+    }
+    _STATS_CATEGORY_SQL = """
+        SELECT category, COUNT(*), SUM(is_primary) FROM paper_categories GROUP BY category
+    """
+    _STATS_DAY_SQL = """
+        SELECT substr(published, 1, 10), COUNT(*) FROM papers
+        WHERE COALESCE(published, '') <> '' GROUP BY substr(published, 1, 10)
+    """
+
+    def _rebuild_statistics(self, cursor: sqlite3.Cursor):
+        """Recompute every rollup table from the base tables"""
+        cursor.execute("DELETE FROM stats_counters")
+        cursor.execute("DELETE FROM stats_by_category")
+        cursor.execute("DELETE FROM stats_by_day")
+        for name, sql in self._STATS_COUNTER_SQL.items():
+            cursor.execute(
+                f"INSERT INTO stats_counters (name, value) SELECT ?, ({sql})", (name,)
+            )
+        cursor.execute(
+            f"INSERT INTO stats_by_category (category, papers, primary_papers) {self._STATS_CATEGORY_SQL}"
+        )
+        cursor.execute(f"INSERT INTO stats_by_day (day, papers) {self._STATS_DAY_SQL}")
+
+    def _create_jobs_table(self, cursor: sqlite3.Cursor):
+        """
+        Create the processing job queue
+
+        Every paper gets one job when it is inserted (existing unprocessed
+        papers are enqueued by _backfill_jobs). Workers lease
+        jobs with claim_jobs; a lease that expires without the job being
+        completed (e.g. the worker crashed) makes the job claimable again,
+        until it has used up its attempts.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                paper_id INTEGER PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'pending'
+                    CHECK (state IN ('pending', 'leased', 'done', 'failed')),
+                stage TEXT,  -- last completed stage (see JOB_STAGES)
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                worker_id TEXT,
+                lease_expires_at REAL,  -- Unix time
+                available_at REAL NOT NULL DEFAULT 0,  -- Unix time, for retry backoff
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (paper_id) REFERENCES papers (id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, available_at)
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS papers_jobs_insert AFTER INSERT ON papers BEGIN
+                INSERT OR IGNORE INTO jobs (paper_id) VALUES (new.id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS papers_jobs_delete AFTER DELETE ON papers BEGIN
+                DELETE FROM jobs WHERE paper_id = old.id;
+            END
+        """)
+
+    @staticmethod
+    def _backfill_jobs(cursor: sqlite3.Cursor, after_id: int, up_to_id: int):
+        """Enqueue existing unprocessed papers with after_id < id <= up_to_id"""
+        cursor.execute("""
+            INSERT OR IGNORE INTO jobs (paper_id)
+            SELECT id FROM papers WHERE id > ? AND id <= ? AND processed = 0
+        """, (after_id, up_to_id))
+
+    def _create_link_tables(self, cursor: sqlite3.Cursor):
+        """
+        Create the normalized paper_categories and paper_authors tables
+
+        The JSON columns on papers stay the source of truth; triggers
+        mirror them into these indexed tables on every insert/update, and
+        existing rows are filled by _backfill_links.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS paper_categories (
+                paper_id INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                is_primary BOOLEAN NOT NULL DEFAULT 0,
+                PRIMARY KEY (paper_id, category)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS paper_authors (
+                paper_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                author TEXT NOT NULL,
+                PRIMARY KEY (paper_id, position)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_paper_categories_category
+            ON paper_categories(category, paper_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_paper_categories_primary
+            ON paper_categories(category, paper_id) WHERE is_primary = 1
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_paper_authors_author
+            ON paper_authors(author COLLATE NOCASE, paper_id)
+        """)
+
+        fill_categories = """
+            INSERT OR IGNORE INTO paper_categories (paper_id, category, is_primary)
+            SELECT {id}, value, key = 0
+            FROM json_each(CASE WHEN json_valid({categories}) THEN {categories} ELSE '[]' END)
+            WHERE value <> ''
+        """
+        fill_authors = """
+            INSERT OR IGNORE INTO paper_authors (paper_id, position, author)
+            SELECT {id}, key, value
+            FROM json_each(CASE WHEN json_valid({authors}) THEN {authors} ELSE '[]' END)
+            WHERE value <> ''
+        """
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_links_insert AFTER INSERT ON papers BEGIN
+                {fill_categories.format(id='new.id', categories='new.categories')};
+                {fill_authors.format(id='new.id', authors='new.authors')};
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_categories_update AFTER UPDATE OF categories ON papers BEGIN
+                DELETE FROM paper_categories WHERE paper_id = new.id;
+                {fill_categories.format(id='new.id', categories='new.categories')};
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS papers_authors_update AFTER UPDATE OF authors ON papers BEGIN
+                DELETE FROM paper_authors WHERE paper_id = new.id;
+                {fill_authors.format(id='new.id', authors='new.authors')};
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS papers_links_delete AFTER DELETE ON papers BEGIN
+                DELETE FROM paper_categories WHERE paper_id = old.id;
+                DELETE FROM paper_authors WHERE paper_id = old.id;
+            END
+        """)
+
+    @staticmethod
+    def _backfill_links(cursor: sqlite3.Cursor, after_id: int, up_to_id: int):
+        """Fill paper_categories/paper_authors for papers with after_id < id <= up_to_id"""
+        cursor.execute("""
+            INSERT OR IGNORE INTO paper_categories (paper_id, category, is_primary)
+            SELECT papers.id, c.value, c.key = 0
+            FROM papers, json_each(CASE WHEN json_valid(papers.categories)
+                                        THEN papers.categories ELSE '[]' END) c
+            WHERE papers.id > ? AND papers.id <= ? AND c.value <> ''
+        """, (after_id, up_to_id))
+        cursor.execute("""
+            INSERT OR IGNORE INTO paper_authors (paper_id, position, author)
+            SELECT papers.id, a.key, a.value
+            FROM papers, json_each(CASE WHEN json_valid(papers.authors)
+                                        THEN papers.authors ELSE '[]' END) a
+            WHERE papers.id > ? AND papers.id <= ? AND a.value <> ''
+        """, (after_id, up_to_id))
+
+    def _create_fts_index(self, cursor: sqlite3.Cursor):
+        """
+        Create the FTS5 index over papers and their latest summary
+
+        One row per paper (rowid = papers.id) covers the title, abstract and
+        the summary columns. Triggers keep it in sync with both tables, and
+        existing rows are indexed by _backfill_fts.
+        """
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, methodology_summary, key_contributions, extracted_text,
+                    tokenize = 'porter unicode61'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Warning: full-text search unavailable ({e}), using LIKE search")
+            return
+
+        # Papers
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts (rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstract ON papers BEGIN
+                UPDATE papers_fts SET title = new.title, abstract = new.abstract WHERE rowid = new.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+                DELETE FROM papers_fts WHERE rowid = old.id;
+            END
+        """)
+
+        # Summaries - the index holds the latest summary of each paper
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_insert AFTER INSERT ON summaries BEGIN
+                UPDATE papers_fts SET
+                    methodology_summary = new.methodology_summary,
+                    key_contributions = new.key_contributions,
+                    extracted_text = new.extracted_text
+                WHERE rowid = new.paper_id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_update AFTER UPDATE ON summaries
+            WHEN new.id = (SELECT MAX(id) FROM summaries WHERE paper_id = new.paper_id) BEGIN
+                UPDATE papers_fts SET
+                    methodology_summary = new.methodology_summary,
+                    key_contributions = new.key_contributions,
+                    extracted_text = new.extracted_text
+                WHERE rowid = new.paper_id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS summaries_fts_delete AFTER DELETE ON summaries BEGIN
+                UPDATE papers_fts SET
+                    methodology_summary = (SELECT methodology_summary FROM summaries
+                                           WHERE paper_id = old.paper_id ORDER BY id DESC LIMIT 1),
+                    key_contributions = (SELECT key_contributions FROM summaries
+                                         WHERE paper_id = old.paper_id ORDER BY id DESC LIMIT 1),
+                    extracted_text = (SELECT extracted_text FROM summaries
+                                      WHERE paper_id = old.paper_id ORDER BY id DESC LIMIT 1)
+                WHERE rowid = old.paper_id;
+            END
+        """)
+
+    @staticmethod
+    def _backfill_fts(cursor: sqlite3.Cursor, after_id: int, up_to_id: int):
+        """Index papers with after_id < id <= up_to_id that are not indexed yet"""
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'").fetchone() is None:
+            return
+        cursor.execute("""
+            INSERT INTO papers_fts (
+                rowid, title, abstract, methodology_summary, key_contributions, extracted_text
+            )
+            SELECT p.id, p.title, p.abstract,
+                   s.methodology_summary, s.key_contributions, s.extracted_text
+            FROM papers p
+            LEFT JOIN summaries s ON s.id = (
+                SELECT MAX(id) FROM summaries WHERE paper_id = p.id
+            )
+            WHERE p.id > ? AND p.id <= ?
+              AND NOT EXISTS (SELECT 1 FROM papers_fts WHERE rowid = p.id)
+        """, (after_id, up_to_id))
+
+    @staticmethod
+    def _paper_row(paper: Dict) -> Tuple:
+        """Build the papers-table column values for a paper dictionary"""
+        return (
+            paper['arxiv_id'],
+            paper['title'],
+            paper['abstract'],
+            json.dumps(paper.get('authors', [])),
+            json.dumps(paper.get('categories', [])),
+            paper.get('published', ''),
+            paper.get('updated', ''),
+            paper['pdf_link'],
+            paper['abstract_link'],
+            paper.get('is_quantum_relevant', True),
+            paper.get('relevance_score', 0.0)
+        )
 
     def insert_paper(self, paper: Dict) -> Optional[int]:
         """
@@ -114,19 +752,7 @@ class PaperDatabase:
                     published, updated, pdf_link, abstract_link,
                     is_quantum_relevant, relevance_score
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                paper['arxiv_id'],
-                paper['title'],
-                paper['abstract'],
-                json.dumps(paper.get('authors', [])),
-                json.dumps(paper.get('categories', [])),
-                paper.get('published', ''),
-                paper.get('updated', ''),
-                paper['pdf_link'],
-                paper['abstract_link'],
-                paper.get('is_quantum_relevant', True),
-                paper.get('relevance_score', 0.0)
-            ))
+            """, self._paper_row(paper))
 
             self.conn.commit()
             return cursor.lastrowid
@@ -139,11 +765,83 @@ class PaperDatabase:
             self.conn.rollback()
             return None
 
+    def insert_papers_bulk(self, papers: List[Dict], update_existing: bool = False) -> Dict:
+        """
+        Insert many papers in a single transaction
+
+        Args:
+            papers: Paper dictionaries from ArXiv search or OAI harvest
+            update_existing: Refresh metadata (title, abstract, authors,
+                categories, dates, links) of papers already stored instead
+                of leaving them untouched
+
+        Returns:
+            Dictionary with 'inserted' and 'existing' counts
+
+        Raises:
+            sqlite3.Error: If the batch could not be stored; the transaction
+                is rolled back so callers must not treat the batch as saved
+        """
+        # Last occurrence wins when a batch repeats an arxiv_id
+        unique = {paper['arxiv_id']: paper for paper in papers}
+        if not unique:
+            return {'inserted': 0, 'existing': 0}
+
+        if update_existing:
+            conflict = """
+                ON CONFLICT (arxiv_id) DO UPDATE SET
+                    title = excluded.title,
+                    abstract = excluded.abstract,
+                    authors = excluded.authors,
+                    categories = excluded.categories,
+                    published = excluded.published,
+                    updated = excluded.updated,
+                    pdf_link = excluded.pdf_link,
+                    abstract_link = excluded.abstract_link
+            """
+        else:
+            conflict = "ON CONFLICT (arxiv_id) DO NOTHING"
+
+        cursor = self.conn.cursor()
+        try:
+            # Take the write lock up front and count rows already present
+            # inside the same transaction, so the split stays exact even when
+            # upserts touch every row
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            existing = 0
+            arxiv_ids = list(unique)
+            for i in range(0, len(arxiv_ids), 500):
+                chunk = arxiv_ids[i:i + 500]
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM papers WHERE arxiv_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                existing += cursor.fetchone()[0]
+
+            cursor.executemany(f"""
+                INSERT INTO papers (
+                    arxiv_id, title, abstract, authors, categories,
+                    published, updated, pdf_link, abstract_link,
+                    is_quantum_relevant, relevance_score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                {conflict}
+            """, [self._paper_row(paper) for paper in unique.values()])
+
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error bulk inserting papers: {e}")
+            self.conn.rollback()
+            raise
+
+        return {'inserted': len(unique) - existing, 'existing': existing}
+
     def insert_summary(self,
                       paper_id: int,
                       methodology_summary: str,
                       key_contributions: str,
-                      extracted_text: Optional[str] = None) -> Optional[int]:
+                      extracted_text: Optional[str] = None,
+                      structured_summary: Optional[Dict] = None) -> Optional[int]:
         """
         Insert summary for a paper
 
@@ -152,6 +850,7 @@ class PaperDatabase:
             methodology_summary: Methodology summary text
             key_contributions: Key contributions text
             extracted_text: Full extracted OCR text
+            structured_summary: Structured summary fields (stored as JSON)
 
         Returns:
             Summary ID if successful, None otherwise
@@ -161,9 +860,13 @@ class PaperDatabase:
         try:
             cursor.execute("""
                 INSERT INTO summaries (
-                    paper_id, methodology_summary, key_contributions, extracted_text
-                ) VALUES (?, ?, ?, ?)
-            """, (paper_id, methodology_summary, key_contributions, extracted_text))
+                    paper_id, methodology_summary, key_contributions, extracted_text,
+                    structured_summary
+                ) VALUES (?, ?, ?, ?, ?)
+            """, (
+                paper_id, methodology_summary, key_contributions, extracted_text,
+                json.dumps(structured_summary) if structured_summary else None
+            ))
 
             # Mark paper as processed
             cursor.execute("""
@@ -178,6 +881,85 @@ class PaperDatabase:
             self.conn.rollback()
             return None
 
+    def save_page_texts(self, paper_id: int, page_texts: Dict[str, str]) -> Optional[Dict]:
+        """
+        Store the complete OCR output of a paper, compressed
+
+        Replaces any text stored earlier for the paper.
+
+        Args:
+            paper_id: ID of the paper
+            page_texts: Page texts keyed 'page_N' (from extract_text_from_pdf)
+
+        Returns:
+            Dictionary with 'codec', 'raw_size' and 'stored_size', or None on error
+        """
+        raw = json.dumps(page_texts, ensure_ascii=False, sort_keys=True)
+        codec, blob = compress_text(raw, self.text_codec)
+        raw_size = len(raw.encode('utf-8'))
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO paper_texts (
+                    paper_id, codec, content, sha256, page_count, raw_size, stored_size
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (paper_id) DO UPDATE SET
+                    codec = excluded.codec,
+                    content = excluded.content,
+                    sha256 = excluded.sha256,
+                    page_count = excluded.page_count,
+                    raw_size = excluded.raw_size,
+                    stored_size = excluded.stored_size,
+                    created_at = CURRENT_TIMESTAMP
+            """, (
+                paper_id, codec, blob, hashlib.sha256(raw.encode('utf-8')).hexdigest(),
+                len(page_texts), raw_size, len(blob)
+            ))
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error storing paper text: {e}")
+            self.conn.rollback()
+            return None
+
+        return {'codec': codec, 'raw_size': raw_size, 'stored_size': len(blob)}
+
+    def get_page_texts(self, paper_id: int) -> Optional[Dict[str, str]]:
+        """
+        Get the complete OCR output of a paper
+
+        Args:
+            paper_id: ID of the paper
+
+        Returns:
+            Page texts keyed 'page_N', or None if no text is stored
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT codec, content FROM paper_texts WHERE paper_id = ?", (paper_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return json.loads(decompress_text(row['codec'], row['content']))
+
+    def get_chunk_summary(self, content_hash: str) -> Optional[str]:
+        """Get cached notes for a paper chunk (see PaperSummarizer.condense_text)"""
+        row = self.conn.execute(
+            "SELECT summary FROM chunk_summaries WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        return row['summary'] if row else None
+
+    def save_chunk_summary(self, content_hash: str, model: str, summary: str):
+        """Cache notes for a paper chunk"""
+        try:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO chunk_summaries (content_hash, model, summary)
+                VALUES (?, ?, ?)
+            """, (content_hash, model, summary))
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error caching chunk summary: {e}")
+            self.conn.rollback()
+
     def get_paper_by_arxiv_id(self, arxiv_id: str) -> Optional[Dict]:
         """Get paper by ArXiv ID"""
         cursor = self.conn.cursor()
@@ -188,6 +970,31 @@ class PaperDatabase:
             return dict(row)
         return None
 
+    def get_stored_arxiv_ids(self, arxiv_ids: List[str]) -> Dict[str, str]:
+        """
+        Find stored papers regardless of the version they were stored under
+
+        Args:
+            arxiv_ids: ArXiv IDs, with or without a version suffix
+
+        Returns:
+            Dictionary mapping each unversioned ID that is stored to the
+            arxiv_id of its (oldest) row
+        """
+        cursor = self.conn.cursor()
+        stored = {}
+        for base_id in {_VERSION_SUFFIX.sub('', arxiv_id) for arxiv_id in arxiv_ids}:
+            # Range scan on the unique index covers base_id and base_id + 'vN'
+            cursor.execute(
+                "SELECT arxiv_id FROM papers WHERE arxiv_id >= ? AND arxiv_id < ? ORDER BY id",
+                (base_id, base_id + 'w')
+            )
+            for (arxiv_id,) in cursor.fetchall():
+                if _VERSION_SUFFIX.sub('', arxiv_id) == base_id:
+                    stored[base_id] = arxiv_id
+                    break
+        return stored
+
     def get_paper_with_summary(self, paper_id: int) -> Optional[Dict]:
         """
         Get paper with its summary
@@ -196,94 +1003,256 @@ class PaperDatabase:
             paper_id: Paper ID
 
         Returns:
-            Dictionary with paper and summary data
+            Dictionary with paper and (latest) summary data
         """
         cursor = self.conn.cursor()
 
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT
                 p.*,
                 s.methodology_summary,
                 s.key_contributions,
+                s.structured_summary,
                 s.summary_created_at
             FROM papers p
-            LEFT JOIN summaries s ON p.id = s.paper_id
+            {self._LATEST_SUMMARY_JOIN}
             WHERE p.id = ?
         """, (paper_id,))
 
         row = cursor.fetchone()
         if row:
-            result = dict(row)
-            # Parse JSON fields
-            result['authors'] = json.loads(result['authors']) if result['authors'] else []
-            result['categories'] = json.loads(result['categories']) if result['categories'] else []
-            return result
+            return self._row_to_paper(row)
         return None
 
-    def get_unprocessed_papers(self, limit: int = 10) -> List[Dict]:
-        """
-        Get papers that haven't been processed yet
+    # Joins each paper to its most recent summary (at most one row per paper)
+    _LATEST_SUMMARY_JOIN = """
+        LEFT JOIN summaries s ON s.id = (
+            SELECT MAX(id) FROM summaries WHERE paper_id = p.id
+        )
+    """
 
-        Args:
-            limit: Maximum number of papers to return
+    PAPER_COLUMNS = (
+        'id', 'arxiv_id', 'title', 'abstract', 'authors', 'categories',
+        'published', 'updated', 'pdf_link', 'abstract_link', 'fetched_at',
+        'processed', 'is_quantum_relevant', 'relevance_score', 'created_at',
+        'relevance_checked_at', 'relevance_source'
+    )
 
-        Returns:
-            List of paper dictionaries
-        """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM papers
-            WHERE processed = 0
-            ORDER BY published DESC
-            LIMIT ?
-        """, (limit,))
+    def _select_list(self,
+                     columns: Optional[List[str]],
+                     with_summaries: bool,
+                     include_text: bool) -> str:
+        """Build the SELECT list for a papers query with optional projection"""
+        if columns is None:
+            selected = ['p.*']
+        else:
+            unknown = set(columns) - set(self.PAPER_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown paper columns: {', '.join(sorted(unknown))}")
+            # id and published are needed for keyset pagination
+            wanted = ['id', 'arxiv_id', 'published']
+            wanted += [c for c in columns if c not in wanted]
+            selected = [f"p.{column}" for column in wanted]
 
-        papers = []
-        for row in cursor.fetchall():
-            paper = dict(row)
-            paper['authors'] = json.loads(paper['authors']) if paper['authors'] else []
-            paper['categories'] = json.loads(paper['categories']) if paper['categories'] else []
-            papers.append(paper)
+        if with_summaries:
+            selected += ['s.methodology_summary', 's.key_contributions', 's.summary_created_at']
+            if include_text:
+                selected.append('s.extracted_text')
 
-        return papers
+        return ', '.join(selected)
 
-    def search_papers(self,
-                     query: Optional[str] = None,
-                     category: Optional[str] = None,
-                     processed_only: bool = False,
-                     limit: int = 50) -> List[Dict]:
+    def iter_papers(self,
+                    category: Optional[str] = None,
+                    processed_only: bool = False,
+                    author: Optional[str] = None,
+                    primary_only: bool = False,
+                    with_summaries: bool = False,
+                    columns: Optional[List[str]] = None,
+                    include_text: bool = False,
+                    limit: Optional[int] = None,
+                    page_size: Optional[int] = None) -> Iterator[Dict]:
         """
-        Search papers in database
+        Stream papers newest first using keyset pagination
+
+        Each page is a separate short query that continues after the
+        (published, id) of the previous page's last row, so memory stays
+        flat and no read transaction is held open between pages, however
+        large the collection is.
 
         Args:
-            query: Text search in title/abstract
-            category: Filter by category
+            category: Filter by category (exact match)
             processed_only: Only return processed papers
-            limit: Maximum results
+            author: Filter by author name (exact, case-insensitive)
+            primary_only: Match category against the primary category only
+            with_summaries: Join each paper's latest summary
+            columns: Paper columns to load (default: all); 'id', 'arxiv_id'
+                and 'published' are always included
+            include_text: With summaries, also load extracted_text
+            limit: Maximum papers (None for all)
+            page_size: Rows per query (default: the database's fetch_size)
 
-        Returns:
-            List of papers
+        Yields:
+            Paper dictionaries
         """
-        cursor = self.conn.cursor()
+        page_size = page_size or self.fetch_size
+        base_sql = f"SELECT {self._select_list(columns, with_summaries, include_text)} FROM papers p"
+        if with_summaries:
+            base_sql += self._LATEST_SUMMARY_JOIN
+        base_sql += " WHERE 1=1"
 
-        sql = "SELECT * FROM papers WHERE 1=1"
-        params = []
+        filter_sql, filter_params = self._link_filters('p.id', category, author, primary_only)
+        if processed_only:
+            filter_sql += " AND p.processed = 1"
 
-        if query:
-            sql += " AND (title LIKE ? OR abstract LIKE ?)"
-            params.extend([f"%{query}%", f"%{query}%"])
+        remaining = limit
+        # Dated papers through the (published, id) index, then any without a date
+        for dated in (True, False):
+            last = None
+            while remaining is None or remaining > 0:
+                sql = base_sql + filter_sql
+                params = list(filter_params)
+                if dated:
+                    sql += " AND p.published IS NOT NULL"
+                    if last is not None:
+                        sql += " AND (p.published, p.id) < (?, ?)"
+                        params.extend(last)
+                    sql += " ORDER BY p.published DESC, p.id DESC LIMIT ?"
+                else:
+                    sql += " AND p.published IS NULL"
+                    if last is not None:
+                        sql += " AND p.id < ?"
+                        params.append(last[1])
+                    sql += " ORDER BY p.id DESC LIMIT ?"
+                batch = page_size if remaining is None else min(page_size, remaining)
+                params.append(batch)
 
-        if category:
-            sql += " AND categories LIKE ?"
-            params.append(f"%{category}%")
+                rows = self.conn.execute(sql, params).fetchall()
+                for row in rows:
+                    yield self._row_to_paper(row)
+
+                if remaining is not None:
+                    remaining -= len(rows)
+                if len(rows) < batch:
+                    break
+                last = (rows[-1]['published'], rows[-1]['id'])
+
+    def iter_papers_with_summaries(self,
+                                   query: Optional[str] = None,
+                                   category: Optional[str] = None,
+                                   processed_only: bool = False,
+                                   limit: Optional[int] = None,
+                                   columns: Optional[List[str]] = None,
+                                   include_text: bool = False,
+                                   match_any: bool = False,
+                                   author: Optional[str] = None,
+                                   batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream papers joined with their latest summary
+
+        Replaces calling search_papers followed by get_paper_with_summary
+        for every row. Without a query the collection is walked newest
+        first with keyset pagination (see iter_papers).
+
+        Args:
+            query: Full-text query; results are then ordered by relevance
+                (see search_papers_ranked), otherwise newest first
+            category: Filter by category (exact match)
+            processed_only: Only return processed papers
+            limit: Maximum results (None for all)
+            columns: Paper columns to load (default: all); 'id' and
+                'arxiv_id' are always included
+            include_text: Also load the summary's extracted_text
+            match_any: With a query, match any word instead of all words
+            author: Filter by author name (exact, case-insensitive)
+            batch_size: Rows fetched per page/batch (default: fetch_size)
+
+        Yields:
+            Paper dictionaries with methodology_summary, key_contributions
+            and summary_created_at (None for papers without a summary)
+        """
+        if not query:
+            yield from self.iter_papers(
+                category=category, processed_only=processed_only, author=author,
+                with_summaries=True, columns=columns, include_text=include_text,
+                limit=limit, page_size=batch_size
+            )
+            return
+
+        params = []
+        selected = self._select_list(columns, True, include_text)
+        if self.fts_enabled:
+            match = self._fts_match_expression(query, match_any)
+            if match is None:
+                return
+            sql = f"""
+                SELECT {selected}
+                FROM papers_fts
+                JOIN papers p ON p.id = papers_fts.rowid
+                {self._LATEST_SUMMARY_JOIN}
+                WHERE papers_fts MATCH ?
+            """
+            params.append(match)
+            order = " ORDER BY bm25(papers_fts, 10.0, 5.0, 3.0, 3.0, 1.0)"
+        else:
+            sql = f"""
+                SELECT {selected}
+                FROM papers p
+                {self._LATEST_SUMMARY_JOIN}
+                WHERE (p.title LIKE ? OR p.abstract LIKE ?)
+            """
+            params.extend([f"%{query}%", f"%{query}%"])
+            order = " ORDER BY p.published DESC"
+
+        link_sql, link_params = self._link_filters('p.id', category, author)
+        sql += link_sql
+        params.extend(link_params)
 
         if processed_only:
-            sql += " AND processed = 1"
+            sql += " AND p.processed = 1"
 
-        sql += " ORDER BY published DESC LIMIT ?"
-        params.append(limit)
+        sql += order
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
 
+        cursor = self.conn.cursor()
         cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size or self.fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._row_to_paper(row)
+
+    def get_papers_with_summaries(self, **kwargs) -> List[Dict]:
+        """
+        Get papers joined with their latest summary
+
+        Args:
+            **kwargs: See iter_papers_with_summaries
+
+        Returns:
+            List of paper dictionaries with summary fields
+        """
+        return list(self.iter_papers_with_summaries(**kwargs))
+
+    def get_unprocessed_papers(self, limit: int = 10) -> List[Dict]:
+        """
+        Get papers that haven't been processed yet
+
+        Args:
+            limit: Maximum number of papers to return
+
+        Returns:
+            List of paper dictionaries
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT * FROM papers
+            WHERE processed = 0
+            ORDER BY published DESC
+            LIMIT ?
+        """, (limit,))
 
         papers = []
         for row in cursor.fetchall():
@@ -294,36 +1263,756 @@ class PaperDatabase:
 
         return papers
 
+    def get_untriaged_papers(self, limit: int = 100) -> List[Dict]:
+        """
+        Get unprocessed papers whose relevance has not been scored yet
+
+        Args:
+            limit: Maximum number of papers to return
+
+        Returns:
+            List of paper dictionaries, newest first
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT id, arxiv_id, title, abstract, categories FROM papers
+            WHERE relevance_checked_at IS NULL AND processed = 0
+            ORDER BY published DESC
+            LIMIT ?
+        """, (limit,))
+        return [self._row_to_paper(row) for row in cursor.fetchall()]
+
+    def get_relevance_labels(self, not_relevant_summary: str) -> List[Dict]:
+        """
+        Get papers with a known relevance label for training the classifier
+
+        A paper skipped by the processor (latest summary is not_relevant_summary)
+        is labeled 0 and one that was summarized is labeled 1; otherwise a
+        relevance score from the LLM decides. Papers the local classifier
+        decided are left out, so the model never trains on its own output.
+
+        Args:
+            not_relevant_summary: Methodology summary stored for skipped papers
+
+        Returns:
+            List of dictionaries with 'arxiv_id', 'title', 'abstract',
+            'categories' and 'label'
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT p.arxiv_id, p.title, p.abstract, p.categories,
+                   CASE
+                       WHEN s.methodology_summary = ? THEN 0
+                       WHEN s.methodology_summary IS NOT NULL THEN 1
+                       ELSE p.is_quantum_relevant
+                   END AS label
+            FROM papers p
+            {self._LATEST_SUMMARY_JOIN}
+            WHERE (s.id IS NOT NULL OR p.relevance_checked_at IS NOT NULL)
+              AND COALESCE(p.relevance_source, 'llm') != 'classifier'
+        """, (not_relevant_summary,))
+
+        papers = []
+        for row in cursor.fetchall():
+            paper = dict(row)
+            paper['categories'] = json.loads(paper['categories']) if paper['categories'] else []
+            paper['label'] = 1 if paper['label'] else 0
+            papers.append(paper)
+        return papers
+
+    def save_relevance_scores(self, scores: Dict[int, Dict]) -> int:
+        """
+        Store relevance check results
+
+        Args:
+            scores: Results of check_quantum_relevance(_batch) keyed by paper ID;
+                a result's 'source' (default 'llm') is stored with the score
+
+        Returns:
+            Number of papers updated
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.executemany("""
+                UPDATE papers SET
+                    relevance_score = ?,
+                    is_quantum_relevant = ?,
+                    relevance_checked_at = CURRENT_TIMESTAMP,
+                    relevance_source = ?
+                WHERE id = ?
+            """, [
+                (result['relevance_score'], 1 if result['is_relevant'] else 0,
+                 result.get('source', 'llm'), paper_id)
+                for paper_id, result in scores.items()
+            ])
+            self.conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Error saving relevance scores: {e}")
+            self.conn.rollback()
+            return 0
+
+    # Processing stages in order; a job records the last one it completed
+    JOB_STAGES = ('downloaded', 'ocr', 'summarized', 'exported')
+
+    def claim_jobs(self,
+                   worker_id: str,
+                   limit: int = 10,
+                   lease_seconds: float = 1800,
+                   max_attempts: int = 3) -> List[Dict]:
+        """
+        Atomically lease up to limit processing jobs, newest papers first
+
+        Pending jobs whose retry delay has passed and leased jobs whose
+        lease expired are eligible. An expired lease counts as a failed
+        attempt, so a job whose worker crashed max_attempts times is marked
+        failed instead of being leased again. Claiming happens in one write
+        transaction, so concurrent workers never get the same job.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            limit: Maximum jobs to claim
+            lease_seconds: How long the worker may hold each job (extend it
+                with renew_leases while working through the batch)
+            max_attempts: Attempts allowed before a job is marked failed
+
+        Returns:
+            Paper dictionaries with 'job_stage' and 'job_attempts' added
+        """
+        now = time.time()
+        cursor = self.conn.cursor()
+        try:
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                UPDATE jobs SET
+                    state = 'failed', worker_id = NULL, lease_expires_at = NULL,
+                    last_error = 'Lease expired on the last attempt (worker stopped or crashed)',
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE state = 'leased' AND lease_expires_at < ? AND attempts >= ?
+            """, (now, max_attempts))
+            cursor.execute("""
+                SELECT p.*, j.stage AS job_stage, j.attempts AS job_attempts
+                FROM jobs j
+                JOIN papers p ON p.id = j.paper_id
+                WHERE (j.state = 'pending' AND j.available_at <= ?)
+                   OR (j.state = 'leased' AND j.lease_expires_at < ?)
+                ORDER BY p.published DESC
+                LIMIT ?
+            """, (now, now, limit))
+            papers = [self._row_to_paper(row) for row in cursor.fetchall()]
+
+            cursor.executemany("""
+                UPDATE jobs SET
+                    state = 'leased',
+                    worker_id = ?,
+                    lease_expires_at = ?,
+                    attempts = attempts + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE paper_id = ?
+            """, [(worker_id, now + lease_seconds, paper['id']) for paper in papers])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        for paper in papers:
+            paper['job_attempts'] += 1
+        return papers
+
+    # Fences every update of a leased job on its current holder
+    _HELD_BY = "paper_id = ? AND worker_id = ? AND state = 'leased'"
+
+    def renew_leases(self, paper_ids: List[int], worker_id: str, lease_seconds: float = 1800) -> List[int]:
+        """
+        Extend the leases a worker still holds
+
+        Args:
+            paper_ids: IDs of the papers claimed by the worker
+            worker_id: Identifier of the worker
+            lease_seconds: New lease duration from now
+
+        Returns:
+            IDs of the papers whose lease is still held (the others were
+            taken over by another worker after expiring)
+        """
+        expires_at = time.time() + lease_seconds
+        cursor = self.conn.cursor()
+        try:
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            held = []
+            for paper_id in paper_ids:
+                cursor.execute(f"""
+                    UPDATE jobs SET lease_expires_at = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE {self._HELD_BY}
+                """, (expires_at, paper_id, worker_id))
+                if cursor.rowcount:
+                    held.append(paper_id)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return held
+
+    def advance_job(self, paper_id: int, worker_id: str, stage: str, lease_seconds: float = 1800):
+        """
+        Record a completed processing stage and extend the job's lease
+
+        Args:
+            paper_id: ID of the paper
+            worker_id: Identifier of the worker holding the lease
+            stage: Stage just completed (one of JOB_STAGES)
+            lease_seconds: New lease duration from now
+
+        Raises:
+            LeaseLostError: The worker no longer holds the job
+        """
+        if stage not in self.JOB_STAGES:
+            raise ValueError(f"Unknown job stage: {stage}")
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            UPDATE jobs SET stage = ?, lease_expires_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE {self._HELD_BY}
+        """, (stage, time.time() + lease_seconds, paper_id, worker_id))
+        self.conn.commit()
+        if not cursor.rowcount:
+            raise LeaseLostError(paper_id, worker_id)
+
+    def complete_job(self, paper_id: int, worker_id: str):
+        """
+        Mark a job done
+
+        Raises:
+            LeaseLostError: The worker no longer holds the job
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            UPDATE jobs SET
+                state = 'done', worker_id = NULL, lease_expires_at = NULL,
+                last_error = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE {self._HELD_BY}
+        """, (paper_id, worker_id))
+        self.conn.commit()
+        if not cursor.rowcount:
+            raise LeaseLostError(paper_id, worker_id)
+
+    def fail_job(self,
+                 paper_id: int,
+                 worker_id: str,
+                 error: str,
+                 max_attempts: int = 3,
+                 retry_delay: float = 300) -> str:
+        """
+        Release a job after an error
+
+        The job goes back to pending with an exponentially growing delay
+        (keeping its completed stages), or to failed once it has used up
+        max_attempts.
+
+        Args:
+            paper_id: ID of the paper
+            worker_id: Identifier of the worker holding the lease
+            error: Error message to record
+            max_attempts: Attempts allowed before the job is marked failed
+            retry_delay: Base delay in seconds before the first retry
+
+        Returns:
+            The job's new state ('pending' or 'failed')
+
+        Raises:
+            LeaseLostError: The worker no longer holds the job
+        """
+        cursor = self.conn.cursor()
+        try:
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"SELECT attempts FROM jobs WHERE {self._HELD_BY}", (paper_id, worker_id))
+            row = cursor.fetchone()
+            if row is None:
+                raise LeaseLostError(paper_id, worker_id)
+
+            attempts = row[0]
+            if attempts >= max_attempts:
+                state, available_at = 'failed', 0
+            else:
+                state, available_at = 'pending', time.time() + retry_delay * (2 ** (attempts - 1))
+
+            cursor.execute(f"""
+                UPDATE jobs SET
+                    state = ?, available_at = ?, last_error = ?,
+                    worker_id = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE {self._HELD_BY}
+            """, (state, available_at, error, paper_id, worker_id))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return state
+
+    def retry_failed_jobs(self) -> int:
+        """
+        Put failed jobs back in the queue with a fresh attempt budget
+
+        Returns:
+            Number of jobs requeued
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE jobs SET state = 'pending', attempts = 0, available_at = 0,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE state = 'failed'
+        """)
+        self.conn.commit()
+        return cursor.rowcount
+
+    def get_job_counts(self) -> Dict[str, int]:
+        """Count jobs by state"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state")
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(cursor.fetchall()))
+        return counts
+
+    @staticmethod
+    def _row_to_paper(row: sqlite3.Row) -> Dict:
+        """Convert a papers row to a dictionary with decoded JSON columns"""
+        paper = dict(row)
+        if 'authors' in paper:
+            paper['authors'] = json.loads(paper['authors']) if paper['authors'] else []
+        if 'categories' in paper:
+            paper['categories'] = json.loads(paper['categories']) if paper['categories'] else []
+        if paper.get('structured_summary'):
+            paper['structured_summary'] = json.loads(paper['structured_summary'])
+        return paper
+
+    @staticmethod
+    def _link_filters(id_column: str,
+                      category: Optional[str],
+                      author: Optional[str],
+                      primary_only: bool = False) -> Tuple[str, List]:
+        """Build indexed category/author filter clauses for a papers query"""
+        sql = ""
+        params = []
+        if category:
+            primary = " AND is_primary = 1" if primary_only else ""
+            sql += f" AND {id_column} IN (SELECT paper_id FROM paper_categories WHERE category = ?{primary})"
+            params.append(category)
+        if author:
+            sql += f" AND {id_column} IN (SELECT paper_id FROM paper_authors WHERE author = ? COLLATE NOCASE)"
+            params.append(author)
+        return sql, params
+
+    @staticmethod
+    def _fts_match_expression(query: str, match_any: bool = False) -> Optional[str]:
+        """
+        Turn free text into a safe FTS5 MATCH expression
+
+        Every word is quoted, so punctuation in the query (hyphens, colons,
+        quotes) can't be misread as FTS5 syntax.
+
+        Args:
+            query: Free-text query
+            match_any: Match papers containing any word instead of all words
+
+        Returns:
+            MATCH expression, or None if the query has no searchable words
+        """
+        terms = [f'"{term}"' for term in re.findall(r'\w+', query)]
+        if not terms:
+            return None
+        return (' OR ' if match_any else ' ').join(terms)
+
+    def search_papers(self,
+                     query: Optional[str] = None,
+                     category: Optional[str] = None,
+                     processed_only: bool = False,
+                     limit: int = 50,
+                     author: Optional[str] = None,
+                     primary_only: bool = False) -> List[Dict]:
+        """
+        Search papers in database
+
+        With a query, papers are matched through the full-text index and
+        returned best match first (see search_papers_ranked); otherwise
+        they are returned newest first.
+
+        Args:
+            query: Text search in title/abstract/summary
+            category: Filter by category (exact match)
+            processed_only: Only return processed papers
+            limit: Maximum results
+            author: Filter by author name (exact, case-insensitive)
+            primary_only: Match category against the primary category only
+
+        Returns:
+            List of papers
+        """
+        if query and self.fts_enabled:
+            return self.search_papers_ranked(
+                query, category, processed_only, limit,
+                author=author, primary_only=primary_only
+            )
+
+        if query:
+            # SQLite build without FTS5
+            cursor = self.conn.cursor()
+            sql = "SELECT * FROM papers p WHERE (title LIKE ? OR abstract LIKE ?)"
+            params = [f"%{query}%", f"%{query}%"]
+
+            link_sql, link_params = self._link_filters('p.id', category, author, primary_only)
+            sql += link_sql
+            params.extend(link_params)
+
+            if processed_only:
+                sql += " AND processed = 1"
+
+            sql += " ORDER BY published DESC LIMIT ?"
+            params.append(limit)
+
+            cursor.execute(sql, params)
+            return [self._row_to_paper(row) for row in cursor.fetchall()]
+
+        return list(self.iter_papers(
+            category=category, processed_only=processed_only, author=author,
+            primary_only=primary_only, limit=limit
+        ))
+
+    def search_papers_ranked(self,
+                             query: str,
+                             category: Optional[str] = None,
+                             processed_only: bool = False,
+                             limit: int = 50,
+                             match_any: bool = False,
+                             author: Optional[str] = None,
+                             primary_only: bool = False) -> List[Dict]:
+        """
+        Full-text search ranked by bm25 relevance
+
+        Title matches weigh most, then the abstract, the summaries and
+        finally the extracted paper text.
+
+        Args:
+            query: Free-text query (words are stemmed, so 'qubits' finds 'qubit')
+            category: Filter by category (exact match)
+            processed_only: Only return processed papers
+            limit: Maximum results
+            match_any: Match papers containing any query word rather than
+                all of them (ranking still favours papers matching more)
+            author: Filter by author name (exact, case-insensitive)
+            primary_only: Match category against the primary category only
+
+        Returns:
+            List of papers, best match first, each with 'rank' (bm25 score,
+            lower is better), 'title_highlight' and a 'snippet' of the best
+            matching passage with matches marked in **bold**
+        """
+        if not self.fts_enabled:
+            return self.search_papers(query, category, processed_only, limit, author, primary_only)
+
+        match = self._fts_match_expression(query, match_any)
+        if match is None:
+            return []
+
+        sql = """
+            SELECT p.*,
+                   bm25(papers_fts, 10.0, 5.0, 3.0, 3.0, 1.0) AS rank,
+                   highlight(papers_fts, 0, '**', '**') AS title_highlight,
+                   snippet(papers_fts, -1, '**', '**', '...', 24) AS snippet
+            FROM papers_fts
+            JOIN papers p ON p.id = papers_fts.rowid
+            WHERE papers_fts MATCH ?
+        """
+        params = [match]
+
+        link_sql, link_params = self._link_filters('p.id', category, author, primary_only)
+        sql += link_sql
+        params.extend(link_params)
+
+        if processed_only:
+            sql += " AND p.processed = 1"
+
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+
+        return [self._row_to_paper(row) for row in cursor.fetchall()]
+
     def get_statistics(self) -> Dict:
-        """Get database statistics"""
+        """
+        Get database statistics
+
+        Reads the trigger-maintained rollup tables, so the cost does not
+        grow with the number of papers (see verify_statistics).
+        """
         cursor = self.conn.cursor()
 
+        cursor.execute("SELECT name, value FROM stats_counters")
+        counters = dict(cursor.fetchall())
+
         stats = {}
 
         # Total papers
-        cursor.execute("SELECT COUNT(*) FROM papers")
-        stats['total_papers'] = cursor.fetchone()[0]
+        stats['total_papers'] = counters.get('total_papers', 0)
 
         # Processed papers
-        cursor.execute("SELECT COUNT(*) FROM papers WHERE processed = 1")
-        stats['processed_papers'] = cursor.fetchone()[0]
+        stats['processed_papers'] = counters.get('processed_papers', 0)
 
         # Unprocessed papers
         stats['unprocessed_papers'] = stats['total_papers'] - stats['processed_papers']
 
-        # Papers by category
-        cursor.execute("SELECT categories, COUNT(*) FROM papers GROUP BY categories")
-        stats['by_category'] = dict(cursor.fetchall())
+        # Papers by category (a paper counts once in each of its categories)
+        stats['by_category'] = self.get_category_counts()
+        stats['by_primary_category'] = self.get_category_counts(primary_only=True)
 
         # Recent papers
         cursor.execute("""
-            SELECT COUNT(*) FROM papers
-            WHERE DATE(published) >= DATE('now', '-7 days')
+            SELECT COALESCE(SUM(papers), 0) FROM stats_by_day
+            WHERE day >= DATE('now', '-7 days')
         """)
         stats['papers_last_7_days'] = cursor.fetchone()[0]
 
+        # Stored full texts
+        stats['full_texts'] = counters.get('full_texts', 0)
+        stats['full_text_raw_bytes'] = counters.get('full_text_raw_bytes', 0)
+        stats['full_text_stored_bytes'] = counters.get('full_text_stored_bytes', 0)
+
         return stats
 
+    def get_papers_per_day(self, since: Optional[str] = None) -> Dict[str, int]:
+        """
+        Get the number of papers published per day
+
+        Args:
+            since: First day to include (YYYY-MM-DD)
+
+        Returns:
+            Dictionary of day to paper count, oldest first
+        """
+        sql = "SELECT day, papers FROM stats_by_day WHERE papers > 0"
+        params = []
+        if since:
+            sql += " AND day >= ?"
+            params.append(since)
+        sql += " ORDER BY day"
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
+
+    def verify_statistics(self, repair: bool = True) -> List[str]:
+        """
+        Recompute statistics from the base tables and compare with the rollups
+
+        Args:
+            repair: Rebuild the rollup tables if they disagree
+
+        Returns:
+            Descriptions of mismatched values (empty if all agree)
+        """
+        cursor = self.conn.cursor()
+        mismatches = []
+
+        cursor.execute("SELECT name, value FROM stats_counters")
+        stored = dict(cursor.fetchall())
+        for name, sql in self._STATS_COUNTER_SQL.items():
+            actual = cursor.execute(sql).fetchone()[0]
+            if stored.get(name, 0) != actual:
+                mismatches.append(f"{name}: stored {stored.get(name, 0)}, actual {actual}")
+
+        checks = [
+            ("category", "SELECT category, papers, primary_papers FROM stats_by_category "
+                         "WHERE papers <> 0 OR primary_papers <> 0", self._STATS_CATEGORY_SQL),
+            ("day", "SELECT day, papers FROM stats_by_day WHERE papers <> 0", self._STATS_DAY_SQL),
+        ]
+        for label, stored_sql, actual_sql in checks:
+            stored = {row[0]: tuple(row[1:]) for row in cursor.execute(stored_sql).fetchall()}
+            actual = {row[0]: tuple(row[1:]) for row in cursor.execute(actual_sql).fetchall()}
+            for key in sorted(set(stored) | set(actual)):
+                if stored.get(key) != actual.get(key):
+                    mismatches.append(f"{label} {key}: stored {stored.get(key)}, actual {actual.get(key)}")
+
+        if mismatches and repair and not self.read_only:
+            try:
+                if not self.conn.in_transaction:
+                    cursor.execute("BEGIN IMMEDIATE")
+                self._rebuild_statistics(cursor)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+        return mismatches
+
+    def get_category_counts(self, primary_only: bool = False, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Count papers per category
+
+        Args:
+            primary_only: Count each paper under its primary category only
+            limit: Only return the most common categories
+
+        Returns:
+            Dictionary of category to paper count, most common first
+        """
+        column = "primary_papers" if primary_only else "papers"
+        sql = f"""
+            SELECT category, {column} FROM stats_by_category
+            WHERE {column} > 0
+            ORDER BY {column} DESC, category
+        """
+        params = []
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
+
+    def get_top_authors(self, limit: int = 20, category: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Get the authors with the most papers
+
+        Args:
+            limit: Maximum authors to return
+            category: Only count papers in this category
+
+        Returns:
+            List of (author, paper count) tuples, most prolific first
+        """
+        sql = "SELECT author, COUNT(*) AS papers FROM paper_authors"
+        params = []
+        if category:
+            sql += " WHERE paper_id IN (SELECT paper_id FROM paper_categories WHERE category = ?)"
+            params.append(category)
+        sql += " GROUP BY author COLLATE NOCASE ORDER BY papers DESC, author LIMIT ?"
+        params.append(limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+
+    def get_harvest_checkpoint(self,
+                               set_spec: str,
+                               from_date: Optional[str] = None,
+                               until_date: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get the checkpoint of a harvest run
+
+        Args:
+            set_spec: OAI-PMH set (e.g. 'physics:quant-ph')
+            from_date: Harvest lower bound (YYYY-MM-DD)
+            until_date: Harvest upper bound (YYYY-MM-DD)
+
+        Returns:
+            Checkpoint dictionary, or None if this harvest never started
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT * FROM harvest_checkpoints
+            WHERE set_spec = ? AND from_date = ? AND until_date = ?
+        """, (set_spec, from_date or '', until_date or ''))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_last_completed_harvest(self, set_spec: str) -> Optional[Dict]:
+        """Get the most recently completed harvest of a set"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT * FROM harvest_checkpoints
+            WHERE set_spec = ? AND completed_at IS NOT NULL
+            ORDER BY response_date DESC
+            LIMIT 1
+        """, (set_spec,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def save_harvest_checkpoint(self,
+                                set_spec: str,
+                                from_date: Optional[str],
+                                until_date: Optional[str],
+                                resumption_token: Optional[str],
+                                records_harvested: int,
+                                response_date: Optional[str] = None,
+                                completed: bool = False):
+        """
+        Record harvest progress so an interrupted run can resume
+
+        Args:
+            set_spec: OAI-PMH set
+            from_date: Harvest lower bound (YYYY-MM-DD)
+            until_date: Harvest upper bound (YYYY-MM-DD)
+            resumption_token: Token for the next page (None when finished)
+            records_harvested: Records stored so far in this run
+            response_date: Server responseDate of the first page
+            completed: Whether the harvest finished
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO harvest_checkpoints (
+                set_spec, from_date, until_date, resumption_token,
+                records_harvested, response_date, completed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END)
+            ON CONFLICT (set_spec, from_date, until_date) DO UPDATE SET
+                resumption_token = excluded.resumption_token,
+                records_harvested = excluded.records_harvested,
+                response_date = COALESCE(excluded.response_date, response_date),
+                updated_at = CURRENT_TIMESTAMP,
+                completed_at = excluded.completed_at
+        """, (
+            set_spec, from_date or '', until_date or '', resumption_token,
+            records_harvested, response_date, completed
+        ))
+        self.conn.commit()
+
+    def get_search_cursor(self, query_key: str) -> Optional[Dict]:
+        """
+        Get the high-water mark of a recurring search
+
+        Args:
+            query_key: Search identifier (see ArxivSearcher.query_key)
+
+        Returns:
+            Dictionary with 'last_published' and 'last_arxiv_id', or None
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM search_cursors WHERE query_key = ?", (query_key,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def save_search_cursor(self, query_key: str, last_published: str, last_arxiv_id: Optional[str]):
+        """
+        Advance the high-water mark of a recurring search
+
+        The cursor never moves backwards, so a stale result can't cause
+        papers to be fetched twice or skipped. Like the search watermark it
+        orders on (published, unversioned arxiv_id), so papers sharing a
+        published time are compared by ID.
+
+        Args:
+            query_key: Search identifier (see ArxivSearcher.query_key)
+            last_published: Published timestamp of the newest entry fetched
+            last_arxiv_id: ArXiv ID of that entry
+        """
+        if last_arxiv_id:
+            last_arxiv_id = _VERSION_SUFFIX.sub('', last_arxiv_id)
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO search_cursors (query_key, last_published, last_arxiv_id)
+            VALUES (?, ?, ?)
+            ON CONFLICT (query_key) DO UPDATE SET
+                last_published = excluded.last_published,
+                last_arxiv_id = excluded.last_arxiv_id,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE excluded.last_published > search_cursors.last_published
+               OR (excluded.last_published = search_cursors.last_published
+                   AND COALESCE(excluded.last_arxiv_id, '') >= COALESCE(search_cursors.last_arxiv_id, ''))
+        """, (query_key, last_published, last_arxiv_id))
+        self.conn.commit()
+
     def log_search(self, query: str, category: Optional[str], num_results: int):
         """Log a search query"""
         cursor = self.conn.cursor()
@@ -334,9 +2023,12 @@ class PaperDatabase:
         self.conn.commit()
 
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Close the connections of all threads"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
     def __enter__(self):
         """Context manager entry"""
@@ -7,6 +7,7 @@ Enables complex research queries, synthesis, and analysis across paper collectio
 from typing import Dict, List, Optional, Tuple
 from openai import OpenAI
 from database import PaperDatabase
+from llm_cache import LLMCache, cached_completion
 import json
 
 
@@ -19,7 +20,8 @@ class DeepResearchEngine:
                  api_key: str,
                  base_url: str,
                  database: PaperDatabase,
-                 model_name: str = "openai/gpt-oss-20b"):
+                 model_name: str = "openai/gpt-oss-20b",
+                 llm_cache: Optional[LLMCache] = None):
         """
         Initialize deep research engine
 
@@ -28,6 +30,7 @@ class DeepResearchEngine:
             base_url: Base URL for OpenAI-compatible endpoint
             database: PaperDatabase instance
             model_name: Model name for research queries
+            llm_cache: Response cache for identical requests (None disables it)
         """
         self.client = OpenAI(
             api_key=api_key,
@@ -35,6 +38,11 @@ class DeepResearchEngine:
         )
         self.model_name = model_name
         self.database = database
+        self.llm_cache = llm_cache
+
+    def _complete(self, **request) -> str:
+        """Send a chat completion request through the response cache"""
+        return cached_completion(self.client, self.llm_cache, **request)
 
     def _gather_papers_context(self,
                                query: Optional[str] = None,
@@ -53,19 +61,16 @@ class DeepResearchEngine:
         Returns:
             List of paper dictionaries with summaries
         """
-        papers = self.database.search_papers(
+        # Papers and their latest summary in one query; any query word may
+        # match so long research questions still recall, ranked by relevance
+        papers = self.database.iter_papers_with_summaries(
             query=query,
             category=category,
             processed_only=processed_only,
-            limit=limit
+            limit=limit,
+            match_any=True
         )
-
-        # Enrich with summaries
-        enriched_papers = []
-        for paper in papers:
-            full_data = self.database.get_paper_with_summary(paper['id'])
-            if full_data and full_data.get('methodology_summary'):
-                enriched_papers.append(full_data)
+        enriched_papers = [paper for paper in papers if paper.get('methodology_summary')]
 
         return enriched_papers
 
@@ -181,7 +186,7 @@ Please be thorough, technical, and cite specific papers to support your claims.
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -197,7 +202,7 @@ Please be thorough, technical, and cite specific papers to support your claims.
                 temperature=temperature
             )
 
-            answer = response.choices[0].message.content.strip()
+            answer = content.strip()
 
             return {
                 'success': True,
@@ -294,7 +299,7 @@ Cite papers by ArXiv ID throughout your analysis.
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -310,7 +315,7 @@ Cite papers by ArXiv ID throughout your analysis.
                 temperature=temperature
             )
 
-            analysis = response.choices[0].message.content.strip()
+            analysis = content.strip()
 
             return {
                 'success': True,
@@ -404,7 +409,7 @@ Provide specific examples and cite papers by ArXiv ID.
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -420,7 +425,7 @@ Provide specific examples and cite papers by ArXiv ID.
                 temperature=temperature
             )
 
-            analysis = response.choices[0].message.content.strip()
+            analysis = content.strip()
 
             return {
                 'success': True,
@@ -520,7 +525,7 @@ Format as a structured analysis with clear connections.
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -536,7 +541,7 @@ Format as a structured analysis with clear connections.
                 temperature=temperature
             )
 
-            analysis = response.choices[0].message.content.strip()
+            analysis = content.strip()
 
             return {
                 'success': True,
@@ -613,7 +618,7 @@ Please provide a comprehensive, well-researched response based on the papers pro
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -629,7 +634,7 @@ Please provide a comprehensive, well-researched response based on the papers pro
                 temperature=temperature
             )
 
-            result = response.choices[0].message.content.strip()
+            result = content.strip()
 
             return {
                 'success': True,
@@ -774,7 +779,7 @@ Return ONLY the follow-up question, nothing else. If no meaningful follow-up is
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -790,7 +795,7 @@ Return ONLY the follow-up question, nothing else. If no meaningful follow-up is
                 temperature=0.6
             )
 
-            follow_up = response.choices[0].message.content.strip()
+            follow_up = content.strip()
 
             if follow_up.upper() == "NONE" or len(follow_up) < 10:
                 return None
@@ -842,7 +847,7 @@ Make this a cohesive narrative, not just a list of iteration summaries.
 """
 
         try:
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -858,7 +863,7 @@ Make this a cohesive narrative, not just a list of iteration summaries.
                 temperature=0.4
             )
 
-            return response.choices[0].message.content.strip()
+            return content.strip()
 
         except Exception as e:
             return f"Error during synthesis: {e}\n\nRaw iterations available in result."
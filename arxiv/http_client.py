@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for outbound arXiv traffic
+
+Provides a pooled keep-alive session with timeouts, exponential backoff
+with jitter on throttling and transient errors (honouring Retry-After),
+and per-host rate limiting so the arXiv API is never hit more often than
+its etiquette allows, even from several threads at once.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+
+class HostRateLimiter:
+    """Thread-safe minimum interval between requests to the same host"""
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None):
+        """
+        Initialize rate limiter
+
+        Args:
+            intervals: Minimum seconds between requests, by host name
+        """
+        self.intervals = dict(intervals or {})
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        """Block until a request to host is allowed"""
+        interval = self.intervals.get(host)
+        if not interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            # Reserve the slot before sleeping so concurrent callers queue up
+            self._next_slot[host] = slot + interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HTTPClient:
+    """Pooled HTTP session with retry/backoff and per-host rate limiting"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self,
+                 max_retries: int = 5,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 timeout: float = 30.0,
+                 pool_size: int = 10,
+                 host_intervals: Optional[Dict[str, float]] = None):
+        """
+        Initialize HTTP client
+
+        Args:
+            max_retries: Retries after the first attempt before giving up
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Maximum delay in seconds between retries
+            timeout: Default request timeout in seconds
+            pool_size: Keep-alive connections kept per host
+            host_intervals: Minimum seconds between requests, by host name
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(host_intervals)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = "arxiv-paper-tool/1.0 (quantum paper crawler)"
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header (seconds or HTTP date)"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            return min(self.backoff_max, max(0.0, delay))
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying throttled and transient failures
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            The final response (the caller checks its status)
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).hostname or ""
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(host)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"Request to {host} failed ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                print(f"{host} returned {response.status_code}, retrying in {delay:.1f}s...")
+                response.close()
+                time.sleep(delay)
+                continue
+
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request (see request)"""
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+_shared_client: Optional[HTTPClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Get the process-wide HTTP client shared by all arXiv traffic"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HTTPClient(
+                max_retries=Config.HTTP_MAX_RETRIES,
+                timeout=Config.HTTP_TIMEOUT,
+                host_intervals={
+                    "export.arxiv.org": Config.ARXIV_API_DELAY,
+                    "oaipmh.arxiv.org": Config.ARXIV_API_DELAY,
+                    "arxiv.org": Config.ARXIV_PDF_DELAY,
+                }
+            )
+        return _shared_client
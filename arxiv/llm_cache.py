@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of LLM chat completions
+
+Responses are keyed by the full request (model, messages, temperature,
+max_tokens and any other parameters), so a byte-identical prompt - a
+repeated research question, a relevance check of an already scored paper,
+another recursive_research iteration - is answered from disk instead of
+the endpoint. Entries expire after a TTL and the cache is bounded by total
+response size, evicting least recently used entries.
+"""
+
+import hashlib
+import json
+import time
+from typing import Callable, Dict, Optional
+
+from sqlite_cache import SQLiteLRUCache
+
+
+class LLMCache(SQLiteLRUCache):
+    """On-disk LRU cache of chat completion responses"""
+
+    TABLE_NAME = "llm_responses"
+    INDEX_NAME = "llm_cache.db"
+
+    def __init__(self,
+                 cache_dir: str = ".llm_cache",
+                 max_size_mb: int = 256,
+                 ttl_hours: float = 720,
+                 cache_sampled: bool = True):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding the cache index
+            max_size_mb: Maximum total size of cached responses in megabytes
+            ttl_hours: Hours before a cached response expires (0 = never)
+            cache_sampled: Also cache requests with temperature > 0, whose
+                answers would differ between calls
+        """
+        self.ttl_seconds = ttl_hours * 3600
+        self.cache_sampled = cache_sampled
+        self.bypassed = 0
+        super().__init__(cache_dir, max_size_mb)
+
+    def _create_table(self):
+        """Create the response table"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                temperature REAL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_llm_last_access ON llm_responses(last_access)
+        """)
+
+    @staticmethod
+    def make_key(request: Dict) -> str:
+        """Build the cache key for a chat completion request"""
+        raw = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def cacheable(self, request: Dict) -> bool:
+        """Check whether a request may be served from the cache"""
+        return self.cache_sampled or not request.get("temperature")
+
+    def get(self, request: Dict) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            request: Keyword arguments of chat.completions.create
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if not self.cacheable(request):
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        key = self.make_key(request)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (key,))
+                self.conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                "UPDATE llm_responses SET last_access = ?, hits = hits + 1 WHERE cache_key = ?",
+                (now, key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, request: Dict, response: str):
+        """Store a response and evict old entries if over the size cap"""
+        if not self.cacheable(request):
+            return
+
+        key = self.make_key(request)
+        now = time.time()
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO llm_responses (
+                    cache_key, model, temperature, response, size, created_at, last_access
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                key, str(request.get("model", "")), request.get("temperature"),
+                response, len(response.encode("utf-8")), now, now
+            ))
+            self._expire(now)
+            self._evict()
+            self.conn.commit()
+
+    def _expire(self, now: float):
+        """Drop entries older than the TTL"""
+        if self.ttl_seconds:
+            self.conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+
+    def clear(self) -> int:
+        """Delete every cached response, returning how many were removed"""
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM llm_responses").rowcount
+            self.conn.commit()
+        return removed
+
+    def get_statistics(self) -> Dict:
+        """Get cache size, lifetime hits and this session's hit/miss counters"""
+        stats = super().get_statistics()
+        with self._lock:
+            stats['lifetime_hits'] = self.conn.execute(
+                "SELECT COALESCE(SUM(hits), 0) FROM llm_responses"
+            ).fetchone()[0]
+        stats['bypassed'] = self.bypassed
+        return stats
+
+
+def cached_completion(client,
+                      cache: Optional[LLMCache],
+                      validate: Optional[Callable[[str], bool]] = None,
+                      **request) -> str:
+    """
+    Send a chat completion request, answering it from the cache if possible
+
+    Args:
+        client: OpenAI client
+        cache: LLMCache, or None to always call the endpoint
+        validate: Check that a response is usable (e.g. parses as the
+            expected JSON); responses failing it are not cached, so the
+            next call gets a fresh answer instead of replaying a bad one
+        **request: Keyword arguments of chat.completions.create
+
+    Returns:
+        Response message text ('' if the model returned no content)
+    """
+    if cache is not None:
+        cached = cache.get(request)
+        if cached is not None:
+            return cached
+
+    response = client.chat.completions.create(**request)
+    content = response.choices[0].message.content or ''
+
+    # Empty answers are usually failures; leave them uncached so they are retried
+    if cache is not None and content.strip() and (validate is None or validate(content)):
+        cache.put(request, content)
+    return content
@@ -13,7 +13,10 @@ Usage:
     python main.py search --keywords "quantum computing" --max-results 10
     python main.py process --batch-size 5
     python main.py crawl --interval 6
+    python main.py harvest --set physics:quant-ph --from 2024-01-01
     python main.py stats
+    python main.py db migrate --dry-run
+    python main.py classifier train
     python main.py ocr paper.pdf --output output.md
 """
 
@@ -21,17 +24,89 @@ import argparse
 import sys
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 from config import Config
 from arxiv_search import ArxivSearcher
 from pdf_ocr import PDFOCRProcessor
+from ocr_cache import OCRCache
+from llm_cache import LLMCache
+from pdf_store import PDFStore
 from summarizer import PaperSummarizer
-from database import PaperDatabase
+from database import PaperDatabase, SchemaVersionError
+from migrations import Migrator, MIGRATIONS
 from markdown_exporter import MarkdownExporter
 from crawler import ArxivCrawler
+from oai_harvester import OAIHarvester
+from paper_processor import PaperProcessor, NOT_RELEVANT_SUMMARY
+from relevance_classifier import RelevanceClassifier, holdout_split
 from deep_research import DeepResearchEngine, format_research_output
 
 
+def open_database(read_only: bool = False, auto_migrate: bool = True) -> PaperDatabase:
+    """Open the configured database (read-only for analysis commands)"""
+    # Only a migrating read-write open may create the file; 'db status' must not
+    if (read_only or not auto_migrate) and not Path(Config.DATABASE_PATH).exists():
+        print(f"ERROR: Database not found: {Config.DATABASE_PATH}")
+        print("Run 'search', 'crawl' or 'harvest' first to create it")
+        sys.exit(1)
+
+    try:
+        return PaperDatabase(
+            Config.DATABASE_PATH,
+            read_only=read_only,
+            busy_timeout=Config.DATABASE_BUSY_TIMEOUT,
+            cache_size_mb=Config.DATABASE_CACHE_SIZE_MB,
+            mmap_size_mb=Config.DATABASE_MMAP_SIZE_MB,
+            text_codec=Config.FULL_TEXT_CODEC,
+            fetch_size=Config.DATABASE_FETCH_SIZE,
+            auto_migrate=auto_migrate,
+            migration_batch_size=Config.MIGRATION_BATCH_SIZE
+        )
+    except SchemaVersionError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+
+def open_llm_cache() -> Optional[LLMCache]:
+    """Open the LLM response cache shared by summaries and research (None if disabled)"""
+    if not Config.LLM_CACHE_DIR:
+        return None
+    return LLMCache(
+        Config.LLM_CACHE_DIR,
+        max_size_mb=Config.LLM_CACHE_MAX_MB,
+        ttl_hours=Config.LLM_CACHE_TTL_HOURS,
+        cache_sampled=Config.LLM_CACHE_SAMPLED
+    )
+
+
+def load_relevance_classifier() -> Optional[RelevanceClassifier]:
+    """Load the trained relevance classifier (None if disabled or not trained yet)"""
+    if not Config.RELEVANCE_MODEL_PATH or not Path(Config.RELEVANCE_MODEL_PATH).exists():
+        return None
+    return RelevanceClassifier.load(
+        Config.RELEVANCE_MODEL_PATH,
+        accept_threshold=Config.RELEVANCE_ACCEPT,
+        reject_threshold=Config.RELEVANCE_REJECT
+    )
+
+
+def create_summarizer(database: PaperDatabase) -> PaperSummarizer:
+    """Create the configured summarizer (chunk notes are cached in database)"""
+    return PaperSummarizer(
+        api_key=Config.SUMMARY_API_KEY,
+        base_url=Config.SUMMARY_BASE_URL,
+        model_name=Config.SUMMARY_MODEL,
+        structured=Config.STRUCTURED_SUMMARIES,
+        chunk_tokens=Config.SUMMARY_CHUNK_TOKENS,
+        map_concurrency=Config.SUMMARY_CONCURRENCY,
+        chunk_cache=database,
+        llm_cache=open_llm_cache(),
+        relevance_batch_size=Config.RELEVANCE_BATCH_SIZE,
+        relevance_batch_tokens=Config.RELEVANCE_BATCH_TOKENS
+    )
+
+
 def setup_components():
     """Initialize all components"""
     print("Initializing components...")
@@ -46,7 +121,7 @@ def setup_components():
 
     # Initialize components
     searcher = ArxivSearcher()
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database()
     exporter = MarkdownExporter(Config.MARKDOWN_OUTPUT_DIR)
 
     ocr_processor = None
@@ -56,13 +131,15 @@ def setup_components():
         ocr_processor = PDFOCRProcessor(
             api_key=Config.OCR_API_KEY,
             base_url=Config.OCR_BASE_URL,
-            model_name=Config.OCR_MODEL
-        )
-        summarizer = PaperSummarizer(
-            api_key=Config.SUMMARY_API_KEY,
-            base_url=Config.SUMMARY_BASE_URL,
-            model_name=Config.SUMMARY_MODEL
+            model_name=Config.OCR_MODEL,
+            max_concurrency=Config.OCR_CONCURRENCY,
+            use_text_layer=Config.USE_TEXT_LAYER,
+            text_layer_min_quality=Config.TEXT_LAYER_MIN_QUALITY,
+            cache=OCRCache(Config.OCR_CACHE_DIR, Config.OCR_CACHE_MAX_MB) if Config.OCR_CACHE_DIR else None,
+            pdf_store=PDFStore(Config.PDF_STORE_DIR, Config.PDF_STORE_QUOTA_MB,
+                               protect_seconds=Config.JOB_LEASE_SECONDS) if Config.PDF_STORE_DIR else None
         )
+        summarizer = create_summarizer(database)
         print(" All components initialized\n")
     else:
         print("� OCR/Summarizer not initialized - only search functionality available\n")
@@ -82,49 +159,44 @@ def cmd_search(args):
         # Perform search
         if args.keywords and args.category:
             print(f"Searching for: '{args.keywords}' in category '{args.category}'")
-            papers = searcher.search(
-                keywords=args.keywords,
-                category=args.category,
-                max_results=args.max_results,
-                filter_quantum=args.filter_quantum
-            )
         elif args.keywords:
             print(f"Searching for: '{args.keywords}'")
-            papers = searcher.search(
-                keywords=args.keywords,
-                max_results=args.max_results,
-                filter_quantum=args.filter_quantum
-            )
         elif args.category:
             print(f"Searching category: '{args.category}'")
-            papers = searcher.search(
-                category=args.category,
-                max_results=args.max_results,
-                filter_quantum=args.filter_quantum
-            )
         else:
             print("Searching default: quantum computing papers (quant-ph)")
-            papers = searcher.search(
-                category='quant-ph',
-                max_results=args.max_results,
-                filter_quantum=args.filter_quantum
-            )
 
-        print(f"\nFound {len(papers)} papers")
+        papers = searcher.iter_search(
+            keywords=args.keywords,
+            category=args.category or (None if args.keywords else 'quant-ph'),
+            max_results=None if args.all else args.max_results,
+            filter_quantum=args.filter_quantum,
+            page_size=args.page_size
+        )
 
-        # Save to database
+        # Save to database one page at a time as results stream in
+        found_papers = 0
         new_papers = 0
         duplicate_papers = 0
+        batch = []
 
-        for paper in papers:
-            paper_id = database.insert_paper(paper)
-            if paper_id:
-                new_papers += 1
-                print(f"   Added: {paper['title'][:60]}... (ID: {paper_id})")
-            else:
-                duplicate_papers += 1
-                print(f"  - Duplicate: {paper['arxiv_id']}")
+        def flush():
+            nonlocal new_papers, duplicate_papers
+            counts = database.insert_papers_bulk(batch)
+            new_papers += counts['inserted']
+            duplicate_papers += counts['existing']
+            print(f"  Stored {len(batch)} papers: {counts['inserted']} new, {counts['existing']} duplicates")
+            batch.clear()
 
+        for paper in papers:
+            found_papers += 1
+            batch.append(paper)
+            if len(batch) >= args.page_size:
+                flush()
+        if batch:
+            flush()
+
+        print(f"\nFound {found_papers} papers")
         print(f"\nResults:")
         print(f"  New papers: {new_papers}")
         print(f"  Duplicates: {duplicate_papers}")
@@ -134,7 +206,7 @@ def cmd_search(args):
         database.log_search(
             args.keywords or args.category or 'quant-ph',
             args.category,
-            len(papers)
+            found_papers
         )
 
     finally:
@@ -156,124 +228,100 @@ def cmd_process(args):
         sys.exit(1)
 
     try:
-        # Get unprocessed papers
-        papers = database.get_unprocessed_papers(limit=args.batch_size)
+        if args.retry_failed:
+            print(f"Requeued {database.retry_failed_jobs()} failed papers\n")
+
+        # Claim papers through the job queue so several workers can run at once
+        processor = PaperProcessor(
+            database, ocr_processor, summarizer, exporter,
+            lease_seconds=Config.JOB_LEASE_SECONDS,
+            max_attempts=Config.JOB_MAX_ATTEMPTS,
+            retry_delay=Config.JOB_RETRY_DELAY,
+            classifier=load_relevance_classifier()
+        )
+        counts = processor.run_batch(batch_size=args.batch_size, max_pages=args.max_pages)
 
-        if not papers:
+        if not counts['claimed']:
             print("No unprocessed papers found")
             return
 
-        print(f"Processing {len(papers)} papers...\n")
-
-        processed = 0
-        skipped = 0
-        errors = 0
-
-        for i, paper in enumerate(papers, 1):
-            try:
-                print(f"[{i}/{len(papers)}] {paper['title'][:60]}...")
-                print(f"  ArXiv ID: {paper['arxiv_id']}")
-
-                # Check quantum relevance
-                print("  Checking relevance...")
-                relevance = summarizer.check_quantum_relevance(paper)
-                print(f"  Relevance score: {relevance['relevance_score']:.2f}")
-
-                if not relevance['is_relevant']:
-                    print(f"  �  Skipping (not relevant)")
-                    # Mark as processed even if not relevant
-                    database.insert_summary(
-                        paper['id'],
-                        "Not relevant to quantum computing",
-                        "N/A",
-                        None
-                    )
-                    skipped += 1
-                    continue
-
-                # OCR PDF
-                print(f"  Extracting text from PDF (max {args.max_pages} pages)...")
-                extracted_text_dict = ocr_processor.extract_text_from_url(
-                    paper['pdf_link'],
-                    max_pages=args.max_pages
-                )
-                full_text = ocr_processor.get_full_text(extracted_text_dict)
-                print(f"  Extracted {len(full_text)} characters")
-
-                # Summarize
-                print("  Generating methodology summary...")
-                methodology_summary = summarizer.summarize_methodology(
-                    full_text,
-                    paper
-                )
-
-                print("  Extracting key contributions...")
-                key_contributions = summarizer.extract_key_contributions(
-                    full_text,
-                    paper
-                )
-
-                # Save to database
-                summary_id = database.insert_summary(
-                    paper['id'],
-                    methodology_summary,
-                    key_contributions,
-                    full_text[:10000]  # Limit stored text size
-                )
-
-                if summary_id:
-                    # Export to markdown
-                    paper_with_summary = paper.copy()
-                    paper_with_summary.update({
-                        'methodology_summary': methodology_summary,
-                        'key_contributions': key_contributions,
-                        'relevance_score': relevance['relevance_score']
-                    })
-
-                    filepath = exporter.export_paper(
-                        paper_with_summary,
-                        methodology_summary=methodology_summary,
-                        key_contributions=key_contributions
-                    )
-
-                    print(f"   Processed and exported to: {Path(filepath).name}")
-                    processed += 1
-                else:
-                    print(f"   Failed to save summary")
-                    errors += 1
-
-                print()
-
-            except Exception as e:
-                print(f"   Error: {e}")
-                errors += 1
-                print()
+        processed = counts['processed']
 
         # Summary
         print("=" * 70)
         print("PROCESSING SUMMARY")
         print("=" * 70)
         print(f"Processed:  {processed}")
-        print(f"Skipped:    {skipped}")
-        print(f"Errors:     {errors}")
-        print(f"Total:      {len(papers)}")
+        print(f"Skipped:    {counts['skipped']}")
+        print(f"Errors:     {counts['errors']} ({counts['failed']} gave up)")
+        if counts['lost']:
+            print(f"Lost:       {counts['lost']} (taken over by another worker)")
+        print(f"Total:      {counts['claimed']}")
+
+        jobs = database.get_job_counts()
+        print(f"Queue:      {jobs['pending']} pending, {jobs['leased']} in progress, "
+              f"{jobs['failed']} failed")
 
         # Update collection summary if papers were processed
         if processed > 0:
             print("\nUpdating collection summary...")
-            papers_all = database.search_papers(processed_only=True, limit=1000)
-            if papers_all:
-                papers_with_summaries = []
-                for p in papers_all:
-                    full_data = database.get_paper_with_summary(p['id'])
-                    if full_data and full_data.get('methodology_summary') != "Not relevant to quantum computing":
-                        papers_with_summaries.append(full_data)
-
-                if papers_with_summaries:
-                    exporter.create_collection_summary(papers_with_summaries)
-                    exporter._create_index(papers_with_summaries)
-                    print(f" Collection summary created ({len(papers_with_summaries)} papers)")
+            papers_all = database.iter_papers_with_summaries(processed_only=True, limit=1000)
+            papers_with_summaries = [
+                p for p in papers_all
+                if p.get('methodology_summary') != NOT_RELEVANT_SUMMARY
+            ]
+            if papers_with_summaries:
+                exporter.create_collection_summary(papers_with_summaries)
+                exporter._create_index(papers_with_summaries)
+                print(f" Collection summary created ({len(papers_with_summaries)} papers)")
+
+    finally:
+        database.close()
+
+    print("=" * 70)
+
+
+def cmd_triage(args):
+    """Score the relevance of unprocessed papers in batches"""
+    print("=" * 70)
+    print("TRIAGE PAPERS")
+    print("=" * 70)
+
+    if not Config.SUMMARY_API_KEY:
+        print("ERROR: SUMMARY_API_KEY must be set to check relevance")
+        sys.exit(1)
+
+    database = open_database()
+    summarizer = create_summarizer(database)
+    classifier = load_relevance_classifier()
+    processor = PaperProcessor(database, None, summarizer, None, classifier=classifier)
+    if classifier is None:
+        print("No relevance classifier trained - every paper is checked by the LLM")
 
+    scored = relevant = local = 0
+    try:
+        while scored < args.limit:
+            papers = database.get_untriaged_papers(limit=min(args.chunk_size, args.limit - scored))
+            if not papers:
+                break
+
+            print(f"Scoring {len(papers)} papers...")
+            scores = processor.triage(papers)
+            if not scores:
+                print("No papers could be scored, stopping")
+                break
+            scored += len(scores)
+            relevant += sum(1 for result in scores.values() if result['is_relevant'])
+            local += sum(1 for result in scores.values() if result.get('source') == 'classifier')
+            if len(scores) < len(papers):
+                print(f"  {len(papers) - len(scores)} papers could not be scored")
+                break
+
+        print("=" * 70)
+        print(f"Scored:       {scored}")
+        print(f"Relevant:     {relevant}")
+        print(f"Not relevant: {scored - relevant}")
+        print(f"Decided by classifier: {local}")
     finally:
         database.close()
 
@@ -295,21 +343,94 @@ def cmd_crawl(args):
     )
 
 
+def cmd_harvest(args):
+    """Bulk-harvest category metadata over OAI-PMH"""
+    print("=" * 70)
+    print("OAI-PMH HARVEST")
+    print("=" * 70)
+
+    database = open_database()
+
+    try:
+        harvester = OAIHarvester(database, base_url=args.base_url or Config.OAI_BASE_URL)
+        categories = [c.strip() for c in args.categories.split(',')] if args.categories else None
+
+        for set_spec in args.set:
+            print(f"Harvesting set: {set_spec}")
+            stats = harvester.harvest(
+                set_spec=set_spec,
+                from_date=args.from_date,
+                until_date=args.until_date,
+                categories=categories,
+                filter_quantum=args.filter_quantum,
+                restart=args.restart
+            )
+
+            print(f"\nResults for {set_spec}:")
+            print(f"  Pages:       {stats['pages']}")
+            print(f"  Records:     {stats['records']}")
+            print(f"  Skipped:     {stats['skipped']}")
+            print(f"  New papers:  {stats['new_papers']}\n")
+
+        print(f"Total in database: {database.get_statistics()['total_papers']}")
+
+    finally:
+        database.close()
+
+    print("=" * 70)
+
+
 def cmd_stats(args):
     """Show database statistics"""
     print("=" * 70)
     print("DATABASE STATISTICS")
     print("=" * 70)
 
-    database = PaperDatabase(Config.DATABASE_PATH)
+    # --verify may need to rebuild the rollup tables
+    database = open_database(read_only=not args.verify)
 
     try:
+        if args.verify:
+            print("\nRecomputing statistics from the paper tables...")
+            mismatches = database.verify_statistics(repair=True)
+            if mismatches:
+                print(f"Found {len(mismatches)} mismatched values:")
+                for mismatch in mismatches[:20]:
+                    print(f"  - {mismatch}")
+                print("Statistics rebuilt")
+            else:
+                print("Statistics are consistent")
+
         stats = database.get_statistics()
 
         print(f"\nTotal papers:        {stats['total_papers']}")
         print(f"Processed:           {stats['processed_papers']}")
         print(f"Unprocessed:         {stats['unprocessed_papers']}")
         print(f"Last 7 days:         {stats['papers_last_7_days']}")
+        if stats['full_texts']:
+            print(f"Full texts stored:   {stats['full_texts']} "
+                  f"({stats['full_text_stored_bytes'] / 1024 / 1024:.1f} MB, "
+                  f"{stats['full_text_raw_bytes'] / 1024 / 1024:.1f} MB uncompressed)")
+
+        if stats['by_primary_category']:
+            print(f"\nTop primary categories:")
+            for category, count in list(stats['by_primary_category'].items())[:10]:
+                print(f"  {category:<20} {count}")
+
+        if args.authors:
+            print(f"\nTop authors:")
+            for author, count in database.get_top_authors(limit=args.authors):
+                print(f"  {author:<40} {count}")
+
+        # Only report an existing cache; opening it would create one
+        if Config.LLM_CACHE_DIR and (Path(Config.LLM_CACHE_DIR) / LLMCache.INDEX_NAME).exists():
+            llm_cache = open_llm_cache()
+            try:
+                llm_stats = llm_cache.get_statistics()
+            finally:
+                llm_cache.close()
+            print(f"LLM cache:           {llm_stats['entries']} responses "
+                  f"({llm_stats['size_bytes'] / 1024 / 1024:.1f} MB, {llm_stats['lifetime_hits']} hits)")
 
         print(f"\nDatabase path:       {Config.DATABASE_PATH}")
         print(f"Markdown output:     {Config.MARKDOWN_OUTPUT_DIR}")
@@ -317,7 +438,7 @@ def cmd_stats(args):
         # Show recent papers
         if args.recent:
             print(f"\nRecent papers:")
-            recent = database.search_papers(limit=args.recent)
+            recent = database.iter_papers(limit=args.recent, columns=['title', 'processed'])
             for paper in recent:
                 status = "" if paper['processed'] else "�"
                 print(f"  {status} [{paper['arxiv_id']}] {paper['title'][:60]}...")
@@ -329,6 +450,122 @@ def cmd_stats(args):
     print("=" * 70)
 
 
+def cmd_db(args):
+    """Show or apply schema migrations"""
+    database = open_database(auto_migrate=False)
+    batch_size = args.batch_size or Config.MIGRATION_BATCH_SIZE
+    migrator = Migrator(database, batch_size=batch_size)
+
+    try:
+        print(f"Database: {Config.DATABASE_PATH}")
+        print(f"Schema version: {migrator.current_version()} (latest: {MIGRATIONS[-1].version})")
+
+        target = getattr(args, 'to', None)
+        plan = migrator.plan(target)
+        if not plan:
+            print("Schema is up to date")
+            return
+
+        print(f"\nPending migrations:")
+        for step in plan:
+            details = []
+            if step['state'] == 'resuming':
+                details.append("resuming")
+            if step['backfill_rows']:
+                details.append(f"backfill {step['backfill_rows']} papers in {step['batches']} batches")
+            if step['finalize']:
+                details.append("finalize")
+            suffix = f" ({', '.join(details)})" if details else ""
+            print(f"  [{step['version']}] {step['name']}{suffix}")
+
+        if args.db_command == 'status' or args.dry_run:
+            if args.db_command == 'migrate':
+                print("\nDry run - no changes made")
+            return
+
+        print(f"\nMigrating (batch size {batch_size})...")
+        migrator.migrate(target=target)
+        print(f"Schema version: {migrator.current_version()}")
+    finally:
+        database.close()
+
+
+def _print_classifier_metrics(metrics: dict):
+    """Print the result of RelevanceClassifier.evaluate"""
+    print(f"Evaluated on:  {metrics['papers']} papers")
+    print(f"Accuracy:      {metrics['accuracy']:.1%} "
+          f"(precision {metrics['precision']:.1%}, recall {metrics['recall']:.1%})")
+    print(f"Decided locally: {metrics['coverage']:.1%} "
+          f"({metrics['auto_accepted']} accepted, {metrics['auto_rejected']} rejected, "
+          f"{metrics['deferred']} left for the LLM)")
+    print(f"Local accuracy: {metrics['auto_accuracy']:.1%} "
+          f"({metrics['false_rejects']} relevant papers rejected)")
+
+
+def cmd_classifier(args):
+    """Train or evaluate the local relevance classifier"""
+    print("=" * 70)
+    print(f"RELEVANCE CLASSIFIER - {args.classifier_command.upper()}")
+    print("=" * 70)
+
+    model_path = args.model or Config.RELEVANCE_MODEL_PATH
+    if not model_path:
+        print("ERROR: Set RELEVANCE_MODEL_PATH or pass --model")
+        sys.exit(1)
+
+    classifier = None
+    holdout = getattr(args, 'holdout', None)
+    if args.classifier_command == 'evaluate':
+        if not Path(model_path).exists():
+            print(f"ERROR: Model not found: {model_path}")
+            print("Run 'classifier train' first")
+            sys.exit(1)
+        classifier = RelevanceClassifier.load(
+            model_path,
+            accept_threshold=Config.RELEVANCE_ACCEPT,
+            reject_threshold=Config.RELEVANCE_REJECT
+        )
+        # Evaluate on exactly the papers train held out
+        holdout = classifier.metadata.get('holdout', 0.2)
+        print(f"Model trained {classifier.metadata.get('trained_at', 'unknown')[:19]} "
+              f"on {classifier.metadata.get('train_papers', '?')} papers (holdout {holdout:g})")
+
+    database = open_database(read_only=True)
+    try:
+        labeled = database.get_relevance_labels(NOT_RELEVANT_SUMMARY)
+    finally:
+        database.close()
+
+    # The split depends only on the arXiv ID and the holdout share stored with the model
+    train = [p for p in labeled if not holdout_split(p['arxiv_id'], holdout)]
+    test = [p for p in labeled if holdout_split(p['arxiv_id'], holdout)]
+    relevant = sum(p['label'] for p in labeled)
+    print(f"Labeled papers: {len(labeled)} ({relevant} relevant, {len(labeled) - relevant} not relevant)")
+
+    if args.classifier_command == 'train':
+        print(f"Training on {len(train)} papers ({args.epochs} epochs)...")
+        classifier = RelevanceClassifier(
+            accept_threshold=Config.RELEVANCE_ACCEPT,
+            reject_threshold=Config.RELEVANCE_REJECT
+        )
+        try:
+            classifier.fit(train, [p['label'] for p in train], epochs=args.epochs)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        classifier.metadata['holdout'] = holdout
+        classifier.save(model_path)
+        print(f"✓ Saved model to {model_path}")
+
+    print()
+    if test:
+        _print_classifier_metrics(classifier.evaluate(test, [p['label'] for p in test]))
+    else:
+        print("No held-out papers to evaluate on (train with --holdout)")
+
+    print("=" * 70)
+
+
 def cmd_config(args):
     """Show configuration"""
     Config.print_config()
@@ -340,41 +577,39 @@ def cmd_export(args):
     print("EXPORT TO MARKDOWN")
     print("=" * 70)
 
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database(read_only=True)
     exporter = MarkdownExporter(Config.MARKDOWN_OUTPUT_DIR)
 
     try:
-        # Get papers
-        if args.processed_only:
-            papers = database.search_papers(processed_only=True, limit=args.limit)
-        else:
-            papers = database.search_papers(limit=args.limit)
-
-        if not papers:
-            print("No papers found to export")
-            return
-
-        print(f"Exporting {len(papers)} papers...\n")
+        # Stream papers with their summaries page by page
+        papers = database.iter_papers(
+            processed_only=args.processed_only,
+            with_summaries=True,
+            limit=args.limit,
+            page_size=args.fetch_size
+        )
 
-        # Get papers with summaries
-        papers_with_summaries = []
-        for paper in papers:
-            full_data = database.get_paper_with_summary(paper['id'])
-            if full_data:
-                papers_with_summaries.append(full_data)
+        limit_note = f" (up to {args.limit})" if args.limit else ""
+        print(f"Exporting papers{limit_note}...\n")
 
         # Export
-        created_files = exporter.export_multiple_papers(
-            papers_with_summaries,
-            create_index=True
-        )
+        created_files = exporter.export_multiple_papers(papers, create_index=True)
+
+        if not created_files:
+            print("No papers found to export")
+            return
 
         print(f"\n Exported {len(created_files)} papers")
         print(f"  Output directory: {Config.MARKDOWN_OUTPUT_DIR}")
 
-        # Create collection summary
+        # Create collection summary (a second streamed pass without summaries)
         if args.summary:
-            exporter.create_collection_summary(papers_with_summaries)
+            exporter.create_collection_summary(database.iter_papers(
+                processed_only=args.processed_only,
+                columns=['title', 'abstract_link', 'categories', 'processed'],
+                limit=args.limit,
+                page_size=args.fetch_size
+            ))
             print(f" Collection summary created")
 
     finally:
@@ -385,7 +620,7 @@ def cmd_export(args):
 
 def cmd_research(args):
     """Perform deep research query on papers"""
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database(read_only=True)
 
     if not Config.SUMMARY_API_KEY:
         print("ERROR: SUMMARY_API_KEY must be set to use research features")
@@ -397,7 +632,8 @@ def cmd_research(args):
             api_key=Config.SUMMARY_API_KEY,
             base_url=Config.SUMMARY_BASE_URL,
             database=database,
-            model_name=Config.SUMMARY_MODEL
+            model_name=Config.SUMMARY_MODEL,
+            llm_cache=open_llm_cache()
         )
 
         # Execute research query
@@ -420,7 +656,7 @@ def cmd_research(args):
 
 def cmd_compare(args):
     """Perform comparative analysis on papers"""
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database(read_only=True)
 
     if not Config.SUMMARY_API_KEY:
         print("ERROR: SUMMARY_API_KEY must be set to use research features")
@@ -432,7 +668,8 @@ def cmd_compare(args):
             api_key=Config.SUMMARY_API_KEY,
             base_url=Config.SUMMARY_BASE_URL,
             database=database,
-            model_name=Config.SUMMARY_MODEL
+            model_name=Config.SUMMARY_MODEL,
+            llm_cache=open_llm_cache()
         )
 
         # Parse aspects
@@ -458,7 +695,7 @@ def cmd_compare(args):
 
 def cmd_trends(args):
     """Analyze research trends"""
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database(read_only=True)
 
     if not Config.SUMMARY_API_KEY:
         print("ERROR: SUMMARY_API_KEY must be set to use research features")
@@ -470,7 +707,8 @@ def cmd_trends(args):
             api_key=Config.SUMMARY_API_KEY,
             base_url=Config.SUMMARY_BASE_URL,
             database=database,
-            model_name=Config.SUMMARY_MODEL
+            model_name=Config.SUMMARY_MODEL,
+            llm_cache=open_llm_cache()
         )
 
         # Execute trend analysis
@@ -492,7 +730,7 @@ def cmd_trends(args):
 
 def cmd_connections(args):
     """Find connections between papers"""
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database(read_only=True)
 
     if not Config.SUMMARY_API_KEY:
         print("ERROR: SUMMARY_API_KEY must be set to use research features")
@@ -504,7 +742,8 @@ def cmd_connections(args):
             api_key=Config.SUMMARY_API_KEY,
             base_url=Config.SUMMARY_BASE_URL,
             database=database,
-            model_name=Config.SUMMARY_MODEL
+            model_name=Config.SUMMARY_MODEL,
+            llm_cache=open_llm_cache()
         )
 
         # Find connections
@@ -525,7 +764,7 @@ def cmd_connections(args):
 
 def cmd_custom(args):
     """Execute custom research prompt"""
-    database = PaperDatabase(Config.DATABASE_PATH)
+    database = open_database(read_only=True)
 
     if not Config.SUMMARY_API_KEY:
         print("ERROR: SUMMARY_API_KEY must be set to use research features")
@@ -537,7 +776,8 @@ def cmd_custom(args):
             api_key=Config.SUMMARY_API_KEY,
             base_url=Config.SUMMARY_BASE_URL,
             database=database,
-            model_name=Config.SUMMARY_MODEL
+            model_name=Config.SUMMARY_MODEL,
+            llm_cache=open_llm_cache()
         )
 
         # Execute custom prompt
@@ -568,10 +808,17 @@ def cmd_ocr(args):
         sys.exit(1)
 
     # Initialize OCR processor
+    use_cache = bool(Config.OCR_CACHE_DIR) and not args.no_cache
     ocr_processor = PDFOCRProcessor(
         api_key=Config.OCR_API_KEY,
         base_url=Config.OCR_BASE_URL,
-        model_name=Config.OCR_MODEL
+        model_name=Config.OCR_MODEL,
+        max_concurrency=args.concurrency or Config.OCR_CONCURRENCY,
+        use_text_layer=Config.USE_TEXT_LAYER and not args.ocr_all,
+        text_layer_min_quality=Config.TEXT_LAYER_MIN_QUALITY,
+        cache=OCRCache(Config.OCR_CACHE_DIR, Config.OCR_CACHE_MAX_MB) if use_cache else None,
+        pdf_store=PDFStore(Config.PDF_STORE_DIR, Config.PDF_STORE_QUOTA_MB,
+                           protect_seconds=Config.JOB_LEASE_SECONDS) if Config.PDF_STORE_DIR else None
     )
 
     try:
@@ -609,7 +856,12 @@ def cmd_ocr(args):
         total_chars = len(full_text)
         total_pages = len(extracted_text_dict)
 
+        text_layer_pages = sum(
+            1 for source in ocr_processor.last_page_sources.values() if source == 'text_layer'
+        )
+
         print(f"\n Extracted {total_chars:,} characters from {total_pages} pages")
+        print(f"  Text layer: {text_layer_pages} pages, OCR: {total_pages - text_layer_pages} pages")
 
         # Determine output path
         if args.output:
@@ -640,7 +892,8 @@ def cmd_ocr(args):
         for page_key in pages:
             page_num = page_key.split('_')[1]
             page_text = extracted_text_dict[page_key]
-            markdown_content += f"## Page {page_num}\n\n{page_text}\n\n---\n\n"
+            source = ocr_processor.last_page_sources.get(page_key, 'ocr').replace('_', ' ')
+            markdown_content += f"## Page {page_num} ({source})\n\n{page_text}\n\n---\n\n"
 
         # Write to file
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -677,12 +930,26 @@ Examples:
   # Process papers (OCR + Summarize)
   python main.py process --batch-size 5 --max-pages 15
 
+  # Score the relevance of newly harvested papers in batches
+  python main.py triage --limit 500
+
   # Start continuous crawler
   python main.py crawl --interval 6
 
+  # Bulk-harvest quant-ph metadata over OAI-PMH (resumable, incremental)
+  python main.py harvest --set physics:quant-ph --from 2024-01-01
+
   # Show statistics
   python main.py stats --recent 10
 
+  # Preview and apply schema migrations
+  python main.py db migrate --dry-run
+  python main.py db migrate
+
+  # Train and evaluate the local relevance classifier on stored labels
+  python main.py classifier train --holdout 0.2
+  python main.py classifier evaluate
+
   # Export to markdown
   python main.py export --processed-only --summary
 
@@ -717,6 +984,10 @@ Examples:
     search_parser.add_argument('--keywords', '-k', help='Search keywords')
     search_parser.add_argument('--category', '-c', help='ArXiv category (e.g., quant-ph)')
     search_parser.add_argument('--max-results', '-m', type=int, default=50, help='Maximum results (default: 50)')
+    search_parser.add_argument('--all', action='store_true',
+                              help='Page through every matching result (ignores --max-results)')
+    search_parser.add_argument('--page-size', type=int, default=200,
+                              help='Results requested per API call (default: 200, max: 2000)')
     search_parser.add_argument('--no-filter', dest='filter_quantum', action='store_false',
                               help='Disable quantum-related filtering')
     search_parser.set_defaults(func=cmd_search, filter_quantum=True)
@@ -727,8 +998,18 @@ Examples:
                                help='Number of papers to process (default: 5)')
     process_parser.add_argument('--max-pages', '-p', type=int, default=15,
                                help='Max pages to OCR per paper (default: 15)')
+    process_parser.add_argument('--retry-failed', action='store_true',
+                               help='Requeue papers that failed too many times before claiming')
     process_parser.set_defaults(func=cmd_process)
 
+    # Triage command
+    triage_parser = subparsers.add_parser('triage', help='Score the relevance of unprocessed papers in batches')
+    triage_parser.add_argument('--limit', '-l', type=int, default=500,
+                              help='Maximum papers to score (default: 500)')
+    triage_parser.add_argument('--chunk-size', type=int, default=200,
+                              help='Papers loaded and scored per round (default: 200)')
+    triage_parser.set_defaults(func=cmd_triage)
+
     # Crawl command
     crawl_parser = subparsers.add_parser('crawl', help='Start continuous crawler')
     crawl_parser.add_argument('--interval', '-i', type=int, default=6,
@@ -737,11 +1018,60 @@ Examples:
                              help='Run once and exit')
     crawl_parser.set_defaults(func=cmd_crawl)
 
+    # Harvest command
+    harvest_parser = subparsers.add_parser('harvest', help='Bulk-harvest category metadata over OAI-PMH')
+    harvest_parser.add_argument('--set', '-s', action='append',
+                               help='OAI-PMH set to harvest, repeatable (default: physics:quant-ph)')
+    harvest_parser.add_argument('--from', dest='from_date',
+                               help='Harvest records changed on or after YYYY-MM-DD '
+                                    '(default: date of the last completed harvest)')
+    harvest_parser.add_argument('--until', dest='until_date',
+                               help='Harvest records changed on or before YYYY-MM-DD')
+    harvest_parser.add_argument('--categories', '-c',
+                               help='Comma-separated categories to keep (e.g., "quant-ph,cs.ET")')
+    harvest_parser.add_argument('--filter-quantum', action='store_true',
+                               help='Only keep quantum-related records')
+    harvest_parser.add_argument('--restart', action='store_true',
+                               help='Ignore a saved resumption token and start over')
+    harvest_parser.add_argument('--base-url', help='OAI-PMH endpoint (default: OAI_BASE_URL)')
+    harvest_parser.set_defaults(func=cmd_harvest)
+
     # Stats command
     stats_parser = subparsers.add_parser('stats', help='Show database statistics')
     stats_parser.add_argument('--recent', '-r', type=int, help='Show N recent papers')
+    stats_parser.add_argument('--authors', '-a', type=int, help='Show the N most prolific authors')
+    stats_parser.add_argument('--verify', action='store_true',
+                             help='Recompute statistics from scratch and repair them if they drifted')
     stats_parser.set_defaults(func=cmd_stats)
 
+    # Db command
+    db_parser = subparsers.add_parser('db', help='Show or apply database schema migrations')
+    db_subparsers = db_parser.add_subparsers(dest='db_command', required=True)
+    db_status_parser = db_subparsers.add_parser('status', help='Show schema version and pending migrations')
+    db_status_parser.set_defaults(func=cmd_db, batch_size=None, dry_run=False)
+    db_migrate_parser = db_subparsers.add_parser('migrate', help='Apply pending migrations')
+    db_migrate_parser.add_argument('--dry-run', action='store_true',
+                                  help='Show the migration plan without changing the database')
+    db_migrate_parser.add_argument('--batch-size', type=int,
+                                  help='Papers backfilled per transaction (default: MIGRATION_BATCH_SIZE)')
+    db_migrate_parser.add_argument('--to', type=int, help='Stop after this schema version')
+    db_migrate_parser.set_defaults(func=cmd_db)
+
+    # Classifier command
+    classifier_parser = subparsers.add_parser('classifier', help='Train or evaluate the local relevance classifier')
+    classifier_subparsers = classifier_parser.add_subparsers(dest='classifier_command', required=True)
+    classifier_train_parser = classifier_subparsers.add_parser('train', help='Train on stored relevance labels')
+    classifier_train_parser.add_argument('--epochs', type=int, default=300,
+                                        help='Training iterations (default: 300)')
+    classifier_train_parser.add_argument('--holdout', type=float, default=0.2,
+                                        help='Share of labeled papers held out for evaluation (default: 0.2)')
+    classifier_evaluate_parser = classifier_subparsers.add_parser(
+        'evaluate', help='Evaluate on the labels held out when the model was trained'
+    )
+    for sub in (classifier_train_parser, classifier_evaluate_parser):
+        sub.add_argument('--model', help='Model file (default: RELEVANCE_MODEL_PATH)')
+        sub.set_defaults(func=cmd_classifier)
+
     # Config command
     config_parser = subparsers.add_parser('config', help='Show configuration')
     config_parser.set_defaults(func=cmd_config)
@@ -750,8 +1080,11 @@ Examples:
     export_parser = subparsers.add_parser('export', help='Export papers to markdown')
     export_parser.add_argument('--processed-only', action='store_true',
                               help='Only export processed papers')
-    export_parser.add_argument('--limit', '-l', type=int, default=1000,
-                              help='Maximum papers to export (default: 1000)')
+    export_parser.add_argument('--limit', '-l', type=int, default=None,
+                              help='Maximum papers to export (default: all)')
+    export_parser.add_argument('--fetch-size', type=int, default=None,
+                              help='Papers read from the database per query '
+                                   '(default: DATABASE_FETCH_SIZE)')
     export_parser.add_argument('--summary', '-s', action='store_true',
                               help='Create collection summary')
     export_parser.set_defaults(func=cmd_export)
@@ -832,10 +1165,19 @@ Examples:
                            help='Maximum pages to process (default: 20)')
     ocr_parser.add_argument('--preview', action='store_true',
                            help='Show preview of extracted text')
+    ocr_parser.add_argument('--concurrency', type=int,
+                           help='OCR requests in flight at once (default: OCR_CONCURRENCY)')
+    ocr_parser.add_argument('--ocr-all', action='store_true',
+                           help='Send every page to the OCR model, ignoring the PDF text layer')
+    ocr_parser.add_argument('--no-cache', action='store_true',
+                           help='Bypass the OCR result cache')
     ocr_parser.set_defaults(func=cmd_ocr)
 
     args = parser.parse_args()
 
+    if args.command == 'harvest' and not args.set:
+        args.set = ['physics:quant-ph']
+
     if not args.command:
         parser.print_help()
         sys.exit(1)
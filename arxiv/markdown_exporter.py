@@ -3,8 +3,9 @@
 Export paper summaries to markdown files
 """
 
+import heapq
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from pathlib import Path
 from datetime import datetime
 
@@ -132,20 +133,27 @@ class MarkdownExporter:
 
         return str(filepath)
 
+    # Fields kept per paper for the index, so streamed exports stay small
+    INDEX_FIELDS = ('title', 'arxiv_id', 'abstract_link', 'published', 'categories')
+
     def export_multiple_papers(self,
-                              papers_with_summaries: List[Dict],
+                              papers_with_summaries: Iterable[Dict],
                               create_index: bool = True) -> List[str]:
         """
         Export multiple papers to markdown
 
+        Papers may be streamed (e.g. from PaperDatabase.iter_papers); only
+        the few fields needed for the index are kept after each export.
+
         Args:
-            papers_with_summaries: List of paper dictionaries with summaries
+            papers_with_summaries: Paper dictionaries with summaries
             create_index: Create an index file
 
         Returns:
             List of created file paths
         """
         created_files = []
+        index_entries = []
 
         for paper in papers_with_summaries:
             try:
@@ -157,10 +165,16 @@ class MarkdownExporter:
                 created_files.append(filepath)
             except Exception as e:
                 print(f"Error exporting paper {paper.get('arxiv_id', 'unknown')}: {e}")
+                continue
+
+            if create_index:
+                entry = {field: paper.get(field) for field in self.INDEX_FIELDS}
+                entry['methodology_summary'] = bool(paper.get('methodology_summary'))
+                index_entries.append(entry)
 
         # Create index file
         if create_index and created_files:
-            self._create_index(papers_with_summaries)
+            self._create_index(index_entries)
 
         return created_files
 
@@ -225,34 +239,29 @@ class MarkdownExporter:
 
         print(f"Index created at: {index_path}")
 
-    def create_collection_summary(self, papers: List[Dict], output_name: str = "COLLECTION_SUMMARY.md"):
+    def create_collection_summary(self, papers: Iterable[Dict], output_name: str = "COLLECTION_SUMMARY.md"):
         """
         Create a summary of all papers in the collection
 
         Args:
-            papers: List of papers
+            papers: Papers (a list or a stream)
             output_name: Output filename
         """
         filepath = self.output_dir / output_name
 
-        content = f"""# Quantum Computing Papers Collection Summary
-
-**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-**Total Papers**: {len(papers)}
-
----
-
-## Statistics
-
-"""
-
-        # Calculate statistics
+        # Calculate statistics in one pass, so papers can be streamed
         from collections import Counter
 
-        # By category
-        all_categories = []
+        total = 0
+        processed = 0
+        category_counts = Counter()
+        year_counts = Counter()
+        recent = []  # min-heap of the 10 most recent papers
+
         for paper in papers:
+            total += 1
+
+            # By category
             categories = paper.get('categories', [])
             if isinstance(categories, str):
                 import json
@@ -260,29 +269,48 @@ class MarkdownExporter:
                     categories = json.loads(categories)
                 except:
                     categories = [categories]
-            all_categories.extend(categories)
+            category_counts.update(categories)
 
-        category_counts = Counter(all_categories)
+            # Processed vs unprocessed
+            if paper.get('processed', False):
+                processed += 1
+
+            # By year
+            published = paper.get('published') or ''
+            if published:
+                year_counts[published[:4]] += 1
+
+            item = (published, -total, {
+                'title': paper['title'],
+                'arxiv_id': paper['arxiv_id'],
+                'abstract_link': paper.get('abstract_link'),
+                'published': paper.get('published')
+            })
+            if len(recent) < 10:
+                heapq.heappush(recent, item)
+            else:
+                heapq.heappushpop(recent, item)
+
+        content = f"""# Quantum Computing Papers Collection Summary
+
+**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+**Total Papers**: {total}
+
+---
+
+## Statistics
+
+"""
 
         content += "### Papers by Category\n\n"
         for cat, count in category_counts.most_common():
             content += f"- **{cat}**: {count} papers\n"
 
-        # Processed vs unprocessed
-        processed = sum(1 for p in papers if p.get('processed', False))
         content += f"\n### Processing Status\n\n"
         content += f"- Processed: {processed}\n"
-        content += f"- Unprocessed: {len(papers) - processed}\n"
-
-        # By year
-        years = []
-        for paper in papers:
-            published = paper.get('published', '')
-            if published:
-                year = published[:4]
-                years.append(year)
+        content += f"- Unprocessed: {total - processed}\n"
 
-        year_counts = Counter(years)
         content += f"\n### Papers by Year\n\n"
         for year, count in sorted(year_counts.items(), reverse=True):
             content += f"- **{year}**: {count} papers\n"
@@ -291,11 +319,7 @@ class MarkdownExporter:
         content += "## Recent Papers\n\n"
 
         # List most recent papers
-        sorted_papers = sorted(
-            papers,
-            key=lambda p: p.get('published', ''),
-            reverse=True
-        )[:10]
+        sorted_papers = [entry for _, _, entry in sorted(recent, key=lambda item: item[:2], reverse=True)]
 
         for i, paper in enumerate(sorted_papers, 1):
             content += f"{i}. **{paper['title']}**\n"
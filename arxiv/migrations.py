@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the paper database
+
+Each migration has a schema step (idempotent DDL, applied in one short
+transaction), an optional backfill that fills the new structures for
+papers that already exist, and an optional finalize step. Backfills walk
+papers.id in chunks and commit after every chunk, recording their
+position in schema_version, so the crawler can keep writing between
+chunks and an interrupted migration resumes where it stopped.
+
+Papers inserted after a schema step are maintained by its triggers, so a
+backfill only has to cover ids up to MAX(papers.id) at the time the step
+was applied.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class Migration:
+    """One ordered schema change"""
+
+    def __init__(self,
+                 version: int,
+                 name: str,
+                 schema: str,
+                 backfill: Optional[str] = None,
+                 finalize: Optional[str] = None):
+        """
+        Initialize migration
+
+        Args:
+            version: Position in the migration order (1, 2, ...)
+            name: Short description shown by 'db status'
+            schema: PaperDatabase method taking a cursor that applies the DDL
+            backfill: PaperDatabase method taking (cursor, after_id, up_to_id)
+                that fills existing papers in that id range
+            finalize: PaperDatabase method taking a cursor, run once after
+                the backfill
+        """
+        self.version = version
+        self.name = name
+        self.schema = schema
+        self.backfill = backfill
+        self.finalize = finalize
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "papers, summaries and search history", "_create_base_tables"),
+    Migration(2, "harvest checkpoints and search cursors", "_create_harvest_tables"),
+    Migration(3, "full-text search index", "_create_fts_index", backfill="_backfill_fts"),
+    Migration(4, "normalized categories and authors", "_create_link_tables", backfill="_backfill_links"),
+    Migration(5, "compressed paper texts", "_create_text_table"),
+    Migration(6, "processing job queue", "_create_jobs_table", backfill="_backfill_jobs"),
+    Migration(7, "statistics rollups", "_create_stats_rollups", finalize="_rebuild_statistics"),
+    Migration(8, "structured summaries", "_add_structured_summary_column"),
+    Migration(9, "chunk summary cache", "_create_chunk_summary_table"),
+    Migration(10, "relevance check timestamps", "_add_relevance_checked_column"),
+    Migration(11, "relevance score sources", "_add_relevance_source_column"),
+]
+
+
+class Migrator:
+    """Applies pending migrations to a PaperDatabase"""
+
+    def __init__(self,
+                 database,
+                 batch_size: int = 5000,
+                 log: Callable[[str], None] = print,
+                 migrations: Optional[List[Migration]] = None):
+        """
+        Initialize migrator
+
+        Args:
+            database: PaperDatabase to migrate (opened read-write)
+            batch_size: Paper ids covered by each backfill transaction
+            log: Function receiving progress messages
+            migrations: Migration list (default: MIGRATIONS)
+        """
+        self.database = database
+        self.batch_size = batch_size
+        self.log = log
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+
+    @property
+    def conn(self):
+        return self.database.conn
+
+    def _ensure_version_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                backfill_position INTEGER NOT NULL DEFAULT 0,
+                backfill_end INTEGER NOT NULL DEFAULT 0,
+                completed_at TIMESTAMP
+            )
+        """)
+        self.conn.commit()
+
+    def _applied(self) -> Dict[int, Dict]:
+        """Get schema_version rows by version (empty if the table is missing)"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'schema_version'"
+        ).fetchone() is not None
+        if not exists:
+            return {}
+        rows = self.conn.execute("SELECT * FROM schema_version").fetchall()
+        return {row['version']: dict(row) for row in rows}
+
+    def current_version(self) -> int:
+        """Get the highest fully applied migration version (0 if none)"""
+        applied = self._applied()
+        version = 0
+        for migration in self.migrations:
+            row = applied.get(migration.version)
+            if row is None or row['completed_at'] is None:
+                break
+            version = migration.version
+        return version
+
+    def pending(self, target: Optional[int] = None) -> List[Migration]:
+        """Get migrations that are not applied or not completed, in order"""
+        applied = self._applied()
+        return [
+            m for m in self.migrations
+            if (target is None or m.version <= target)
+            and (m.version not in applied or applied[m.version]['completed_at'] is None)
+        ]
+
+    def _max_paper_id(self) -> int:
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'papers'"
+        ).fetchone() is not None
+        if not exists:
+            return 0
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM papers").fetchone()[0]
+
+    def plan(self, target: Optional[int] = None) -> List[Dict]:
+        """
+        Describe what migrate() would do
+
+        Args:
+            target: Stop after this version (default: latest)
+
+        Returns:
+            One dictionary per pending migration with 'version', 'name',
+            'state' ('new' or 'resuming'), 'backfill_rows' (papers left to
+            backfill), 'batches' and 'finalize'
+        """
+        applied = self._applied()
+        max_id = self._max_paper_id()
+        steps = []
+        for migration in self.pending(target):
+            row = applied.get(migration.version)
+            position = row['backfill_position'] if row else 0
+            end = row['backfill_end'] if row else max_id
+
+            rows = 0
+            if migration.backfill and end > position:
+                rows = self.conn.execute(
+                    "SELECT COUNT(*) FROM papers WHERE id > ? AND id <= ?", (position, end)
+                ).fetchone()[0]
+
+            steps.append({
+                'version': migration.version,
+                'name': migration.name,
+                'state': 'resuming' if row else 'new',
+                'backfill_rows': rows,
+                'batches': -(-(end - position) // self.batch_size) if rows else 0,
+                'finalize': migration.finalize is not None
+            })
+        return steps
+
+    def _run_in_transaction(self, step: Callable):
+        """Run step(cursor) inside BEGIN IMMEDIATE and commit"""
+        cursor = self.conn.cursor()
+        try:
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            step(cursor)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    @staticmethod
+    def _version_row(cursor, version: int) -> Optional[Dict]:
+        row = cursor.execute("SELECT * FROM schema_version WHERE version = ?", (version,)).fetchone()
+        return dict(row) if row else None
+
+    def _apply(self, migration: Migration):
+        """
+        Apply one migration, resuming a partial run
+
+        Every step re-reads its schema_version row inside its own write
+        transaction, so two processes opening the database at once never
+        apply the same step twice.
+        """
+        database = self.database
+
+        def schema_step(cursor):
+            if self._version_row(cursor, migration.version) is not None:
+                return
+            getattr(database, migration.schema)(cursor)
+            # Papers above this id get the new structures from triggers
+            end = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM papers").fetchone()[0]
+            cursor.execute("""
+                INSERT INTO schema_version (version, name, backfill_end) VALUES (?, ?, ?)
+            """, (migration.version, migration.name, end if migration.backfill else 0))
+            self.log(f"  [{migration.version}] {migration.name}: schema applied")
+
+        self._run_in_transaction(schema_step)
+
+        if migration.backfill:
+            backfill = getattr(database, migration.backfill)
+            started = time.time()
+            progress = {}
+
+            def backfill_step(cursor):
+                row = self._version_row(cursor, migration.version)
+                position, end = row['backfill_position'], row['backfill_end']
+                up_to = min(position + self.batch_size, end)
+                if up_to > position:
+                    backfill(cursor, position, up_to)
+                    cursor.execute(
+                        "UPDATE schema_version SET backfill_position = ? WHERE version = ?",
+                        (up_to, migration.version)
+                    )
+                progress.update(position=up_to, end=end, moved=up_to > position)
+
+            while True:
+                self._run_in_transaction(backfill_step)
+                if not progress['moved']:
+                    break
+                self.log(f"  [{migration.version}] backfilled ids up to "
+                         f"{progress['position']}/{progress['end']}")
+            if progress['end']:
+                self.log(f"  [{migration.version}] backfill done in {time.time() - started:.1f}s")
+
+        def finalize_step(cursor):
+            if self._version_row(cursor, migration.version)['completed_at'] is not None:
+                return
+            if migration.finalize:
+                getattr(database, migration.finalize)(cursor)
+            cursor.execute(
+                "UPDATE schema_version SET completed_at = CURRENT_TIMESTAMP WHERE version = ?",
+                (migration.version,)
+            )
+
+        self._run_in_transaction(finalize_step)
+
+    def migrate(self, dry_run: bool = False, target: Optional[int] = None) -> List[Dict]:
+        """
+        Apply pending migrations in order
+
+        Args:
+            dry_run: Only return the plan, without changing the database
+            target: Stop after this version (default: latest)
+
+        Returns:
+            The plan of migrations that were (or would be) applied
+        """
+        steps = self.plan(target)
+        if dry_run or not steps:
+            return steps
+
+        self._ensure_version_table()
+        for migration in self.pending(target):
+            self._apply(migration)
+        return steps
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+OAI-PMH bulk metadata harvester for arXiv
+
+Harvests complete category sets (e.g. physics:quant-ph) with ListRecords
+in the arXivRaw format, stream-parses each response page and loads the
+records into PaperDatabase. The resumption token is checkpointed after
+every page, so an interrupted harvest continues where it stopped, and a
+harvest without a start date picks up from the last completed run.
+"""
+
+import re
+import urllib.parse
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, IO, Iterator, List, Optional
+
+from arxiv_search import ArxivSearcher
+from database import PaperDatabase
+from http_client import HTTPClient, get_http_client
+
+OAI_NS = '{http://www.openarchives.org/OAI/2.0/}'
+ARXIV_RAW_NS = '{http://arxiv.org/OAI/arXivRaw/}'
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+
+class OAIHarvestError(Exception):
+    """OAI-PMH protocol error returned by the repository"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class OAIHarvester:
+    """Bulk harvester for arXiv metadata over OAI-PMH"""
+
+    def __init__(self,
+                 database: PaperDatabase,
+                 base_url: str = "https://oaipmh.arxiv.org/oai",
+                 http_client: Optional[HTTPClient] = None):
+        """
+        Initialize harvester
+
+        Args:
+            database: PaperDatabase to load records into
+            base_url: OAI-PMH endpoint (point at a local stub server for testing)
+            http_client: HTTP client to use (default: shared rate-limited client)
+        """
+        self.database = database
+        self.base_url = base_url
+        self.http_client = http_client or get_http_client()
+        self.searcher = ArxivSearcher(http_client=self.http_client)
+
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> str:
+        """Convert an arXivRaw RFC 2822 version date to ISO 8601"""
+        if not value:
+            return 'N/A'
+        try:
+            return parsedate_to_datetime(value).strftime('%Y-%m-%dT%H:%M:%SZ')
+        except (TypeError, ValueError):
+            return value
+
+    @staticmethod
+    def _split_authors(authors: str) -> List[str]:
+        """Split an arXivRaw author string ('A, B and C') into names"""
+        authors = re.sub(r'\s+', ' ', authors or '').strip()
+        if not authors:
+            return []
+        parts = re.split(r',\s*|\s+and\s+', authors)
+        return [part.strip() for part in parts if part.strip()]
+
+    def _parse_record(self, record: ET.Element) -> Optional[Dict]:
+        """Parse one OAI record into a paper dictionary (None if deleted)"""
+        header = record.find(OAI_NS + 'header')
+        if header is not None and header.get('status') == 'deleted':
+            return None
+
+        meta = record.find(f'{OAI_NS}metadata/{ARXIV_RAW_NS}arXivRaw')
+        if meta is None:
+            return None
+
+        def text(tag: str) -> str:
+            elem = meta.find(ARXIV_RAW_NS + tag)
+            return re.sub(r'\s+', ' ', elem.text).strip() if elem is not None and elem.text else ''
+
+        versions = meta.findall(ARXIV_RAW_NS + 'version')
+        first_date = versions[0].findtext(ARXIV_RAW_NS + 'date') if versions else None
+        last_date = versions[-1].findtext(ARXIV_RAW_NS + 'date') if versions else None
+        latest_version = versions[-1].get('version', 'v1') if versions else 'v1'
+
+        arxiv_id = f"{text('id')}{latest_version}"
+
+        return {
+            'arxiv_id': arxiv_id,
+            'title': text('title') or 'N/A',
+            'abstract': text('abstract') or 'N/A',
+            'authors': self._split_authors(text('authors')),
+            'categories': text('categories').split(),
+            'published': self._parse_date(first_date),
+            'updated': self._parse_date(last_date),
+            'pdf_link': f'https://arxiv.org/pdf/{arxiv_id}.pdf',
+            'abstract_link': f'https://arxiv.org/abs/{arxiv_id}',
+            'fetched_at': datetime.now().isoformat()
+        }
+
+    def _iter_page(self, stream: IO[bytes], page_info: Dict) -> Iterator[Dict]:
+        """
+        Stream-parse one ListRecords response
+
+        Args:
+            stream: File-like object with the XML response
+            page_info: Receives 'resumption_token', 'complete_list_size'
+                and 'response_date'
+
+        Yields:
+            Paper dictionaries
+        """
+        list_records = None
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == OAI_NS + 'ListRecords':
+                    list_records = elem
+                continue
+
+            if elem.tag == OAI_NS + 'record':
+                paper = self._parse_record(elem)
+                # Detach the parsed record so memory does not grow with the page size
+                elem.clear()
+                if list_records is not None:
+                    list_records.remove(elem)
+                if paper is not None:
+                    yield paper
+            elif elem.tag == OAI_NS + 'resumptionToken':
+                page_info['resumption_token'] = (elem.text or '').strip() or None
+                page_info['complete_list_size'] = elem.get('completeListSize')
+            elif elem.tag == OAI_NS + 'responseDate':
+                page_info['response_date'] = (elem.text or '').strip()
+            elif elem.tag == OAI_NS + 'error':
+                raise OAIHarvestError(elem.get('code', 'unknown'), (elem.text or '').strip())
+
+    def _store_batch(self, papers: List[Dict]) -> int:
+        """
+        Load a page of records into the database, returning the new count
+
+        Records are matched on their unversioned ID: a paper already stored
+        under another version (by an earlier harvest or by search) keeps its
+        row, and so its job, and has its metadata refreshed instead.
+        """
+        stored = self.database.get_stored_arxiv_ids([paper['arxiv_id'] for paper in papers])
+        new_papers = []
+        revised_papers = []
+        for paper in papers:
+            stored_id = stored.get(_VERSION_SUFFIX.sub('', paper['arxiv_id']))
+            if stored_id is None:
+                new_papers.append(paper)
+            else:
+                revised_papers.append({**paper, 'arxiv_id': stored_id})
+
+        if revised_papers:
+            self.database.insert_papers_bulk(revised_papers, update_existing=True)
+        return self.database.insert_papers_bulk(new_papers)['inserted']
+
+    def harvest(self,
+                set_spec: str = "physics:quant-ph",
+                from_date: Optional[str] = None,
+                until_date: Optional[str] = None,
+                categories: Optional[List[str]] = None,
+                filter_quantum: bool = False,
+                restart: bool = False) -> Dict:
+        """
+        Harvest a set into the database, resuming from a checkpoint if possible
+
+        Args:
+            set_spec: OAI-PMH set (e.g. 'physics:quant-ph')
+            from_date: Lower datestamp bound (YYYY-MM-DD); defaults to the
+                date of the last completed harvest of this set
+            until_date: Upper datestamp bound (YYYY-MM-DD)
+            categories: Only keep records listed in one of these categories
+            filter_quantum: Only keep quantum-related records
+            restart: Ignore any saved resumption token
+
+        Returns:
+            Dictionary with harvest counts
+        """
+        if from_date is None:
+            last_run = self.database.get_last_completed_harvest(set_spec)
+            if last_run and last_run.get('response_date'):
+                from_date = last_run['response_date'][:10]
+                print(f"Incremental harvest from last completed run: {from_date}")
+
+        checkpoint = self.database.get_harvest_checkpoint(set_spec, from_date, until_date)
+        token = None
+        harvested = 0
+        response_date = None
+        if checkpoint and not restart and not checkpoint.get('completed_at') and checkpoint.get('resumption_token'):
+            token = checkpoint['resumption_token']
+            harvested = checkpoint['records_harvested'] or 0
+            response_date = checkpoint.get('response_date')
+            print(f"Resuming harvest after {harvested} records")
+
+        stats = {'pages': 0, 'records': 0, 'new_papers': 0, 'skipped': 0}
+        wanted = set(categories or [])
+
+        while True:
+            if token:
+                params = {'verb': 'ListRecords', 'resumptionToken': token}
+            else:
+                params = {'verb': 'ListRecords', 'metadataPrefix': 'arXivRaw', 'set': set_spec}
+                if from_date:
+                    params['from'] = from_date
+                if until_date:
+                    params['until'] = until_date
+
+            response = self.http_client.get(
+                f"{self.base_url}?{urllib.parse.urlencode(params)}", stream=True
+            )
+            response.raise_for_status()
+
+            page_info = {}
+            batch = []
+            try:
+                with response:
+                    response.raw.decode_content = True
+                    for paper in self._iter_page(response.raw, page_info):
+                        stats['records'] += 1
+                        if wanted and not wanted.intersection(paper['categories']):
+                            stats['skipped'] += 1
+                            continue
+                        if filter_quantum and not self.searcher._is_quantum_related(paper):
+                            stats['skipped'] += 1
+                            continue
+                        batch.append(paper)
+            except OAIHarvestError as e:
+                if e.code == 'noRecordsMatch':
+                    break
+                if e.code == 'badResumptionToken' and token:
+                    # Tokens expire; start this range over rather than fail
+                    print("Resumption token expired, restarting harvest")
+                    token = None
+                    harvested = 0
+                    continue
+                raise
+
+            stats['new_papers'] += self._store_batch(batch)
+            stats['pages'] += 1
+            harvested += len(batch)
+            response_date = response_date or page_info.get('response_date')
+            token = page_info.get('resumption_token')
+
+            # Checkpoint only after the page is stored; a failed insert
+            # raises above and leaves the previous token in place
+            self.database.save_harvest_checkpoint(
+                set_spec, from_date, until_date, token, harvested, response_date,
+                completed=token is None
+            )
+
+            total = page_info.get('complete_list_size')
+            print(f"  Page {stats['pages']}: {len(batch)} records stored"
+                  f" ({harvested}{f'/{total}' if total else ''} harvested)")
+
+            if token is None:
+                break
+
+        if stats['pages'] == 0:
+            # Nothing matched; still record the run so the next sync starts here
+            self.database.save_harvest_checkpoint(
+                set_spec, from_date, until_date, None, harvested,
+                datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'), completed=True
+            )
+
+        return stats
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of per-page OCR results
+
+Entries are keyed by the content hash of the PDF, the page number and the
+OCR settings (DPI, model, prompt version), so re-running OCR on the same
+paper never repeats a vision-model call. The cache is bounded by total
+text size and evicts least recently used entries.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from sqlite_cache import SQLiteLRUCache
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the sha256 of a file without reading it into memory at once
+
+    Args:
+        path: Path to file
+        chunk_size: Bytes to read per chunk
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OCRCache(SQLiteLRUCache):
+    """On-disk LRU cache of OCR output keyed by PDF hash and page"""
+
+    TABLE_NAME = "ocr_pages"
+    INDEX_NAME = "ocr_cache.db"
+
+    def __init__(self, cache_dir: str = ".ocr_cache", max_size_mb: int = 512):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding the cache index
+            max_size_mb: Maximum total size of cached text in megabytes
+        """
+        super().__init__(cache_dir, max_size_mb)
+
+    def _create_table(self):
+        """Create the page table"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_pages (
+                cache_key TEXT PRIMARY KEY,
+                pdf_sha256 TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                dpi INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_access TIMESTAMP NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ocr_last_access ON ocr_pages(last_access)
+        """)
+
+    @staticmethod
+    def make_key(pdf_sha256: str, page: int, dpi: int, model: str, prompt_version: str) -> str:
+        """Build the cache key for one page under one set of OCR settings"""
+        raw = f"{pdf_sha256}|{page}|{dpi}|{model}|{prompt_version}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, pdf_sha256: str, page: int, dpi: int, model: str, prompt_version: str) -> Optional[str]:
+        """
+        Look up cached OCR text for a page
+
+        Returns:
+            Cached text, or None on a miss
+        """
+        key = self.make_key(pdf_sha256, page, dpi, model, prompt_version)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT text FROM ocr_pages WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                "UPDATE ocr_pages SET last_access = ? WHERE cache_key = ?",
+                (datetime.now().isoformat(), key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, pdf_sha256: str, page: int, dpi: int, model: str, prompt_version: str, text: str):
+        """Store OCR text for a page and evict old entries if over the size cap"""
+        key = self.make_key(pdf_sha256, page, dpi, model, prompt_version)
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO ocr_pages (
+                    cache_key, pdf_sha256, page, dpi, model, prompt_version,
+                    text, size, last_access
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                key, pdf_sha256, page, dpi, model, prompt_version,
+                text, len(text.encode("utf-8")), datetime.now().isoformat()
+            ))
+            self._evict()
+            self.conn.commit()
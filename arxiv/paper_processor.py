@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Staged paper processing driven by the database job queue
+
+Workers claim jobs with a lease, run each paper through the stages
+download -> OCR -> summarize -> export and record every completed stage,
+so a paper that failed (or whose worker crashed) resumes at the stage
+that failed instead of starting over. Several workers can process the
+same database at once.
+"""
+
+import os
+import socket
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from database import LeaseLostError, PaperDatabase
+from markdown_exporter import MarkdownExporter
+from pdf_ocr import PDFOCRProcessor
+from relevance_classifier import RelevanceClassifier
+from summarizer import PaperSummarizer
+
+NOT_RELEVANT_SUMMARY = "Not relevant to quantum computing"
+
+
+def default_worker_id() -> str:
+    """Identify this worker process as host:pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class PaperProcessor:
+    """Claims processing jobs and runs papers through OCR, summary and export"""
+
+    def __init__(self,
+                 database: PaperDatabase,
+                 ocr_processor: PDFOCRProcessor,
+                 summarizer: PaperSummarizer,
+                 exporter: MarkdownExporter,
+                 worker_id: Optional[str] = None,
+                 lease_seconds: float = 1800,
+                 max_attempts: int = 3,
+                 retry_delay: float = 300,
+                 log: Callable[[str], None] = print,
+                 classifier: Optional[RelevanceClassifier] = None):
+        """
+        Initialize processor
+
+        Args:
+            database: PaperDatabase holding the job queue
+            ocr_processor: PDF text extractor
+            summarizer: LLM summarizer
+            exporter: Markdown exporter
+            worker_id: Name recorded on leased jobs (default: host:pid)
+            lease_seconds: How long a claimed job is reserved for this worker
+            max_attempts: Attempts before a job is marked failed
+            retry_delay: Seconds before a failed job's first retry (doubled
+                on each further attempt)
+            log: Function receiving progress messages
+            classifier: Local relevance classifier; papers it is confident
+                about are triaged without an LLM call
+        """
+        self.database = database
+        self.ocr_processor = ocr_processor
+        self.summarizer = summarizer
+        self.exporter = exporter
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.log = log
+        self.classifier = classifier
+
+    def _done(self, paper: Dict, stage: str) -> bool:
+        """Check whether a claimed paper already completed a stage"""
+        completed = paper.get('job_stage')
+        if completed is None:
+            return False
+        return PaperDatabase.JOB_STAGES.index(completed) >= PaperDatabase.JOB_STAGES.index(stage)
+
+    def _check_lease(self, paper: Dict):
+        """Extend the lease on a paper before writing its results, or raise if it was lost"""
+        if not self.database.renew_leases([paper['id']], self.worker_id, self.lease_seconds):
+            raise LeaseLostError(paper['id'], self.worker_id)
+
+    def _advance(self, paper: Dict, stage: str):
+        self.database.advance_job(paper['id'], self.worker_id, stage, self.lease_seconds)
+        paper['job_stage'] = stage
+
+    @staticmethod
+    def _failed_pages(page_texts: Dict[str, str]) -> List[int]:
+        """Get the numbers of pages whose extraction came back empty"""
+        return sorted(int(page.split('_')[1]) for page, text in page_texts.items() if not text.strip())
+
+    def process_paper(self, paper: Dict, max_pages: int = 20) -> str:
+        """
+        Run one claimed paper through the remaining stages
+
+        Args:
+            paper: Paper dictionary from claim_jobs
+            max_pages: Maximum pages to OCR
+
+        Returns:
+            'processed', or 'skipped' if the paper is not quantum-relevant
+        """
+        relevance_score = paper.get('relevance_score', 0.0)
+
+        # A paper that reached any stage has already passed the relevance check
+        if paper.get('job_stage') is None:
+            if paper.get('relevance_checked_at'):
+                is_relevant = bool(paper['is_quantum_relevant'])
+                self.log(f"  Relevance score: {relevance_score:.2f} (stored)")
+            else:
+                self.log("  Checking relevance...")
+                relevance = self._classify([paper]).get(paper['arxiv_id'])
+                if relevance is None:
+                    relevance = self.summarizer.check_quantum_relevance(paper)
+                if 'error' in relevance:
+                    # Retry later rather than record a transient failure as "not relevant"
+                    raise RuntimeError(f"Relevance check failed: {relevance['error']}")
+                relevance_score = relevance['relevance_score']
+                is_relevant = relevance['is_relevant']
+                self.log(f"  Relevance score: {relevance_score:.2f}")
+                self.database.save_relevance_scores({paper['id']: relevance})
+
+            if not is_relevant:
+                # Mark as processed even if not relevant
+                self._check_lease(paper)
+                self.database.insert_summary(paper['id'], NOT_RELEVANT_SUMMARY, "N/A", None)
+                self.database.complete_job(paper['id'], self.worker_id)
+                return 'skipped'
+
+        # Download (only a persistent PDF store makes this a separate stage)
+        pdf_store = self.ocr_processor.pdf_store
+        if pdf_store is not None and not self._done(paper, 'downloaded'):
+            self.log("  Downloading PDF...")
+            pdf_store.get(paper['pdf_link'])
+            self._advance(paper, 'downloaded')
+
+        # OCR (pages that failed are stored empty and redone on the next attempt)
+        page_texts = self.database.get_page_texts(paper['id'])
+        failed = self._failed_pages(page_texts) if page_texts is not None else []
+        changed = False
+        if page_texts is None:
+            self.log(f"  Extracting text from PDF (max {max_pages} pages)...")
+            page_texts = self.ocr_processor.extract_text_from_url(paper['pdf_link'], max_pages=max_pages)
+            changed = True
+        elif failed and not self._done(paper, 'summarized'):
+            self.log(f"  Retrying OCR of {len(failed)} failed pages...")
+            retried = self.ocr_processor.extract_text_from_url(
+                paper['pdf_link'], max_pages=max_pages, pages=failed
+            )
+            recovered = {page: text for page, text in retried.items() if text.strip()}
+            page_texts.update(recovered)
+            changed = bool(recovered)
+        else:
+            self.log(f"  Using stored text ({len(page_texts)} pages)")
+
+        if changed and self.database.save_page_texts(paper['id'], page_texts) is None:
+            raise RuntimeError("Failed to store extracted text")
+        if not self._done(paper, 'ocr'):
+            failed = self._failed_pages(page_texts)
+            if failed and paper['job_attempts'] < self.max_attempts:
+                # The good pages are stored; only the failed ones are redone
+                raise RuntimeError(f"OCR failed for pages {', '.join(map(str, failed))}")
+            if failed:
+                self.log(f"  Continuing without pages {', '.join(map(str, failed))} (last attempt)")
+            self._advance(paper, 'ocr')
+
+        full_text = self.ocr_processor.get_full_text(page_texts)
+        self.log(f"  Extracted {len(full_text)} characters")
+
+        # Summarize
+        stored = self.database.get_paper_with_summary(paper['id']) if self._done(paper, 'summarized') else None
+        if stored and stored.get('methodology_summary'):
+            self.log("  Using stored summary")
+            methodology_summary = stored['methodology_summary']
+            key_contributions = stored['key_contributions']
+        else:
+            self.log("  Generating summary...")
+            summary = self.summarizer.summarize_paper(full_text, paper)
+            if summary['chunks']:
+                self.log(f"  Summarized {summary['chunks']} chunks")
+            methodology_summary = summary['methodology_summary']
+            key_contributions = summary['key_contributions']
+
+            self._check_lease(paper)
+            summary_id = self.database.insert_summary(
+                paper['id'],
+                methodology_summary,
+                key_contributions,
+                full_text[:10000],  # Preview only; the full text is in paper_texts
+                structured_summary=summary['structured']
+            )
+            if not summary_id:
+                raise RuntimeError("Failed to save summary")
+            self._advance(paper, 'summarized')
+
+        # Export to markdown
+        paper_with_summary = {k: v for k, v in paper.items() if not k.startswith('job_')}
+        paper_with_summary.update({
+            'methodology_summary': methodology_summary,
+            'key_contributions': key_contributions,
+            'relevance_score': relevance_score
+        })
+        filepath = self.exporter.export_paper(
+            paper_with_summary,
+            methodology_summary=methodology_summary,
+            key_contributions=key_contributions
+        )
+        self._advance(paper, 'exported')
+        self.database.complete_job(paper['id'], self.worker_id)
+
+        self.log(f"  Processed and exported to: {Path(filepath).name}")
+        return 'processed'
+
+    def _classify(self, papers: List[Dict]) -> Dict[str, Dict]:
+        """
+        Decide relevance locally for the papers the classifier is confident about
+
+        Returns:
+            Relevance results (with 'source': 'classifier') keyed by arXiv ID;
+            uncertain papers are left out
+        """
+        if self.classifier is None or not papers:
+            return {}
+
+        results = {}
+        for paper, (decision, probability) in zip(papers, self.classifier.decide(papers)):
+            if decision is None:
+                continue
+            results[paper['arxiv_id']] = {
+                'is_relevant': decision,
+                'relevance_score': probability,
+                'explanation': f"Local classifier (p={probability:.2f})",
+                'source': 'classifier'
+            }
+        return results
+
+    def triage(self, papers: List[Dict]) -> Dict[int, Dict]:
+        """
+        Score the relevance of several papers and store it
+
+        Papers the local classifier is confident about are decided without
+        the LLM; the rest are scored with batched requests.
+
+        Args:
+            papers: Paper dictionaries (with 'id' and 'arxiv_id'); the scored
+                ones are updated in place
+
+        Returns:
+            Relevance results keyed by paper ID
+        """
+        results = self._classify(papers)
+        uncertain = [p for p in papers if p['arxiv_id'] not in results]
+        if results:
+            self.log(f"  Classifier decided {len(results)}/{len(papers)} papers locally")
+        if uncertain:
+            results.update(self.summarizer.check_quantum_relevance_batch(uncertain))
+        scores = {}
+        for paper in papers:
+            result = results.get(paper['arxiv_id'])
+            if result is None:
+                continue
+            scores[paper['id']] = result
+            paper['relevance_score'] = result['relevance_score']
+            paper['is_quantum_relevant'] = 1 if result['is_relevant'] else 0
+            paper['relevance_checked_at'] = datetime.now().isoformat()
+        self.database.save_relevance_scores(scores)
+        return scores
+
+    def run_batch(self, batch_size: int = 5, max_pages: int = 20) -> Dict:
+        """
+        Claim up to batch_size jobs and process them
+
+        The leases on the papers still waiting in the batch are extended
+        before each paper, so a slow paper does not let them expire. A
+        paper whose lease was lost anyway (taken over by another worker)
+        is skipped.
+
+        Args:
+            batch_size: Maximum jobs to claim
+            max_pages: Maximum pages to OCR per paper
+
+        Returns:
+            Dictionary with 'claimed', 'processed', 'skipped', 'errors',
+            'failed' (jobs that used up their attempts) and 'lost' (leases
+            taken over by another worker) counts
+        """
+        papers = self.database.claim_jobs(
+            self.worker_id, batch_size, self.lease_seconds, max_attempts=self.max_attempts
+        )
+        counts = {'claimed': len(papers), 'processed': 0, 'skipped': 0, 'errors': 0, 'failed': 0, 'lost': 0}
+
+        # Score the relevance of the whole batch with as few requests as possible
+        unscored = [p for p in papers if p.get('job_stage') is None and not p.get('relevance_checked_at')]
+        if len(unscored) > 1:
+            self.log(f"Checking relevance of {len(unscored)} papers...")
+            try:
+                self.triage(unscored)
+            except Exception as e:
+                # Unscored papers are checked one by one in process_paper
+                self.log(f"  Batch relevance check failed: {e}")
+
+        for i, paper in enumerate(papers, 1):
+            resume = f", resuming after '{paper['job_stage']}'" if paper.get('job_stage') else ""
+            self.log(f"[{i}/{len(papers)}] {paper['title'][:60]}...")
+            self.log(f"  ArXiv ID: {paper['arxiv_id']} (attempt {paper['job_attempts']}{resume})")
+
+            held = self.database.renew_leases([p['id'] for p in papers[i - 1:]], self.worker_id, self.lease_seconds)
+            if paper['id'] not in held:
+                counts['lost'] += 1
+                self.log("  Lease taken over by another worker, skipping")
+                continue
+
+            try:
+                counts[self.process_paper(paper, max_pages=max_pages)] += 1
+            except LeaseLostError:
+                counts['lost'] += 1
+                self.log("  Lease taken over by another worker, discarding this attempt")
+            except Exception as e:
+                counts['errors'] += 1
+                try:
+                    state = self.database.fail_job(
+                        paper['id'], self.worker_id, str(e), self.max_attempts, self.retry_delay
+                    )
+                except LeaseLostError:
+                    counts['lost'] += 1
+                    self.log(f"  Error: {e} (lease already taken over by another worker)")
+                    continue
+                if state == 'failed':
+                    counts['failed'] += 1
+                    self.log(f"  Error: {e} (giving up after {paper['job_attempts']} attempts)")
+                else:
+                    self.log(f"  Error: {e} (will retry)")
+
+        return counts
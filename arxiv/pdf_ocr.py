@@ -1,25 +1,55 @@
 #!/usr/bin/env python3
 """
 PDF OCR using nanonets-ocr2-3b model via OpenAI-compatible endpoint
+
+Born-digital PDFs are read from their embedded text layer where it is
+good enough; only low-quality pages are rasterized and sent to the model.
 """
 
 import os
 import io
 import base64
 import tempfile
-from typing import List, Optional, Dict
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Optional, Dict, Iterator, Tuple
 from pathlib import Path
-import requests
 from PIL import Image
-from pdf2image import convert_from_path, convert_from_bytes
+from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path
+from PyPDF2 import PdfReader
 from openai import OpenAI
 
+from http_client import get_http_client
+from ocr_cache import OCRCache, hash_file
+from pdf_store import PDFStore
+
+# Bump OCR_PROMPT_VERSION whenever OCR_PROMPT changes so cached pages are redone
+OCR_PROMPT = "Extract the text from the above document as if you were reading it naturally. Return the tables in html format. Return the equations in LaTeX representation. If there is an image in the document and image caption is not present, add a small description of the image inside the <img></img> tag; otherwise, add the image caption inside <img></img>. Watermarks should be wrapped in brackets. Ex: <watermark>OFFICIAL COPY</watermark>. Page numbers should be wrapped in brackets. Ex: <page_number>14</page_number> or <page_number>9/22</page_number>. Prefer using ☐ and ☑ for check boxes."
+OCR_PROMPT_VERSION = "1"
+
+# Page provenance labels recorded in PDFOCRProcessor.last_page_sources
+SOURCE_TEXT_LAYER = "text_layer"
+SOURCE_OCR = "ocr"
+
 
 class PDFOCRProcessor:
     """PDF OCR using nanonets-ocr2-3b model"""
 
+    # Text-layer pages shorter than this are treated as scans or figures
+    TEXT_LAYER_MIN_CHARS = 200
+    # Roughly one full page of running text
+    TEXT_LAYER_FULL_PAGE_CHARS = 1500
+
     def __init__(
-        self, api_key: str, base_url: str, model_name: str = "nanonets/nanonets-ocr2-3b"
+        self,
+        api_key: str,
+        base_url: str,
+        model_name: str = "nanonets/nanonets-ocr2-3b",
+        max_concurrency: int = 1,
+        use_text_layer: bool = True,
+        text_layer_min_quality: float = 0.6,
+        cache: Optional[OCRCache] = None,
+        pdf_store: Optional[PDFStore] = None,
     ):
         """
         Initialize OCR processor
@@ -28,9 +58,21 @@ class PDFOCRProcessor:
             api_key: API key for the service
             base_url: Base URL for the OpenAI-compatible endpoint
             model_name: Model name to use for OCR
+            max_concurrency: Maximum number of OCR requests in flight at once
+            use_text_layer: Use the embedded PDF text layer for good pages
+            text_layer_min_quality: Minimum quality score (0-1) for a text-layer page
+            cache: Optional OCR result cache consulted before calling the model
+            pdf_store: Optional local PDF store used instead of temp downloads
         """
         self.client = OpenAI(api_key=api_key, base_url=base_url)
         self.model_name = model_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.use_text_layer = use_text_layer
+        self.text_layer_min_quality = text_layer_min_quality
+        self.cache = cache
+        self.pdf_store = pdf_store
+        # Where each page of the last extraction came from (page_N -> source)
+        self.last_page_sources: Dict[str, str] = {}
 
     def _image_to_base64(self, image: Image.Image) -> str:
         """Convert PIL Image to base64 string"""
@@ -48,10 +90,19 @@ class PDFOCRProcessor:
         Returns:
             Extracted text
         """
-        try:
-            # Convert image to base64
-            image_base64 = self._image_to_base64(image)
+        return self._extract_text_from_base64(self._image_to_base64(image))
+
+    def _extract_text_from_base64(self, image_base64: str) -> str:
+        """
+        Extract text from a base64-encoded PNG page using OCR model
 
+        Args:
+            image_base64: Base64-encoded PNG image
+
+        Returns:
+            Extracted text
+        """
+        try:
             # Call vision model
             response = self.client.chat.completions.create(
                 model=self.model_name,
@@ -62,7 +113,7 @@ class PDFOCRProcessor:
                         "content": [
                             {
                                 "type": "text",
-                                "text": "Extract the text from the above document as if you were reading it naturally. Return the tables in html format. Return the equations in LaTeX representation. If there is an image in the document and image caption is not present, add a small description of the image inside the <img></img> tag; otherwise, add the image caption inside <img></img>. Watermarks should be wrapped in brackets. Ex: <watermark>OFFICIAL COPY</watermark>. Page numbers should be wrapped in brackets. Ex: <page_number>14</page_number> or <page_number>9/22</page_number>. Prefer using ☐ and ☑ for check boxes.",
+                                "text": OCR_PROMPT,
                             },
                             {
                                 "type": "image_url",
@@ -95,16 +146,17 @@ class PDFOCRProcessor:
             Path to downloaded PDF
         """
         try:
-            response = requests.get(pdf_url, timeout=60)
-            response.raise_for_status()
+            with get_http_client().get(pdf_url, stream=True, timeout=60) as response:
+                response.raise_for_status()
 
-            if output_path is None:
-                # Create temp file
-                fd, output_path = tempfile.mkstemp(suffix=".pdf")
-                os.close(fd)
+                if output_path is None:
+                    # Create temp file
+                    fd, output_path = tempfile.mkstemp(suffix=".pdf")
+                    os.close(fd)
 
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+                with open(output_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
 
             return output_path
 
@@ -112,6 +164,62 @@ class PDFOCRProcessor:
             print(f"Error downloading PDF from {pdf_url}: {e}")
             raise
 
+    def get_page_count(self, pdf_path: str) -> int:
+        """
+        Get the number of pages in a PDF
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Number of pages (0 if the PDF can't be read)
+        """
+        try:
+            return int(pdfinfo_from_path(pdf_path)["Pages"])
+        except Exception as e:
+            print(f"Error reading PDF info: {e}")
+            return 0
+
+    def iter_page_images(
+        self,
+        pdf_path: str,
+        dpi: int = 200,
+        max_pages: Optional[int] = None,
+        pages: Optional[List[int]] = None,
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """
+        Rasterize a PDF one page at a time
+
+        Only the page being yielded is held in memory; the caller should
+        close the image once it is done with it.
+
+        Args:
+            pdf_path: Path to PDF file
+            dpi: Resolution for conversion
+            max_pages: Maximum number of pages to process
+            pages: Specific 1-based page numbers to rasterize (default: all)
+
+        Yields:
+            Tuples of (page number, PIL Image object)
+        """
+        if pages is None:
+            total_pages = self.get_page_count(pdf_path)
+            if max_pages:
+                total_pages = min(total_pages, max_pages)
+            pages = range(1, total_pages + 1)
+
+        for page_num in pages:
+            try:
+                images = convert_from_path(
+                    pdf_path, dpi=dpi, first_page=page_num, last_page=page_num
+                )
+            except Exception as e:
+                print(f"Error converting page {page_num} to image: {e}")
+                continue
+
+            if images:
+                yield page_num, images[0]
+
     def pdf_to_images(
         self, pdf_path: str, dpi: int = 200, max_pages: Optional[int] = None
     ) -> List[Image.Image]:
@@ -126,65 +234,258 @@ class PDFOCRProcessor:
         Returns:
             List of PIL Image objects
         """
+        return [
+            image
+            for _, image in self.iter_page_images(pdf_path, dpi=dpi, max_pages=max_pages)
+        ]
+
+    def extract_text_layer(
+        self, pdf_path: str, max_pages: Optional[int] = None
+    ) -> Dict[int, str]:
+        """
+        Read the embedded text layer of a PDF
+
+        Args:
+            pdf_path: Path to PDF file
+            max_pages: Maximum number of pages to read
+
+        Returns:
+            Dictionary of 1-based page number to text (empty if unreadable)
+        """
         try:
-            images = convert_from_path(
-                pdf_path, dpi=dpi, first_page=1, last_page=max_pages
-            )
-            return images
+            reader = PdfReader(pdf_path)
+            pages = reader.pages
+            total_pages = min(len(pages), max_pages) if max_pages else len(pages)
+
+            text_layer = {}
+            for page_num in range(1, total_pages + 1):
+                try:
+                    text_layer[page_num] = pages[page_num - 1].extract_text() or ""
+                except Exception as e:
+                    print(f"Error reading text layer of page {page_num}: {e}")
+                    text_layer[page_num] = ""
+            return text_layer
+
         except Exception as e:
-            print(f"Error converting PDF to images: {e}")
-            return []
+            print(f"Error reading PDF text layer: {e}")
+            return {}
+
+    @staticmethod
+    def _is_math_char(char: str) -> bool:
+        """Check if a character is a math symbol, Greek letter or math alphanumeric"""
+        code = ord(char)
+        return (
+            0x0370 <= code <= 0x03FF  # Greek
+            or 0x2200 <= code <= 0x22FF  # Mathematical operators
+            or 0x27C0 <= code <= 0x27EF  # Misc mathematical symbols-A
+            or 0x2980 <= code <= 0x2AFF  # Misc mathematical symbols-B, supplemental operators
+            or 0x1D400 <= code <= 0x1D7FF  # Mathematical alphanumeric symbols
+            or unicodedata.category(char) == "Sm"
+        )
+
+    def score_text_layer(self, text: str) -> float:
+        """
+        Score how usable a page's embedded text is
+
+        The score combines character density (near-empty pages are scans or
+        figures), the share of garbage glyphs (replacement characters,
+        unmapped ``(cid:N)`` glyphs, private-use and raw ligature code points)
+        and the share of math symbols, since equation-heavy pages come out of
+        the text layer without their LaTeX structure.
+
+        Args:
+            text: Text extracted from one page
+
+        Returns:
+            Quality score from 0.0 (route to OCR) to 1.0 (clean running text)
+        """
+        stripped = text.strip()
+        if len(stripped) < self.TEXT_LAYER_MIN_CHARS:
+            return 0.0
+
+        chars = [c for c in stripped if not c.isspace()]
+        if not chars:
+            return 0.0
+
+        garbage = stripped.count("(cid:") * 6
+        ligatures = 0
+        math = 0
+        letters = 0
+        for c in chars:
+            if c == "\ufffd" or unicodedata.category(c) in ("Co", "Cc", "Cs"):
+                garbage += 1
+            elif "\ufb00" <= c <= "\ufb06":
+                ligatures += 1
+            elif self._is_math_char(c):
+                math += 1
+            elif c.isalpha():
+                letters += 1
+
+        garbage_ratio = (garbage + 0.5 * ligatures) / len(chars)
+        math_ratio = math / len(chars)
+        letter_ratio = letters / len(chars)
+        density = min(1.0, len(stripped) / self.TEXT_LAYER_FULL_PAGE_CHARS)
+
+        score = min(1.0, letter_ratio / 0.7)
+        score *= max(0.0, 1.0 - 20 * garbage_ratio)
+        score *= max(0.0, 1.0 - 8 * math_ratio)
+        score *= 0.6 + 0.4 * density
+        return score
 
     def extract_text_from_pdf(
-        self, pdf_path: str, max_pages: Optional[int] = 20, dpi: int = 200
+        self,
+        pdf_path: str,
+        max_pages: Optional[int] = 20,
+        dpi: int = 200,
+        max_concurrency: Optional[int] = None,
+        use_text_layer: Optional[bool] = None,
+        pages: Optional[List[int]] = None,
     ) -> Dict[str, str]:
         """
-        Extract text from PDF using OCR
+        Extract text from PDF, using OCR for pages without a usable text layer
+
+        Pages whose embedded text scores at least ``text_layer_min_quality``
+        are taken as-is. The remaining pages are rasterized one at a time and
+        handed to the OCR endpoint as soon as they are encoded, so at most
+        ``max_concurrency`` encoded pages are held in memory while
+        rasterization overlaps with network OCR. Pages already in the OCR
+        cache are never rasterized. The source of each page is recorded in
+        ``last_page_sources``.
 
         Args:
             pdf_path: Path to PDF file
             max_pages: Maximum number of pages to process
             dpi: Resolution for image conversion
+            max_concurrency: Override for the number of OCR requests in flight
+            use_text_layer: Override for using the embedded text layer
+            pages: Only extract these page numbers (e.g. pages whose OCR failed)
 
         Returns:
             Dictionary with page numbers and extracted text
         """
-        print(f"Converting PDF to images (max {max_pages} pages)...")
-        images = self.pdf_to_images(pdf_path, dpi=dpi, max_pages=max_pages)
-
-        if not images:
-            return {}
-
-        extracted_text = {}
-        total_pages = len(images)
-
-        print(f"Processing {total_pages} pages with OCR...")
-        for i, image in enumerate(images, 1):
-            print(f"  Processing page {i}/{total_pages}...")
-            text = self._extract_text_from_image(image)
-            extracted_text[f"page_{i}"] = text
-
-        return extracted_text
+        if use_text_layer is None:
+            use_text_layer = self.use_text_layer
+
+        page_texts = {}
+        page_sources = {}
+        ocr_pages = None  # None means every page
+
+        if use_text_layer:
+            text_layer = self.extract_text_layer(pdf_path, max_pages=max_pages)
+            if text_layer:
+                ocr_pages = []
+                for page_num, text in text_layer.items():
+                    if self.score_text_layer(text) >= self.text_layer_min_quality:
+                        page_texts[page_num] = unicodedata.normalize("NFKC", text).strip()
+                        page_sources[page_num] = SOURCE_TEXT_LAYER
+                    else:
+                        ocr_pages.append(page_num)
+                print(f"Text layer usable for {len(page_texts)}/{len(text_layer)} pages")
+
+        if pages is not None:
+            wanted = set(pages)
+            page_texts = {n: t for n, t in page_texts.items() if n in wanted}
+            page_sources = {n: s for n, s in page_sources.items() if n in wanted}
+            ocr_pages = sorted(wanted) if ocr_pages is None else [n for n in ocr_pages if n in wanted]
+
+        pdf_sha256 = None
+        if self.cache is not None:
+            pdf_sha256 = hash_file(pdf_path)
+            if ocr_pages is None:
+                total_pages = self.get_page_count(pdf_path)
+                if max_pages:
+                    total_pages = min(total_pages, max_pages)
+                ocr_pages = list(range(1, total_pages + 1))
+
+            uncached_pages = []
+            for page_num in ocr_pages:
+                text = self.cache.get(pdf_sha256, page_num, dpi, self.model_name, OCR_PROMPT_VERSION)
+                if text is None:
+                    uncached_pages.append(page_num)
+                else:
+                    page_texts[page_num] = text
+                    page_sources[page_num] = SOURCE_OCR
+            if len(uncached_pages) < len(ocr_pages):
+                print(f"OCR cache hit for {len(ocr_pages) - len(uncached_pages)}/{len(ocr_pages)} pages")
+            ocr_pages = uncached_pages
+
+        workers = max(1, max_concurrency or self.max_concurrency)
+        in_flight = {}
+
+        def collect(futures):
+            for future in futures:
+                page_num = in_flight.pop(future)
+                text = future.result()
+                page_texts[page_num] = text
+                page_sources[page_num] = SOURCE_OCR
+                # Failed pages come back empty; leave them uncached so they are retried
+                if self.cache is not None and text:
+                    self.cache.put(pdf_sha256, page_num, dpi, self.model_name, OCR_PROMPT_VERSION, text)
+                print(f"  Finished page {page_num}")
+
+        if ocr_pages is None or ocr_pages:
+            print(f"Processing PDF pages with OCR (max {max_pages} pages, {workers} concurrent requests)...")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for page_num, image in self.iter_page_images(
+                    pdf_path, dpi=dpi, max_pages=max_pages, pages=ocr_pages
+                ):
+                    image_base64 = self._image_to_base64(image)
+                    image.close()
+                    del image
+
+                    in_flight[executor.submit(self._extract_text_from_base64, image_base64)] = page_num
+                    del image_base64
+
+                    # Don't rasterize further ahead than the in-flight limit
+                    if len(in_flight) >= workers:
+                        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                        collect(done)
+
+                collect(list(in_flight))
+
+        self.last_page_sources = {
+            f"page_{page_num}": page_sources[page_num] for page_num in sorted(page_sources)
+        }
+        return {f"page_{page_num}": page_texts[page_num] for page_num in sorted(page_texts)}
 
     def extract_text_from_url(
-        self, pdf_url: str, max_pages: Optional[int] = 20, cleanup: bool = True
+        self,
+        pdf_url: str,
+        max_pages: Optional[int] = 20,
+        cleanup: bool = True,
+        use_text_layer: Optional[bool] = None,
+        pages: Optional[List[int]] = None,
     ) -> Dict[str, str]:
         """
         Download PDF from URL and extract text
 
+        When a PDF store is configured the PDF is read from (and kept in)
+        the store, and ``cleanup`` is ignored.
+
         Args:
             pdf_url: URL to PDF file
             max_pages: Maximum number of pages to process
             cleanup: Delete downloaded PDF after processing
+            use_text_layer: Override for using the embedded text layer
+            pages: Only extract these page numbers
 
         Returns:
             Dictionary with page numbers and extracted text
         """
+        if self.pdf_store is not None:
+            print(f"Fetching PDF from store ({pdf_url})...")
+            pdf_path = self.pdf_store.get(pdf_url)
+            return self.extract_text_from_pdf(
+                pdf_path, max_pages=max_pages, use_text_layer=use_text_layer, pages=pages
+            )
+
         print(f"Downloading PDF from {pdf_url}...")
         pdf_path = self.download_pdf(pdf_url)
 
         try:
-            extracted_text = self.extract_text_from_pdf(pdf_path, max_pages=max_pages)
+            extracted_text = self.extract_text_from_pdf(
+                pdf_path, max_pages=max_pages, use_text_layer=use_text_layer, pages=pages
+            )
             return extracted_text
         finally:
             if cleanup and os.path.exists(pdf_path):
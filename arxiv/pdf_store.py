@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Local store of downloaded arXiv PDFs
+
+PDFs are kept in a sharded directory keyed by arXiv ID and version, so
+reprocessing a paper reads it from local disk instead of downloading it
+again. Downloads are streamed to disk in chunks and resumed with HTTP
+Range requests after an interruption; the resume carries the partial
+download's ETag or Last-Modified in If-Range, so a server copy that
+changed in between is fetched whole instead of appended to old bytes.
+Unversioned IDs (whose content can change) are revalidated with
+If-Modified-Since. The store is bounded by a disk quota and evicts least
+recently used PDFs, sparing any PDF used within the protection window
+(a worker may still be reading it).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from http_client import HTTPClient, get_http_client
+
+# Matches the ID part of https://arxiv.org/pdf/<id>[.pdf] for new and old style IDs
+_ARXIV_PDF_URL = re.compile(r"/pdf/(?P<id>[^?#]+?)(?:\.pdf)?(?:[?#].*)?$")
+_VERSIONED_ID = re.compile(r"v\d+$")
+_CONTENT_RANGE = re.compile(r"bytes (?P<start>\d+)-\d+/(?:\d+|\*)")
+
+
+def arxiv_id_from_url(pdf_url: str) -> Optional[str]:
+    """
+    Extract the arXiv ID (with version, if present) from a PDF URL
+
+    Args:
+        pdf_url: URL such as https://arxiv.org/pdf/2511.10646v1.pdf
+
+    Returns:
+        ArXiv ID, or None if the URL is not an arXiv PDF link
+    """
+    match = _ARXIV_PDF_URL.search(pdf_url)
+    return match.group("id") if match else None
+
+
+class PDFStore:
+    """Sharded on-disk PDF store with resumable downloads and a disk quota"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self,
+                 root_dir: str = "pdf_store",
+                 quota_mb: int = 5120,
+                 timeout: int = 60,
+                 http_client: Optional[HTTPClient] = None,
+                 protect_seconds: float = 1800):
+        """
+        Initialize store
+
+        Args:
+            root_dir: Directory holding the stored PDFs
+            quota_mb: Maximum total size of stored PDFs in megabytes
+            timeout: Network timeout in seconds for each request
+            http_client: HTTP client to use (default: shared rate-limited client)
+            protect_seconds: PDFs accessed within this many seconds are never
+                evicted (use the job lease, so papers being processed stay)
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.quota_bytes = quota_mb * 1024 * 1024
+        self.timeout = timeout
+        self.http_client = http_client or get_http_client()
+        self.protect_seconds = protect_seconds
+
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._evict_lock = threading.Lock()
+        # Total size of stored PDFs, kept up to date as files are written
+        # and evicted; None until the first scan
+        self._total_bytes: Optional[int] = None
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        """Get the lock serializing downloads of one paper"""
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def path_for(self, arxiv_id: str) -> Path:
+        """
+        Get the storage path for an arXiv ID
+
+        Args:
+            arxiv_id: ArXiv ID, optionally with version (e.g. 2511.10646v1)
+
+        Returns:
+            Path of the PDF inside the store (it may not exist yet)
+        """
+        digest = hashlib.sha1(arxiv_id.encode()).hexdigest()
+        safe_id = arxiv_id.replace("/", "_")
+        return self.root_dir / digest[:2] / digest[2:4] / f"{safe_id}.pdf"
+
+    @staticmethod
+    def _meta_path(pdf_path: Path) -> Path:
+        return pdf_path.with_suffix(".json")
+
+    def _read_meta(self, pdf_path: Path) -> Dict:
+        try:
+            with open(self._meta_path(pdf_path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, pdf_path: Path, meta: Dict):
+        with open(self._meta_path(pdf_path), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def _part_meta_path(pdf_path: Path) -> Path:
+        """Metadata of the partial download (validators for If-Range)"""
+        return pdf_path.with_suffix(".pdf.part.json")
+
+    def _touch(self, pdf_path: Path):
+        """Record an access for LRU eviction"""
+        try:
+            os.utime(self._meta_path(pdf_path))
+        except OSError:
+            pass
+
+    def get(self, pdf_url: str, arxiv_id: Optional[str] = None) -> str:
+        """
+        Get a local path for a PDF, downloading it only if needed
+
+        Args:
+            pdf_url: URL to PDF file
+            arxiv_id: ArXiv ID (default: parsed from the URL)
+
+        Returns:
+            Path to the stored PDF
+        """
+        arxiv_id = arxiv_id or arxiv_id_from_url(pdf_url)
+        if not arxiv_id:
+            # Not an arXiv link - key the file by URL instead
+            arxiv_id = "url_" + hashlib.sha1(pdf_url.encode()).hexdigest()
+
+        pdf_path = self.path_for(arxiv_id)
+
+        with self._lock_for(arxiv_id):
+            if pdf_path.exists():
+                if _VERSIONED_ID.search(arxiv_id):
+                    # A specific arXiv version never changes
+                    self._touch(pdf_path)
+                    return str(pdf_path)
+                self._revalidate(pdf_url, pdf_path)
+            else:
+                self._download(pdf_url, pdf_path)
+
+        self._enforce_quota(keep=pdf_path)
+        return str(pdf_path)
+
+    def _revalidate(self, pdf_url: str, pdf_path: Path):
+        """Re-download an unversioned PDF only if the server copy changed"""
+        meta = self._read_meta(pdf_path)
+        headers = {}
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = self.http_client.get(pdf_url, headers=headers, stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            # The stored copy is still usable when arXiv is unreachable
+            print(f"Could not revalidate {pdf_url}, using stored copy: {e}")
+            self._touch(pdf_path)
+            return
+
+        with response:
+            if response.status_code == 304:
+                self._touch(pdf_path)
+                return
+            if not response.ok:
+                print(f"Could not revalidate {pdf_url} (HTTP {response.status_code}), using stored copy")
+                self._touch(pdf_path)
+                return
+            self._write_response(response, pdf_path, pdf_url, append=False)
+
+    def _download(self, pdf_url: str, pdf_path: Path):
+        """Stream a PDF to disk, resuming a previous partial download"""
+        pdf_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = pdf_path.with_suffix(".pdf.part")
+        offset = part_path.stat().st_size if part_path.exists() else 0
+
+        headers = {}
+        if offset:
+            part_meta = {}
+            try:
+                with open(self._part_meta_path(pdf_path), "r", encoding="utf-8") as f:
+                    part_meta = json.load(f)
+            except (OSError, ValueError):
+                pass
+            validator = part_meta.get("etag") or part_meta.get("last_modified")
+            if validator:
+                # The server sends the whole file instead if its copy changed
+                headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+            else:
+                # Without a validator the old bytes cannot be trusted
+                part_path.unlink()
+                offset = 0
+
+        response = self.http_client.get(pdf_url, headers=headers, stream=True, timeout=self.timeout)
+
+        with response:
+            if response.status_code == 416:
+                # Partial file is unusable for this resource - start over
+                part_path.unlink()
+                return self._download(pdf_url, pdf_path)
+            response.raise_for_status()
+            if response.status_code == 206:
+                match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if not match or int(match.group("start")) != offset:
+                    # Not the continuation of our bytes - start over
+                    part_path.unlink()
+                    self._part_meta_path(pdf_path).unlink(missing_ok=True)
+                    return self._download(pdf_url, pdf_path)
+            # Servers that ignore Range (or If-Range found a newer copy)
+            # answer 200 with the whole file
+            self._write_response(response, pdf_path, pdf_url, append=response.status_code == 206)
+
+    def _write_response(self, response: requests.Response, pdf_path: Path, pdf_url: str, append: bool):
+        """Write a streamed response body to the store and record its metadata"""
+        part_path = pdf_path.with_suffix(".pdf.part")
+        part_meta_path = self._part_meta_path(pdf_path)
+        if not append:
+            # Remember which server copy these bytes belong to, for If-Range
+            with open(part_meta_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified")
+                }, f)
+
+        with open(part_path, "ab" if append else "wb") as f:
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+
+        with open(part_path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                part_path.unlink()
+                part_meta_path.unlink(missing_ok=True)
+                raise ValueError(f"Response from {pdf_url} is not a PDF")
+
+        new_size = part_path.stat().st_size
+        old_size = pdf_path.stat().st_size if pdf_path.exists() else 0
+        os.replace(part_path, pdf_path)
+        part_meta_path.unlink(missing_ok=True)
+        with self._evict_lock:
+            if self._total_bytes is not None:
+                self._total_bytes += new_size - old_size
+        self._write_meta(pdf_path, {
+            "url": pdf_url,
+            "last_modified": response.headers.get("Last-Modified"),
+            "etag": response.headers.get("ETag"),
+            "size": new_size,
+            "fetched_at": datetime.now().isoformat()
+        })
+
+    def _scan(self) -> List[Tuple[float, Path, int]]:
+        """List stored PDFs as (last access, path, size) and resync the total size"""
+        entries = []
+        for pdf_path in self.root_dir.glob("*/*/*.pdf"):
+            try:
+                size = pdf_path.stat().st_size
+                meta_path = self._meta_path(pdf_path)
+                last_access = (meta_path if meta_path.exists() else pdf_path).stat().st_mtime
+            except OSError:
+                continue
+            entries.append((last_access, pdf_path, size))
+        self._total_bytes = sum(size for _, _, size in entries)
+        return entries
+
+    def _enforce_quota(self, keep: Optional[Path] = None):
+        """
+        Evict least recently used PDFs until the store fits its quota
+
+        The store is only scanned when the tracked total exceeds the quota
+        (or on first use), so a download under quota costs no directory walk.
+        """
+        with self._evict_lock:
+            if self._total_bytes is not None and self._total_bytes <= self.quota_bytes:
+                return
+
+            entries = self._scan()
+            if self._total_bytes <= self.quota_bytes:
+                return
+
+            protected_since = time.time() - self.protect_seconds
+            for last_access, pdf_path, size in sorted(entries):
+                if self._total_bytes <= self.quota_bytes:
+                    break
+                if last_access >= protected_since:
+                    # Everything from here on was used recently and may be in use
+                    break
+                if keep is not None and pdf_path == keep:
+                    continue
+                try:
+                    pdf_path.unlink()
+                    self._meta_path(pdf_path).unlink(missing_ok=True)
+                except OSError:
+                    continue
+                self._total_bytes -= size
+
+            if self._total_bytes > self.quota_bytes:
+                print(f"PDF store over quota ({self._total_bytes // (1024 * 1024)} MB): "
+                      f"remaining PDFs were used in the last {self.protect_seconds:g}s")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Local relevance classifier in front of the LLM relevance check
+
+A logistic regression over hashed word n-grams of the title, abstract and
+categories, trained on the labels already in the database: LLM relevance
+scores and the "Not relevant" summaries written by the processor. Papers
+the model is confident about are accepted or rejected locally; only the
+uncertain band between the two thresholds is sent to the LLM.
+
+Everything is plain NumPy: features are hashed with crc32 (stable across
+runs) into a fixed-size vector and kept as a CSR-style sparse matrix.
+"""
+
+import json
+import re
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+
+def holdout_split(arxiv_id: str, holdout: float) -> bool:
+    """Deterministically assign a paper (any version) to the evaluation split"""
+    return zlib.crc32(_VERSION_SUFFIX.sub('', arxiv_id).encode("utf-8")) % 1000 < holdout * 1000
+
+
+class RelevanceClassifier:
+    """Hashed n-gram logistic regression for quantum relevance"""
+
+    def __init__(self,
+                 n_features: int = 2 ** 18,
+                 accept_threshold: float = 0.9,
+                 reject_threshold: float = 0.1):
+        """
+        Initialize classifier
+
+        Args:
+            n_features: Size of the hashed feature space
+            accept_threshold: Probability at or above which a paper is
+                accepted without asking the LLM
+            reject_threshold: Probability at or below which a paper is
+                rejected without asking the LLM
+        """
+        self.n_features = n_features
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        self.bias = 0.0
+        self.metadata: Dict = {}
+
+    @staticmethod
+    def _ngrams(prefix: str, text: str) -> List[str]:
+        words = _TOKEN.findall((text or '').lower())
+        return [f"{prefix}{w}" for w in words] + [f"{prefix}{a} {b}" for a, b in zip(words, words[1:])]
+
+    def featurize(self, paper: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hash a paper into sparse feature indices and L2-normalized values
+
+        Args:
+            paper: Paper dictionary with 'title', 'abstract' and 'categories'
+
+        Returns:
+            Tuple of (indices, values)
+        """
+        features = self._ngrams("t:", paper.get('title'))
+        features += self._ngrams("a:", paper.get('abstract'))
+        features += [f"c:{category}" for category in paper.get('categories') or []]
+        if not features:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        hashed = np.fromiter(
+            (zlib.crc32(feature.encode("utf-8")) % self.n_features for feature in features),
+            dtype=np.int64, count=len(features)
+        )
+        indices, counts = np.unique(hashed, return_counts=True)
+        values = np.log1p(counts).astype(np.float32)
+        values /= np.linalg.norm(values)
+        return indices, values
+
+    def _matrix(self, papers: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Build a CSR matrix (indptr, indices, data) for papers"""
+        rows = [self.featurize(paper) for paper in papers]
+        lengths = np.array([len(indices) for indices, _ in rows], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        indices = np.concatenate([r[0] for r in rows]) if rows else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([r[1] for r in rows]) if rows else np.zeros(0, dtype=np.float32)
+        return indptr, indices, data
+
+    def _decision(self, matrix: Tuple[np.ndarray, np.ndarray, np.ndarray], weights: np.ndarray) -> np.ndarray:
+        """Compute X @ weights for a CSR matrix"""
+        indptr, indices, data = matrix
+        row_of = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        return np.bincount(row_of, weights=data * weights[indices], minlength=len(indptr) - 1)
+
+    def fit(self,
+            papers: List[Dict],
+            labels: List[int],
+            epochs: int = 300,
+            learning_rate: float = 0.05,
+            l2: float = 1e-5) -> 'RelevanceClassifier':
+        """
+        Train on labeled papers with full-batch Adam
+
+        Classes are weighted so rare negatives (or positives) count as much
+        as the majority class.
+
+        Args:
+            papers: Paper dictionaries
+            labels: 1 for relevant, 0 for not relevant
+            epochs: Gradient steps over the whole training set
+            learning_rate: Adam step size
+            l2: L2 regularization strength
+
+        Returns:
+            self
+        """
+        y = np.asarray(labels, dtype=np.float64)
+        positives = y.sum()
+        if positives == 0 or positives == len(y):
+            raise ValueError("Training data needs both relevant and not relevant papers")
+
+        matrix = self._matrix(papers)
+        indptr, indices, data = matrix
+        row_of = np.repeat(np.arange(len(y)), np.diff(indptr))
+        sample_weight = np.where(y == 1, len(y) / (2 * positives), len(y) / (2 * (len(y) - positives)))
+        sample_weight /= sample_weight.sum()
+
+        w = np.zeros(self.n_features)
+        b = 0.0
+        m_w, v_w = np.zeros_like(w), np.zeros_like(w)
+        m_b = v_b = 0.0
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+        for step in range(1, epochs + 1):
+            z = np.bincount(row_of, weights=data * w[indices], minlength=len(y)) + b
+            p = 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+            residual = (p - y) * sample_weight
+            grad_w = np.bincount(indices, weights=data * residual[row_of], minlength=self.n_features) + l2 * w
+            grad_b = residual.sum()
+
+            m_w = beta1 * m_w + (1 - beta1) * grad_w
+            v_w = beta2 * v_w + (1 - beta2) * grad_w ** 2
+            m_b = beta1 * m_b + (1 - beta1) * grad_b
+            v_b = beta2 * v_b + (1 - beta2) * grad_b ** 2
+            correction1, correction2 = 1 - beta1 ** step, 1 - beta2 ** step
+            w -= learning_rate * (m_w / correction1) / (np.sqrt(v_w / correction2) + eps)
+            b -= learning_rate * (m_b / correction1) / (np.sqrt(v_b / correction2) + eps)
+
+        self.weights = w.astype(np.float32)
+        self.bias = float(b)
+        self.metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'train_papers': int(len(y)),
+            'train_relevant': int(positives),
+            'epochs': epochs
+        }
+        return self
+
+    def predict_proba(self, papers: List[Dict]) -> np.ndarray:
+        """
+        Probability that each paper is relevant
+
+        Args:
+            papers: Paper dictionaries
+
+        Returns:
+            Array of probabilities in paper order
+        """
+        if not papers:
+            return np.zeros(0)
+        z = self._decision(self._matrix(papers), self.weights) + self.bias
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+    def decide(self, papers: List[Dict]) -> List[Tuple[Optional[bool], float]]:
+        """
+        Accept, reject or defer each paper
+
+        Returns:
+            (decision, probability) per paper, where decision is True
+            (relevant), False (not relevant) or None (ask the LLM)
+        """
+        decisions = []
+        for probability in self.predict_proba(papers):
+            if probability >= self.accept_threshold:
+                decisions.append((True, float(probability)))
+            elif probability <= self.reject_threshold:
+                decisions.append((False, float(probability)))
+            else:
+                decisions.append((None, float(probability)))
+        return decisions
+
+    def evaluate(self, papers: List[Dict], labels: List[int]) -> Dict:
+        """
+        Measure accuracy overall and within the confident bands
+
+        Args:
+            papers: Labeled evaluation papers
+            labels: 1 for relevant, 0 for not relevant
+
+        Returns:
+            Dictionary of metrics: 'papers', 'accuracy', 'precision' and
+            'recall' at 0.5, 'auto_accepted', 'auto_rejected', 'deferred',
+            'coverage' (share decided locally), 'auto_accuracy' (accuracy
+            of the local decisions) and 'false_rejects' (relevant papers
+            rejected locally)
+        """
+        y = np.asarray(labels, dtype=np.int64)
+        probabilities = self.predict_proba(papers)
+        predicted = (probabilities >= 0.5).astype(np.int64)
+
+        accepted = probabilities >= self.accept_threshold
+        rejected = probabilities <= self.reject_threshold
+        decided = accepted | rejected
+        auto_correct = (accepted & (y == 1)).sum() + (rejected & (y == 0)).sum()
+
+        true_positive = int(((predicted == 1) & (y == 1)).sum())
+        return {
+            'papers': int(len(y)),
+            'accuracy': float((predicted == y).mean()) if len(y) else 0.0,
+            'precision': true_positive / max(1, int(predicted.sum())),
+            'recall': true_positive / max(1, int(y.sum())),
+            'auto_accepted': int(accepted.sum()),
+            'auto_rejected': int(rejected.sum()),
+            'deferred': int((~decided).sum()),
+            'coverage': float(decided.mean()) if len(y) else 0.0,
+            'auto_accuracy': float(auto_correct / decided.sum()) if decided.any() else 0.0,
+            'false_rejects': int((rejected & (y == 1)).sum())
+        }
+
+    def save(self, path: str):
+        """Save the model to an .npz file"""
+        nonzero = np.flatnonzero(self.weights)
+        np.savez_compressed(
+            path,
+            indices=nonzero,
+            weights=self.weights[nonzero],
+            bias=np.array([self.bias]),
+            n_features=np.array([self.n_features]),
+            metadata=np.array(json.dumps(self.metadata))
+        )
+
+    @classmethod
+    def load(cls,
+             path: str,
+             accept_threshold: float = 0.9,
+             reject_threshold: float = 0.1) -> 'RelevanceClassifier':
+        """
+        Load a model saved with save()
+
+        Args:
+            path: Path to the .npz file
+            accept_threshold: See __init__
+            reject_threshold: See __init__
+
+        Returns:
+            RelevanceClassifier
+        """
+        with np.load(path) as archive:
+            classifier = cls(int(archive['n_features'][0]), accept_threshold, reject_threshold)
+            classifier.weights[archive['indices']] = archive['weights']
+            classifier.bias = float(archive['bias'][0])
+            classifier.metadata = json.loads(str(archive['metadata']))
+        return classifier
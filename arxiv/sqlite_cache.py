@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Size-capped, least recently used cache index in SQLite
+
+Shared base of the OCR and LLM response caches. Subclasses name their
+table and index file and create the table; every entry row must have
+'cache_key', 'size' (bytes) and 'last_access' columns, the last indexed.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict
+
+
+class SQLiteLRUCache:
+    """On-disk cache index bounded by total entry size"""
+
+    TABLE_NAME = ""
+    INDEX_NAME = ""
+
+    def __init__(self, cache_dir: str, max_size_mb: int):
+        """
+        Open (and create) the cache index
+
+        Args:
+            cache_dir: Directory holding the cache index
+            max_size_mb: Maximum total size of cached entries in megabytes
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            str(self.cache_dir / self.INDEX_NAME), check_same_thread=False
+        )
+        self._create_table()
+        self.conn.commit()
+
+    def _create_table(self):
+        """Create the entry table and its last_access index"""
+        raise NotImplementedError
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap"""
+        total = self.conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE_NAME}"
+        ).fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        cursor = self.conn.execute(
+            f"SELECT cache_key, size FROM {self.TABLE_NAME} ORDER BY last_access ASC"
+        )
+        stale_keys = []
+        for key, size in cursor:
+            if total <= self.max_size_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+
+        self.conn.executemany(f"DELETE FROM {self.TABLE_NAME} WHERE cache_key = ?", stale_keys)
+
+    def get_statistics(self) -> Dict:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            entries, size = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.TABLE_NAME}"
+            ).fetchone()
+        return {
+            'entries': entries,
+            'size_bytes': size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def close(self):
+        """Close cache index"""
+        if self.conn:
+            self.conn.close()
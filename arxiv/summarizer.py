@@ -2,11 +2,122 @@
 """
 Paper summarization using openai/gpt-oss-20b model
 Focuses on extracting methodology from quantum computing papers
+
+summarize_paper asks for the methodology sections, key contributions and
+reproducibility fields in one JSON response, instead of sending the paper
+text twice for the methodology and contributions calls. Malformed JSON is
+repaired locally (or with one short repair call); the split calls are only
+used when no valid structured response can be obtained.
+
+Papers longer than one prompt are summarized map-reduce style: the text is
+split along page and section boundaries into token-budgeted chunks, each
+chunk is condensed into notes concurrently (map), and the ordered notes are
+summarized into the usual sections (reduce). Chunk notes are cached by
+content hash.
 """
 
+import hashlib
+import json
 import os
-from typing import Dict, Optional
-from openai import OpenAI
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from openai import OpenAI, BadRequestError
+
+from llm_cache import LLMCache, cached_completion
+
+# Methodology sections of the structured summary, in display order
+METHODOLOGY_SECTIONS = [
+    ('research_objective', 'Research Objective'),
+    ('methodology_overview', 'Methodology Overview'),
+    ('key_techniques', 'Key Techniques'),
+    ('implementation_details', 'Implementation Details'),
+    ('evaluation_approach', 'Evaluation Approach'),
+    ('key_results', 'Key Results'),
+    ('limitations', 'Limitations'),
+]
+
+PAGE_BREAK = "\n\n--- Page Break ---\n\n"
+
+# Rough size of a token in characters, used for chunk budgets
+CHARS_PER_TOKEN = 4
+
+# Bump when the map prompt changes so cached chunk notes are not reused
+CHUNK_PROMPT_VERSION = "1"
+
+# Markdown headings or numbered section titles ("3 Methods", "4.2 Setup")
+_SECTION_HEADING = re.compile(r'\n(?=#{1,6} |\d+(?:\.\d+)*\.? +[A-Z][^\n]{0,80}\n)')
+
+# The score line a usable single-paper relevance answer must contain
+_RELEVANCE_SCORE = re.compile(r'^SCORE:\s*\d*\.?\d+', re.MULTILINE)
+
+
+def split_into_chunks(paper_text: str, max_chars: int) -> List[Dict]:
+    """
+    Split paper text into chunks along page and section boundaries
+
+    Pages are packed into chunks of at most max_chars; a page that is too
+    long on its own is split at section headings, then at paragraphs, and
+    only as a last resort mid-paragraph.
+
+    Args:
+        paper_text: Full text with pages joined by the OCR page break marker
+        max_chars: Maximum characters per chunk
+
+    Returns:
+        List of dictionaries with 'text', 'first_page' and 'last_page'
+    """
+    units: List[Tuple[int, str]] = []
+    for page_number, page in enumerate(paper_text.split(PAGE_BREAK), 1):
+        pieces = [page]
+        if len(page) > max_chars:
+            pieces = [piece for section in _SECTION_HEADING.split(page)
+                      for piece in (section.split('\n\n') if len(section) > max_chars else [section])]
+        for piece in pieces:
+            while len(piece) > max_chars:
+                units.append((page_number, piece[:max_chars]))
+                piece = piece[max_chars:]
+            if piece.strip():
+                units.append((page_number, piece))
+
+    chunks: List[Dict] = []
+    for page_number, piece in units:
+        separator = PAGE_BREAK if chunks and page_number != chunks[-1]['last_page'] else '\n\n'
+        if chunks and len(chunks[-1]['text']) + len(separator) + len(piece) <= max_chars:
+            chunks[-1]['text'] += separator + piece
+            chunks[-1]['last_page'] = page_number
+        else:
+            chunks.append({'text': piece, 'first_page': page_number, 'last_page': page_number})
+    return chunks
+
+
+STRUCTURED_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "methodology": {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key, _ in METHODOLOGY_SECTIONS},
+            "required": [key for key, _ in METHODOLOGY_SECTIONS]
+        },
+        "key_contributions": {
+            "type": "array",
+            "items": {"type": "string"}
+        },
+        "reproducibility": {
+            "type": "object",
+            "properties": {
+                "code_available": {"type": ["boolean", "null"]},
+                "data_available": {"type": ["boolean", "null"]},
+                "parameters_specified": {"type": ["boolean", "null"]},
+                "ambiguities": {"type": "array", "items": {"type": "string"}},
+                "assessment": {"type": "string"}
+            },
+            "required": ["code_available", "data_available", "parameters_specified",
+                         "ambiguities", "assessment"]
+        }
+    },
+    "required": ["methodology", "key_contributions", "reproducibility"]
+}
 
 
 class PaperSummarizer:
@@ -15,7 +126,14 @@ class PaperSummarizer:
     def __init__(self,
                  api_key: str,
                  base_url: str,
-                 model_name: str = "openai/gpt-oss-20b"):
+                 model_name: str = "openai/gpt-oss-20b",
+                 structured: bool = True,
+                 chunk_tokens: int = 3000,
+                 map_concurrency: int = 4,
+                 chunk_cache=None,
+                 llm_cache: Optional[LLMCache] = None,
+                 relevance_batch_size: int = 20,
+                 relevance_batch_tokens: int = 6000):
         """
         Initialize summarizer
 
@@ -23,12 +141,50 @@ class PaperSummarizer:
             api_key: API key for the service
             base_url: Base URL for the OpenAI-compatible endpoint
             model_name: Model name to use for summarization
+            structured: Summarize with one structured JSON call (see summarize_paper)
+            chunk_tokens: Token budget per chunk when a paper is too long
+                for one prompt
+            map_concurrency: Chunks summarized in parallel
+            chunk_cache: Store for chunk notes with get_chunk_summary(key) and
+                save_chunk_summary(key, model, summary), e.g. PaperDatabase
+            llm_cache: Response cache for identical requests (None disables it)
+            relevance_batch_size: Maximum papers per batched relevance request
+            relevance_batch_tokens: Token budget of a batched relevance request
         """
         self.client = OpenAI(
             api_key=api_key,
             base_url=base_url
         )
         self.model_name = model_name
+        self.structured = structured
+        self.chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+        self.map_concurrency = max(1, map_concurrency)
+        self.chunk_cache = chunk_cache
+        self.llm_cache = llm_cache
+        # Longest text sent in one prompt; longer papers are map-reduced
+        self.single_call_chars = 15000
+        self.relevance_batch_size = relevance_batch_size
+        self.relevance_batch_tokens = relevance_batch_tokens
+        # Abstracts are cut to this length when packed into a relevance batch
+        self.relevance_abstract_chars = 2000
+        # Output budget of a relevance batch; generous because reasoning models
+        # spend tokens before answering and a cut-off array loses papers
+        self.relevance_base_tokens = 512
+        self.relevance_tokens_per_paper = 128
+        # Notes are reduced until they fit well inside one prompt
+        self.reduce_chars = 10000
+        # Cleared when the endpoint rejects response_format=json_schema
+        self.json_schema_supported = True
+
+    @staticmethod
+    def _rejects_response_format(error: BadRequestError) -> bool:
+        """Check whether a 400 error is about response_format / json_schema"""
+        message = str(error).lower()
+        return any(term in message for term in ('response_format', 'json_schema', 'structured output'))
+
+    def _complete(self, validate: Optional[Callable[[str], bool]] = None, **request) -> str:
+        """Send a chat completion request through the response cache (see cached_completion)"""
+        return cached_completion(self.client, self.llm_cache, validate=validate, **request)
 
     def _create_methodology_prompt(self, paper_text: str, paper_metadata: Dict) -> str:
         """
@@ -50,7 +206,7 @@ Your task is to analyze the following research paper and extract a detailed summ
 {paper_metadata.get('abstract', 'N/A')}
 
 **Full Paper Text:**
-{paper_text[:15000]}  # Limit text to avoid token limits
+{paper_text[:self.single_call_chars]}
 
 ---
 
@@ -111,7 +267,7 @@ Please be specific and technical. Extract concrete details like parameter values
         try:
             prompt = self._create_methodology_prompt(paper_text, paper_metadata)
 
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -127,7 +283,7 @@ Please be specific and technical. Extract concrete details like parameter values
                 temperature=temperature
             )
 
-            return response.choices[0].message.content.strip()
+            return content.strip()
 
         except Exception as e:
             print(f"Error generating summary: {e}")
@@ -155,11 +311,11 @@ Please be specific and technical. Extract concrete details like parameter values
 {paper_metadata.get('abstract', 'N/A')}
 
 **Paper Text:**
-{paper_text[:10000]}
+{paper_text[:self.single_call_chars]}
 
 Provide a concise list of key contributions:"""
 
-            response = self.client.chat.completions.create(
+            content = self._complete(
                 model=self.model_name,
                 messages=[
                     {
@@ -171,12 +327,458 @@ Provide a concise list of key contributions:"""
                 temperature=0.2
             )
 
-            return response.choices[0].message.content.strip()
+            return content.strip()
 
         except Exception as e:
             print(f"Error extracting contributions: {e}")
             return "Error: Unable to extract contributions"
 
+    def _create_structured_prompt(self, paper_text: str, paper_metadata: Dict) -> str:
+        """Create the prompt for a single structured JSON summary"""
+        return f"""Analyze the following quantum computing research paper.
+
+**Paper Title:** {paper_metadata.get('title', 'N/A')}
+
+**Abstract:**
+{paper_metadata.get('abstract', 'N/A')}
+
+**Full Paper Text:**
+{paper_text[:self.single_call_chars]}
+
+---
+
+Respond with a single JSON object (no other text) with these fields:
+
+- "methodology": an object with string fields
+  - "research_objective": What problem is the paper trying to solve?
+  - "methodology_overview": What approach does the paper take? (theoretical analysis, experimental setup, algorithmic approach, simulation)
+  - "key_techniques": Mathematical frameworks, quantum circuits or algorithms, classical pre/postprocessing, optimization methods
+  - "implementation_details": Hardware/software platforms, gate decompositions, parameter settings, computational resources
+  - "evaluation_approach": Benchmarks, baselines, metrics and experimental setup used to validate the results
+  - "key_results": The main quantitative findings
+  - "limitations": Limitations the authors acknowledge
+- "key_contributions": an array of 3-5 strings, one per key contribution
+- "reproducibility": an object with
+  - "code_available", "data_available", "parameters_specified": true, false or null if not stated
+  - "ambiguities": an array of strings describing unclear or missing details
+  - "assessment": a short assessment of how reproducible the work is
+
+Be specific and technical. Include concrete details like parameter values, equations and algorithm steps.
+"""
+
+    @staticmethod
+    def _parse_json(content: str, expect: type = dict):
+        """
+        Parse a JSON object (or array) from a model response, repairing common defects
+
+        Handles code fences, text around the value, smart quotes and
+        trailing commas.
+
+        Args:
+            content: Model response text
+            expect: dict for an object, list for an array
+
+        Returns:
+            Parsed value, or None if it cannot be repaired locally
+        """
+        opening, closing = ('[', ']') if expect is list else ('{', '}')
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', content.strip())
+        start, end = text.find(opening), text.rfind(closing)
+        if start == -1 or end <= start:
+            return None
+        text = text[start:end + 1]
+
+        candidates = [text]
+        repaired = text.translate(str.maketrans({'\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'"}))
+        repaired = re.sub(r',\s*([}\]])', r'\1', repaired)
+        candidates.append(repaired)
+
+        for candidate in candidates:
+            try:
+                data = json.loads(candidate)
+            except ValueError:
+                continue
+            if isinstance(data, expect):
+                return data
+        return None
+
+    @staticmethod
+    def _salvage_json_objects(content: str) -> List[Dict]:
+        """
+        Recover the complete objects of a JSON array cut off mid-way
+
+        A response that hit max_tokens ends inside an object; every object
+        before that point is still usable.
+
+        Args:
+            content: Model response text
+
+        Returns:
+            Complete objects in order (empty if none can be recovered)
+        """
+        start = content.find('[')
+        if start == -1:
+            return []
+        text = content[start + 1:].translate(
+            str.maketrans({'\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'"})
+        )
+        decoder = json.JSONDecoder()
+        objects = []
+        position = 0
+        while True:
+            while position < len(text) and text[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(text) or text[position] != '{':
+                break
+            try:
+                value, position = decoder.raw_decode(text, position)
+            except ValueError:
+                break
+            if isinstance(value, dict):
+                objects.append(value)
+        return objects
+
+    @staticmethod
+    def _validate_structured(data: Optional[Dict]) -> Optional[Dict]:
+        """
+        Check a parsed structured summary and normalize its field types
+
+        Returns:
+            Normalized summary, or None if required content is missing
+        """
+        if not isinstance(data, dict):
+            return None
+
+        def as_text(value) -> str:
+            if isinstance(value, list):
+                return ''.join(f"\n   - {item}" for item in value if item)
+            return str(value).strip() if value is not None else ''
+
+        def as_list(value) -> List[str]:
+            if isinstance(value, str):
+                value = [line.strip(' -*\t') for line in value.splitlines()]
+            if not isinstance(value, list):
+                return []
+            return [str(item).strip() for item in value if str(item).strip()]
+
+        def as_flag(value) -> Optional[bool]:
+            if isinstance(value, bool) or value is None:
+                return value
+            if str(value).strip().lower() in ('true', 'yes'):
+                return True
+            if str(value).strip().lower() in ('false', 'no'):
+                return False
+            return None
+
+        methodology = data.get('methodology')
+        if not isinstance(methodology, dict):
+            return None
+        methodology = {key: as_text(methodology.get(key)) for key, _ in METHODOLOGY_SECTIONS}
+        contributions = as_list(data.get('key_contributions'))
+        if not methodology['research_objective'] or not methodology['methodology_overview'] or not contributions:
+            return None
+
+        reproducibility = data.get('reproducibility')
+        if not isinstance(reproducibility, dict):
+            reproducibility = {}
+
+        return {
+            'methodology': methodology,
+            'key_contributions': contributions,
+            'reproducibility': {
+                'code_available': as_flag(reproducibility.get('code_available')),
+                'data_available': as_flag(reproducibility.get('data_available')),
+                'parameters_specified': as_flag(reproducibility.get('parameters_specified')),
+                'ambiguities': as_list(reproducibility.get('ambiguities')),
+                'assessment': as_text(reproducibility.get('assessment'))
+            }
+        }
+
+    def _repair_json(self, content: str) -> Optional[Dict]:
+        """Ask the model to turn a malformed response into valid JSON"""
+        try:
+            content = self._complete(
+                lambda reply: self._parse_json(reply) is not None,
+                model=self.model_name,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": "The following should be a JSON object with the fields "
+                                   "\"methodology\", \"key_contributions\" and \"reproducibility\", "
+                                   "but it is not valid JSON. Return only the corrected JSON object, "
+                                   f"keeping all of its content.\n\n{content}"
+                    }
+                ],
+                max_tokens=3072,
+                temperature=0.0
+            )
+            return self._parse_json(content)
+        except Exception as e:
+            print(f"Error repairing structured summary: {e}")
+            return None
+
+    def summarize_structured(self,
+                             paper_text: str,
+                             paper_metadata: Dict,
+                             max_tokens: int = 3072,
+                             temperature: float = 0.2) -> Optional[Dict]:
+        """
+        Extract methodology, contributions and reproducibility in one call
+
+        Args:
+            paper_text: Full text extracted from PDF
+            paper_metadata: Paper metadata dictionary
+            max_tokens: Maximum tokens for response
+            temperature: Sampling temperature
+
+        Returns:
+            Dictionary with 'methodology' (section -> text),
+            'key_contributions' (list) and 'reproducibility' fields,
+            or None if no valid structured response was obtained
+        """
+        request = {
+            'model': self.model_name,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "You are an expert research analyst specializing in quantum computing and quantum physics. You extract detailed, technical methodology summaries from research papers and answer in JSON."
+                },
+                {
+                    "role": "user",
+                    "content": self._create_structured_prompt(paper_text, paper_metadata)
+                }
+            ],
+            'max_tokens': max_tokens,
+            'temperature': temperature
+        }
+
+        def valid(content: str) -> bool:
+            return self._validate_structured(self._parse_json(content)) is not None
+
+        try:
+            if self.json_schema_supported:
+                try:
+                    content = self._complete(
+                        valid,
+                        response_format={
+                            "type": "json_schema",
+                            "json_schema": {"name": "paper_summary", "schema": STRUCTURED_SUMMARY_SCHEMA}
+                        },
+                        **request
+                    )
+                except BadRequestError as e:
+                    # Retry once without structured output; only stop asking for it
+                    # when the endpoint rejected response_format itself (other 400s,
+                    # e.g. context length, say nothing about json_schema support)
+                    if self._rejects_response_format(e):
+                        print(f"Structured output not supported ({e}), requesting plain JSON")
+                        self.json_schema_supported = False
+                    else:
+                        print(f"Structured request rejected ({e}), retrying without response_format")
+                    content = self._complete(valid, **request)
+            else:
+                content = self._complete(valid, **request)
+        except Exception as e:
+            print(f"Error generating structured summary: {e}")
+            return None
+
+        data = self._parse_json(content)
+        if data is None and content.strip():
+            data = self._repair_json(content)
+        structured = self._validate_structured(data)
+        if structured is None:
+            print("Structured summary was invalid or incomplete")
+        return structured
+
+    @staticmethod
+    def format_methodology(structured: Dict) -> str:
+        """Render a structured summary as the 8-section methodology text"""
+        parts = []
+        for i, (key, heading) in enumerate(METHODOLOGY_SECTIONS, 1):
+            text = structured['methodology'].get(key) or 'Not stated'
+            # List sections start on their own lines
+            separator = '' if text.startswith('\n') else ' '
+            parts.append(f"{i}. **{heading}**:{separator}{text}")
+
+        def flag(value: Optional[bool]) -> str:
+            return {True: 'Yes', False: 'No'}.get(value, 'Not stated')
+
+        reproducibility = structured['reproducibility']
+        lines = [
+            f"{len(METHODOLOGY_SECTIONS) + 1}. **Reproducibility**: {reproducibility['assessment'] or 'Not assessed'}",
+            f"   - Code available: {flag(reproducibility['code_available'])}",
+            f"   - Data available: {flag(reproducibility['data_available'])}",
+            f"   - Parameters clearly specified: {flag(reproducibility['parameters_specified'])}",
+        ]
+        for ambiguity in reproducibility['ambiguities']:
+            lines.append(f"   - Ambiguity: {ambiguity}")
+        parts.append('\n'.join(lines))
+
+        return '\n\n'.join(parts)
+
+    @staticmethod
+    def format_contributions(structured: Dict) -> str:
+        """Render the key contributions of a structured summary as bullets"""
+        return '\n'.join(f"- {contribution}" for contribution in structured['key_contributions'])
+
+    def _chunk_key(self, chunk_text: str) -> str:
+        """Key of a chunk's notes in the chunk cache"""
+        return hashlib.sha256(
+            f"{self.model_name}|{CHUNK_PROMPT_VERSION}|{chunk_text}".encode("utf-8")
+        ).hexdigest()
+
+    def _summarize_chunk(self, chunk_text: str, label: str, paper_metadata: Dict) -> Optional[str]:
+        """
+        Condense one chunk into notes (map step)
+
+        Runs on the map worker threads, so it does not touch the chunk
+        cache (a database cache would open a connection per thread);
+        condense_text reads and fills the cache on the calling thread.
+
+        Args:
+            chunk_text: Text of the chunk
+            label: Where the chunk is in the paper (e.g. 'pages 3-5 of 12')
+            paper_metadata: Paper metadata dictionary
+
+        Returns:
+            Notes text, or None if the call failed
+        """
+        prompt = f"""The following is one part ({label}) of a quantum computing research paper.
+
+**Paper Title:** {paper_metadata.get('title', 'N/A')}
+
+**Text:**
+{chunk_text}
+
+---
+
+Write concise technical notes on what this part says about: the research objective,
+the methodology and key techniques, implementation details (platforms, parameters,
+resources), the evaluation (benchmarks, baselines, metrics), the key results (with
+numbers), limitations, contributions, and reproducibility (code, data, unclear details).
+Keep concrete values, equations and algorithm steps. Skip topics this part does not cover."""
+
+        try:
+            content = self._complete(
+                model=self.model_name,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                max_tokens=700,
+                temperature=0.2
+            )
+            notes = content.strip()
+        except Exception as e:
+            print(f"Error summarizing {label}: {e}")
+            return None
+
+        return notes or None
+
+    def condense_text(self, paper_text: str, paper_metadata: Dict, max_levels: int = 3) -> Tuple[str, int]:
+        """
+        Condense a long paper into ordered notes that fit one prompt
+
+        Chunks are summarized concurrently; if the combined notes are still
+        too long they are chunked and condensed again.
+
+        Args:
+            paper_text: Full text extracted from PDF
+            paper_metadata: Paper metadata dictionary
+            max_levels: Maximum rounds of condensing
+
+        Returns:
+            Tuple of (notes text, number of chunks in the first round);
+            the notes are empty if every chunk failed
+        """
+        text = paper_text
+        first_round_chunks = 0
+        for level in range(max_levels):
+            chunks = split_into_chunks(text, self.chunk_chars)
+            if level == 0:
+                first_round_chunks = len(chunks)
+            # After the first round the "pages" are the parts of the previous round
+            unit = 'pages' if level == 0 else 'notes on parts'
+            total = chunks[-1]['last_page'] if chunks else 0
+            labels = [f"{unit} {chunk['first_page']}-{chunk['last_page']} of {total}" for chunk in chunks]
+
+            keys = [self._chunk_key(chunk['text']) for chunk in chunks]
+            notes = [None] * len(chunks)
+            if self.chunk_cache is not None:
+                notes = [self.chunk_cache.get_chunk_summary(key) for key in keys]
+            missing = [i for i, note in enumerate(notes) if note is None]
+
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(self.map_concurrency, len(missing))) as executor:
+                    fresh = list(executor.map(
+                        lambda i: self._summarize_chunk(chunks[i]['text'], labels[i], paper_metadata),
+                        missing
+                    ))
+                for i, note in zip(missing, fresh):
+                    notes[i] = note
+                    if note and self.chunk_cache is not None:
+                        self.chunk_cache.save_chunk_summary(keys[i], self.model_name, note)
+
+            failed = sum(1 for note in notes if note is None)
+            if failed:
+                print(f"Warning: {failed}/{len(chunks)} chunks could not be summarized")
+            parts = [f"Part {i} ({label}):\n{note}"
+                     for i, (label, note) in enumerate(zip(labels, notes), 1) if note]
+            # Keep each part on its own "page" so a further round splits between parts
+            text = PAGE_BREAK.join(parts)
+            if not parts or len(text) <= self.reduce_chars:
+                break
+
+        return text[:self.reduce_chars], first_round_chunks
+
+    def summarize_paper(self, paper_text: str, paper_metadata: Dict) -> Dict:
+        """
+        Summarize a paper, preferring one structured call over split calls
+
+        Papers longer than one prompt are first condensed chunk by chunk
+        (see condense_text), so the summary covers the whole text instead
+        of its first pages.
+
+        Args:
+            paper_text: Full text extracted from PDF
+            paper_metadata: Paper metadata dictionary
+
+        Returns:
+            Dictionary with 'methodology_summary' and 'key_contributions'
+            text, 'structured' (the structured summary, or None when the
+            split calls were used) and 'chunks' (0 if the paper fit in one
+            prompt)
+        """
+        source_text = paper_text
+        chunks = 0
+        if len(paper_text) > self.single_call_chars:
+            notes, chunks = self.condense_text(paper_text, paper_metadata)
+            if notes:
+                source_text = ("(Condensed notes covering every part of the paper, in order)\n\n"
+                               + notes.replace(PAGE_BREAK, "\n\n"))
+            else:
+                print("Falling back to the beginning of the paper text")
+
+        if self.structured:
+            structured = self.summarize_structured(source_text, paper_metadata)
+            if structured is not None:
+                return {
+                    'methodology_summary': self.format_methodology(structured),
+                    'key_contributions': self.format_contributions(structured),
+                    'structured': structured,
+                    'chunks': chunks
+                }
+            print("Falling back to separate methodology and contributions calls")
+
+        return {
+            'methodology_summary': self.summarize_methodology(source_text, paper_metadata),
+            'key_contributions': self.extract_key_contributions(source_text, paper_metadata),
+            'structured': None,
+            'chunks': chunks
+        }
+
     def check_quantum_relevance(self,
                                paper_metadata: Dict,
                                threshold: float = 0.6) -> Dict[str, any]:
@@ -211,7 +813,8 @@ EXPLANATION: [Your explanation]
 TOPICS: [Comma-separated list of quantum topics, or "None"]
 """
 
-            response = self.client.chat.completions.create(
+            content = self._complete(
+                lambda reply: _RELEVANCE_SCORE.search(reply) is not None,
                 model=self.model_name,
                 messages=[
                     {
@@ -223,7 +826,7 @@ TOPICS: [Comma-separated list of quantum topics, or "None"]
                 temperature=0.1
             )
 
-            content = response.choices[0].message.content.strip()
+            content = content.strip()
 
             # Parse response
             lines = content.split('\n')
@@ -231,6 +834,9 @@ TOPICS: [Comma-separated list of quantum topics, or "None"]
             explanation = ""
             topics = []
 
+            if _RELEVANCE_SCORE.search(content) is None:
+                raise ValueError("Response has no SCORE line")
+
             for line in lines:
                 if line.startswith('SCORE:'):
                     try:
@@ -259,5 +865,128 @@ TOPICS: [Comma-separated list of quantum topics, or "None"]
                 'relevance_score': 0.0,
                 'explanation': f"Error: {str(e)}",
                 'topics': [],
-                'raw_response': ''
+                'raw_response': '',
+                'error': str(e)
+            }
+
+    def _score_relevance_batch(self, papers: List[Dict], threshold: float) -> Dict[str, Dict]:
+        """
+        Score one packed batch of papers in a single request
+
+        Returns:
+            Results keyed by arXiv ID for the papers the model answered
+        """
+        entries = []
+        for paper in papers:
+            abstract = (paper.get('abstract') or 'N/A')[:self.relevance_abstract_chars]
+            entries.append(
+                f"[{paper['arxiv_id']}] {paper.get('title', 'N/A')}\n"
+                f"Categories: {', '.join(paper.get('categories') or [])}\n"
+                f"Abstract: {abstract}"
+            )
+        papers_text = "\n\n".join(entries)
+        prompt = f"""Rate the relevance of each research paper below to quantum computing or quantum physics.
+
+{papers_text}
+
+Respond with only a JSON array containing one object per paper, in the same order:
+[{{"arxiv_id": "<ID in brackets>", "score": <0.0-1.0, where 1.0 is highly relevant>, "topics": [<up to 3 short quantum topics, empty if none>]}}]
+"""
+        try:
+            content = self._complete(
+                lambda reply: self._parse_json(reply, expect=list) is not None,
+                model=self.model_name,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                max_tokens=self.relevance_base_tokens + self.relevance_tokens_per_paper * len(papers),
+                temperature=0.1
+            )
+        except Exception as e:
+            print(f"Error checking relevance of {len(papers)} papers: {e}")
+            return {}
+
+        items = self._parse_json(content, expect=list)
+        if items is None:
+            # Truncated (e.g. max_tokens reached): keep the papers that were answered
+            items = self._salvage_json_objects(content)
+            if items:
+                print(f"Relevance response was cut off, recovered {len(items)}/{len(papers)} scores")
+
+        wanted = {paper['arxiv_id'] for paper in papers}
+        results = {}
+        for item in items:
+            if not isinstance(item, dict) or item.get('arxiv_id') not in wanted:
+                continue
+            try:
+                score = min(1.0, max(0.0, float(item.get('score'))))
+            except (TypeError, ValueError):
+                continue
+            topics = item.get('topics') or []
+            if isinstance(topics, str):
+                topics = [topic.strip() for topic in topics.split(',') if topic.strip()]
+            topics = topics[:3]
+            results[item['arxiv_id']] = {
+                'is_relevant': score >= threshold,
+                'relevance_score': score,
+                'explanation': '',
+                'topics': [str(topic) for topic in topics],
+                'raw_response': content
             }
+        return results
+
+    def pack_relevance_batches(self, papers: List[Dict]) -> List[List[Dict]]:
+        """Group papers into batches that fit the relevance token budget"""
+        budget_chars = self.relevance_batch_tokens * CHARS_PER_TOKEN
+        batches: List[List[Dict]] = []
+        size = 0
+        for paper in papers:
+            paper_chars = (len(paper.get('title') or '')
+                           + min(len(paper.get('abstract') or ''), self.relevance_abstract_chars) + 100)
+            if (not batches or len(batches[-1]) >= self.relevance_batch_size
+                    or size + paper_chars > budget_chars):
+                batches.append([])
+                size = 0
+            batches[-1].append(paper)
+            size += paper_chars
+        return batches
+
+    def check_quantum_relevance_batch(self,
+                                      papers: List[Dict],
+                                      threshold: float = 0.6) -> Dict[str, Dict]:
+        """
+        Check the relevance of many papers with few requests
+
+        Papers are packed into batches under the relevance token budget and
+        the batches are scored concurrently, each with one request for a
+        JSON array of {arxiv_id, score, topics}. Papers the model leaves
+        out (or scores unparseably) are retried with check_quantum_relevance.
+
+        Args:
+            papers: Paper metadata dictionaries (with 'arxiv_id')
+            threshold: Relevance threshold (0-1)
+
+        Returns:
+            Results in the check_quantum_relevance format, keyed by arXiv
+            ID; papers that could not be scored at all are left out
+        """
+        batches = self.pack_relevance_batches(papers)
+        results: Dict[str, Dict] = {}
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.map_concurrency, len(batches))) as executor:
+                for batch_results in executor.map(
+                    lambda batch: self._score_relevance_batch(batch, threshold), batches
+                ):
+                    results.update(batch_results)
+
+        missing = [paper for paper in papers if paper['arxiv_id'] not in results]
+        if missing:
+            print(f"Retrying relevance individually for {len(missing)}/{len(papers)} papers")
+        for paper in missing:
+            result = self.check_quantum_relevance(paper, threshold)
+            if 'error' not in result:
+                results[paper['arxiv_id']] = result
+        return results
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Job queue leases, fencing and stage resumption on a temporary database
+
+Run from the arxiv directory:
+    python -m unittest discover tests
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import LeaseLostError, PaperDatabase
+from paper_processor import PaperProcessor
+
+
+def make_paper(number: int) -> dict:
+    arxiv_id = f"2401.{number:05d}v1"
+    return {
+        'arxiv_id': arxiv_id,
+        'title': f"Quantum Paper {number}",
+        'abstract': "A study of superconducting qubits.",
+        'authors': ["Alice Example"],
+        'categories': ["quant-ph"],
+        'published': f"2024-01-{number:02d}T00:00:00Z",
+        'updated': f"2024-01-{number:02d}T00:00:00Z",
+        'pdf_link': f"https://arxiv.org/pdf/{arxiv_id}",
+        'abstract_link': f"https://arxiv.org/abs/{arxiv_id}"
+    }
+
+
+class JobQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.database = PaperDatabase(str(Path(self.tmp_dir) / "test.db"))
+        self.database.insert_papers_bulk([make_paper(1), make_paper(2)])
+        self.paper_id = self.database.get_paper_by_arxiv_id("2401.00001v1")['id']
+        self.newest_id = self.database.get_paper_by_arxiv_id("2401.00002v1")['id']
+
+    def tearDown(self):
+        self.database.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def job(self, paper_id: int) -> dict:
+        row = self.database.conn.execute("SELECT * FROM jobs WHERE paper_id = ?", (paper_id,)).fetchone()
+        return dict(row)
+
+
+class LeaseTest(JobQueueTestCase):
+
+    def test_claims_do_not_overlap(self):
+        first = self.database.claim_jobs("worker-a", limit=1)
+        second = self.database.claim_jobs("worker-b", limit=5)
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0]['id'], second[0]['id'])
+        self.assertEqual(self.database.claim_jobs("worker-c", limit=5), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        self.database.claim_jobs("worker-a", limit=5, lease_seconds=-1)
+
+        reclaimed = self.database.claim_jobs("worker-b", limit=5)
+
+        self.assertEqual(len(reclaimed), 2)
+        self.assertTrue(all(paper['job_attempts'] == 2 for paper in reclaimed))
+        job = self.job(self.paper_id)
+        self.assertEqual(job['worker_id'], "worker-b")
+        self.assertEqual(job['state'], "leased")
+
+    def test_original_worker_is_fenced_after_takeover(self):
+        self.database.claim_jobs("worker-a", limit=5, lease_seconds=-1)
+        self.database.claim_jobs("worker-b", limit=5)
+
+        with self.assertRaises(LeaseLostError):
+            self.database.advance_job(self.paper_id, "worker-a", "ocr")
+        with self.assertRaises(LeaseLostError):
+            self.database.complete_job(self.paper_id, "worker-a")
+        with self.assertRaises(LeaseLostError):
+            self.database.fail_job(self.paper_id, "worker-a", "boom")
+        self.assertEqual(self.database.renew_leases([self.paper_id], "worker-a"), [])
+
+        # The new holder is unaffected
+        job = self.job(self.paper_id)
+        self.assertEqual((job['state'], job['worker_id'], job['stage']), ("leased", "worker-b", None))
+        self.database.advance_job(self.paper_id, "worker-b", "ocr")
+        self.database.complete_job(self.paper_id, "worker-b")
+        self.assertEqual(self.job(self.paper_id)['state'], "done")
+
+    def test_renew_returns_only_held_leases(self):
+        claimed = self.database.claim_jobs("worker-a", limit=5)
+        other_id = next(paper['id'] for paper in claimed if paper['id'] != self.paper_id)
+        self.database.complete_job(other_id, "worker-a")
+
+        held = self.database.renew_leases([paper['id'] for paper in claimed], "worker-a", lease_seconds=60)
+
+        self.assertEqual(held, [self.paper_id])
+
+    def test_crashed_lease_fails_after_max_attempts(self):
+        for attempt in range(1, 4):
+            claimed = self.database.claim_jobs("worker-a", limit=5, lease_seconds=-1, max_attempts=3)
+            self.assertEqual([paper['job_attempts'] for paper in claimed], [attempt, attempt])
+
+        self.assertEqual(self.database.claim_jobs("worker-b", limit=5, max_attempts=3), [])
+        job = self.job(self.paper_id)
+        self.assertEqual(job['state'], "failed")
+        self.assertIsNone(job['worker_id'])
+        self.assertIn("Lease expired", job['last_error'])
+
+    def test_fail_job_backs_off_then_fails(self):
+        self.database.claim_jobs("worker-a", limit=5)
+        self.assertEqual(self.database.fail_job(self.paper_id, "worker-a", "boom", max_attempts=2), "pending")
+
+        # Still waiting out the retry delay
+        self.assertNotIn(self.paper_id, [p['id'] for p in self.database.claim_jobs("worker-a", limit=5)])
+
+        self.database.conn.execute("UPDATE jobs SET available_at = 0 WHERE paper_id = ?", (self.paper_id,))
+        self.database.conn.commit()
+        self.database.claim_jobs("worker-a", limit=5)
+        self.assertEqual(self.database.fail_job(self.paper_id, "worker-a", "boom", max_attempts=2), "failed")
+
+        self.assertEqual(self.database.retry_failed_jobs(), 1)
+        job = self.job(self.paper_id)
+        self.assertEqual((job['state'], job['attempts']), ("pending", 0))
+
+
+class FakeOCR:
+    pdf_store = None
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_text_from_url(self, pdf_url, max_pages=20, pages=None):
+        self.calls += 1
+        return {'page_1': "Quantum error correction methods.", 'page_2': "Results."}
+
+    def get_full_text(self, page_texts):
+        return "\n".join(page_texts[page] for page in sorted(page_texts))
+
+
+class FakeSummarizer:
+
+    def __init__(self):
+        self.summaries = 0
+
+    def check_quantum_relevance(self, paper):
+        return {'is_relevant': True, 'relevance_score': 0.9, 'explanation': "quantum"}
+
+    def summarize_paper(self, text, paper):
+        self.summaries += 1
+        return {
+            'methodology_summary': "Methods", 'key_contributions': "Contributions",
+            'structured': None, 'chunks': 0
+        }
+
+
+class FakeExporter:
+
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+
+    def export_paper(self, paper, methodology_summary=None, key_contributions=None):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise OSError("disk full")
+        return f"/tmp/{paper['arxiv_id']}.md"
+
+
+class PaperProcessorTest(JobQueueTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ocr = FakeOCR()
+        self.summarizer = FakeSummarizer()
+
+    def processor(self, worker_id, exporter, **kwargs):
+        return PaperProcessor(
+            self.database, self.ocr, self.summarizer, exporter,
+            worker_id=worker_id, log=lambda message: None, **kwargs
+        )
+
+    def test_retry_resumes_after_last_stage(self):
+        counts = self.processor("worker-a", FakeExporter(fail_times=1)).run_batch(batch_size=1)
+        self.assertEqual(counts['errors'], 1)
+        job = self.job(self.newest_id)  # jobs are claimed newest first
+        self.assertEqual((job['state'], job['stage']), ("pending", "summarized"))
+
+        self.database.conn.execute("UPDATE jobs SET available_at = 0")
+        self.database.conn.commit()
+        counts = self.processor("worker-a", FakeExporter()).run_batch(batch_size=1)
+
+        self.assertEqual(counts['processed'], 1)
+        self.assertEqual(self.ocr.calls, 1)
+        self.assertEqual(self.summarizer.summaries, 1)
+        job = self.job(self.newest_id)
+        self.assertEqual((job['state'], job['stage'], job['attempts']), ("done", "exported", 2))
+
+    def test_retry_delay_is_configurable(self):
+        with mock.patch("database.time.time", return_value=1000.0):
+            self.processor("worker-a", FakeExporter(fail_times=1), retry_delay=60).run_batch(batch_size=1)
+        self.assertEqual(self.job(self.newest_id)['available_at'], 1060.0)
+
+    def test_lost_lease_is_discarded(self):
+        worker_a = self.processor("worker-a", FakeExporter())
+        claim_jobs = self.database.claim_jobs
+
+        def claim_then_expire(*args, **kwargs):
+            papers = claim_jobs(*args, **kwargs)
+            self.database.conn.execute("UPDATE jobs SET lease_expires_at = 0")
+            self.database.conn.commit()
+            claim_jobs("worker-b", 5)
+            return papers
+
+        with mock.patch.object(self.database, "claim_jobs", claim_then_expire):
+            counts = worker_a.run_batch(batch_size=5)
+
+        self.assertEqual(counts['lost'], 2)
+        self.assertEqual(counts['processed'], 0)
+        self.assertEqual(self.summarizer.summaries, 0)
+        self.assertEqual(self.job(self.paper_id)['worker_id'], "worker-b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Migrating a database created by the original (unversioned) schema
+
+Run from the arxiv directory:
+    python -m unittest discover tests
+"""
+
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import PaperDatabase, SchemaVersionError
+from migrations import MIGRATIONS, Migrator
+
+PAPER_COUNT = 23
+
+
+class Interrupted(Exception):
+    """Stands in for the process being stopped mid-migration"""
+
+
+# The schema written by the first release, before schema_version existed
+BASELINE_SCHEMA = """
+    CREATE TABLE papers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        arxiv_id TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        abstract TEXT,
+        authors TEXT,
+        categories TEXT,
+        published DATE,
+        updated DATE,
+        pdf_link TEXT,
+        abstract_link TEXT,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed BOOLEAN DEFAULT 0,
+        is_quantum_relevant BOOLEAN DEFAULT 1,
+        relevance_score REAL DEFAULT 0.0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE summaries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        paper_id INTEGER NOT NULL,
+        methodology_summary TEXT,
+        key_contributions TEXT,
+        extracted_text TEXT,
+        summary_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (paper_id) REFERENCES papers (id) ON DELETE CASCADE
+    );
+    CREATE TABLE search_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        query TEXT NOT NULL,
+        category TEXT,
+        num_results INTEGER,
+        search_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_arxiv_id ON papers(arxiv_id);
+    CREATE INDEX idx_published ON papers(published);
+    CREATE INDEX idx_processed ON papers(processed);
+    CREATE INDEX idx_paper_id ON summaries(paper_id);
+"""
+
+
+def insert_baseline_paper(conn: sqlite3.Connection, number: int, processed: bool = False):
+    arxiv_id = f"2301.{number:05d}v1"
+    conn.execute("""
+        INSERT INTO papers (arxiv_id, title, abstract, authors, categories, published,
+                            updated, pdf_link, abstract_link, processed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        arxiv_id, f"Quantum Paper {number}", "Entanglement in trapped ions.",
+        json.dumps([f"Author {number}"]), json.dumps(["quant-ph", "physics.atom-ph"]),
+        f"2023-01-{number % 28 + 1:02d}T00:00:00Z", f"2023-01-{number % 28 + 1:02d}T00:00:00Z",
+        f"https://arxiv.org/pdf/{arxiv_id}", f"https://arxiv.org/abs/{arxiv_id}", int(processed)
+    ))
+
+
+class MigratorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = str(Path(self.tmp_dir) / "baseline.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(BASELINE_SCHEMA)
+        for number in range(1, PAPER_COUNT + 1):
+            insert_baseline_paper(conn, number, processed=number % 3 == 0)
+        conn.execute("""
+            INSERT INTO summaries (paper_id, methodology_summary, key_contributions)
+            SELECT id, 'Methods', 'Contributions' FROM papers WHERE processed = 1
+        """)
+        conn.commit()
+        conn.close()
+        self.databases = []
+
+    def tearDown(self):
+        for database in self.databases:
+            database.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def open(self) -> PaperDatabase:
+        database = PaperDatabase(self.db_path, auto_migrate=False)
+        self.databases.append(database)
+        return database
+
+    def count(self, database: PaperDatabase, sql: str) -> int:
+        return database.conn.execute(sql).fetchone()[0]
+
+    def assert_fully_migrated(self, database: PaperDatabase):
+        papers = self.count(database, "SELECT COUNT(*) FROM papers")
+        unprocessed = self.count(database, "SELECT COUNT(*) FROM papers WHERE processed = 0")
+
+        self.assertEqual(Migrator(database, log=lambda message: None).current_version(), MIGRATIONS[-1].version)
+        self.assertEqual(self.count(database, "SELECT COUNT(*) FROM papers_fts"), papers)
+        self.assertEqual(self.count(database, "SELECT COUNT(*) FROM paper_categories"), 2 * papers)
+        self.assertEqual(self.count(database, "SELECT COUNT(*) FROM paper_categories WHERE is_primary = 1"), papers)
+        self.assertEqual(self.count(database, "SELECT COUNT(*) FROM paper_authors"), papers)
+        self.assertEqual(self.count(database, "SELECT COUNT(*) FROM jobs"), unprocessed)
+        self.assertEqual(self.count(database, "SELECT COUNT(*) FROM jobs WHERE state = 'pending'"), unprocessed)
+        self.assertEqual(database.verify_statistics(repair=False), [])
+
+    def test_baseline_database_is_at_version_zero(self):
+        migrator = Migrator(self.open(), batch_size=5, log=lambda message: None)
+
+        self.assertEqual(migrator.current_version(), 0)
+        plan = migrator.migrate(dry_run=True)
+        self.assertEqual([step['version'] for step in plan], [m.version for m in MIGRATIONS])
+        fts_step = next(step for step in plan if step['version'] == 3)
+        self.assertEqual((fts_step['backfill_rows'], fts_step['batches']), (PAPER_COUNT, 5))
+
+    def test_open_refuses_pending_backfills(self):
+        with self.assertRaises(SchemaVersionError) as caught:
+            PaperDatabase(self.db_path)
+        self.assertIn("db migrate", str(caught.exception))
+        self.assertEqual(Migrator(self.open(), log=lambda message: None).current_version(), 0)
+
+        with mock.patch("builtins.print"):
+            database = PaperDatabase(self.db_path, migrate_backfills=True)
+        self.databases.append(database)
+        self.assert_fully_migrated(database)
+
+    def test_interrupted_backfill_resumes(self):
+        database = self.open()
+        backfill_links = database._backfill_links
+        calls = []
+
+        def interrupted(cursor, after_id, up_to_id):
+            calls.append(after_id)
+            if len(calls) == 3:
+                raise Interrupted()
+            backfill_links(cursor, after_id, up_to_id)
+
+        with mock.patch.object(database, "_backfill_links", interrupted):
+            with self.assertRaises(Interrupted):
+                Migrator(database, batch_size=5, log=lambda message: None).migrate()
+
+        migrator = Migrator(database, batch_size=5, log=lambda message: None)
+        self.assertEqual(migrator.current_version(), 3)
+        row = database.conn.execute("SELECT * FROM schema_version WHERE version = 4").fetchone()
+        self.assertEqual((row['backfill_position'], row['backfill_end']), (10, PAPER_COUNT))
+        self.assertIsNone(row['completed_at'])
+        self.assertEqual(self.count(database, "SELECT COUNT(DISTINCT paper_id) FROM paper_authors"), 10)
+
+        # The crawler keeps writing between runs; triggers cover the new paper
+        insert_baseline_paper(database.conn, PAPER_COUNT + 1)
+        database.conn.commit()
+
+        plan = migrator.plan()
+        self.assertEqual((plan[0]['version'], plan[0]['state']), (4, 'resuming'))
+        self.assertEqual(plan[0]['backfill_rows'], PAPER_COUNT - 10)
+
+        resumed = []
+
+        def spy(cursor, after_id, up_to_id):
+            resumed.append(after_id)
+            backfill_links(cursor, after_id, up_to_id)
+
+        with mock.patch.object(database, "_backfill_links", spy):
+            migrator.migrate()
+
+        self.assertEqual(resumed, [10, 15, 20])
+        self.assert_fully_migrated(database)
+
+    def test_concurrent_openers_apply_each_step_once(self):
+        start = threading.Barrier(2, timeout=30)
+        errors = []
+
+        def migrate():
+            try:
+                database = PaperDatabase(self.db_path, auto_migrate=False)
+                self.databases.append(database)
+                start.wait()
+                Migrator(database, batch_size=3, log=lambda message: None).migrate()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=migrate) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assert_fully_migrated(self.open())
+
+    def test_migrated_database_opens_read_only(self):
+        Migrator(self.open(), batch_size=5, log=lambda message: None).migrate()
+
+        database = PaperDatabase(self.db_path, read_only=True)
+        self.databases.append(database)
+        self.assertEqual(database.get_statistics()['total_papers'], PAPER_COUNT)
+        self.assertEqual(database.get_statistics()['processed_papers'], PAPER_COUNT // 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
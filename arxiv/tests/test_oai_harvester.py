@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+OAIHarvester against a local stub server serving recorded ListRecords pages
+
+Run from the arxiv directory:
+    python -m unittest discover tests
+"""
+
+import io
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.parse
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import PaperDatabase
+from http_client import HTTPClient
+from oai_harvester import OAIHarvester, OAI_NS
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "oai"
+RESUMPTION_TOKEN = "7012345|1001"
+
+
+class StubOAIHandler(BaseHTTPRequestHandler):
+    """Serves page 1 for a new ListRecords request and page 2 for its token"""
+
+    requests_seen = []
+    fail_token_requests = 0
+
+    def do_GET(self):
+        params = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(self.path).query))
+        type(self).requests_seen.append(params)
+
+        if params.get('resumptionToken') == RESUMPTION_TOKEN:
+            if type(self).fail_token_requests:
+                type(self).fail_token_requests -= 1
+                self.send_error(404)
+                return
+            body = (FIXTURES / "list_records_page2.xml").read_bytes()
+        elif params.get('metadataPrefix') == 'arXivRaw':
+            body = (FIXTURES / "list_records_page1.xml").read_bytes()
+        else:
+            self.send_error(400)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OAIHarvesterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOAIHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/oai"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubOAIHandler.requests_seen = []
+        StubOAIHandler.fail_token_requests = 0
+        self.tmp_dir = tempfile.mkdtemp()
+        self.database = PaperDatabase(str(Path(self.tmp_dir) / "test.db"))
+        self.harvester = OAIHarvester(
+            self.database, base_url=self.base_url, http_client=HTTPClient(max_retries=0)
+        )
+
+    def tearDown(self):
+        self.database.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_harvest_follows_resumption_token(self):
+        stats = self.harvester.harvest("physics:quant-ph", from_date="2024-01-01")
+
+        self.assertEqual(stats['pages'], 2)
+        self.assertEqual(stats['records'], 3)  # the deleted record is skipped
+        self.assertEqual(stats['new_papers'], 3)
+        self.assertEqual(StubOAIHandler.requests_seen[0]['set'], "physics:quant-ph")
+        self.assertEqual(StubOAIHandler.requests_seen[0]['from'], "2024-01-01")
+        self.assertEqual(StubOAIHandler.requests_seen[1], {
+            'verb': 'ListRecords', 'resumptionToken': RESUMPTION_TOKEN
+        })
+
+        paper = self.database.get_paper_by_arxiv_id("2401.00101v2")
+        self.assertEqual(paper['title'], "Variational Quantum Eigensolvers on Noisy Superconducting Qubits")
+        self.assertEqual(json.loads(paper['authors']), ["Alice Example", "Bob Example", "Carol Example"])
+        self.assertEqual(json.loads(paper['categories']), ["quant-ph", "cs.ET"])
+        self.assertEqual(paper['published'], "2024-01-01T10:00:00Z")
+        self.assertEqual(paper['updated'], "2024-01-02T12:30:00Z")
+
+        checkpoint = self.database.get_harvest_checkpoint("physics:quant-ph", "2024-01-01")
+        self.assertIsNotNone(checkpoint['completed_at'])
+        self.assertIsNone(checkpoint['resumption_token'])
+
+    def test_interrupted_harvest_resumes_from_checkpoint(self):
+        StubOAIHandler.fail_token_requests = 1
+        with self.assertRaises(Exception):
+            self.harvester.harvest("physics:quant-ph", from_date="2024-01-01")
+
+        checkpoint = self.database.get_harvest_checkpoint("physics:quant-ph", "2024-01-01")
+        self.assertEqual(checkpoint['resumption_token'], RESUMPTION_TOKEN)
+        self.assertEqual(checkpoint['records_harvested'], 2)
+
+        StubOAIHandler.requests_seen = []
+        stats = self.harvester.harvest("physics:quant-ph", from_date="2024-01-01")
+
+        self.assertEqual(len(StubOAIHandler.requests_seen), 1)
+        self.assertEqual(StubOAIHandler.requests_seen[0]['resumptionToken'], RESUMPTION_TOKEN)
+        self.assertEqual(stats['new_papers'], 1)
+        self.assertEqual(self.database.get_statistics()['total_papers'], 3)
+
+    def test_failed_store_keeps_previous_checkpoint(self):
+        insert_papers_bulk = self.database.insert_papers_bulk
+        calls = []
+
+        def failing_second_page(papers, **kwargs):
+            calls.append(len(papers))
+            if len(calls) == 2:
+                raise sqlite3.OperationalError("database is locked")
+            return insert_papers_bulk(papers, **kwargs)
+
+        with mock.patch.object(self.database, "insert_papers_bulk", failing_second_page):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.harvester.harvest("physics:quant-ph", from_date="2024-01-01")
+
+        checkpoint = self.database.get_harvest_checkpoint("physics:quant-ph", "2024-01-01")
+        self.assertIsNone(checkpoint['completed_at'])
+        self.assertEqual(checkpoint['resumption_token'], RESUMPTION_TOKEN)
+        self.assertEqual(checkpoint['records_harvested'], 2)
+
+        StubOAIHandler.requests_seen = []
+        stats = self.harvester.harvest("physics:quant-ph", from_date="2024-01-01")
+        self.assertEqual(StubOAIHandler.requests_seen[0]['resumptionToken'], RESUMPTION_TOKEN)
+        self.assertEqual(stats['new_papers'], 1)
+        self.assertEqual(self.database.get_statistics()['total_papers'], 3)
+
+    def test_revised_paper_refreshes_stored_version(self):
+        self.database.insert_papers_bulk([{
+            'arxiv_id': "2401.00101v1",
+            'title': "Variational Quantum Eigensolvers (draft)",
+            'abstract': "Draft abstract.",
+            'authors': ["Alice Example"],
+            'categories': ["quant-ph"],
+            'published': "2024-01-01T10:00:00Z",
+            'updated': "2024-01-01T10:00:00Z",
+            'pdf_link': "https://arxiv.org/pdf/2401.00101v1",
+            'abstract_link': "https://arxiv.org/abs/2401.00101v1"
+        }])
+
+        stats = self.harvester.harvest("physics:quant-ph", from_date="2024-01-01")
+
+        self.assertEqual(stats['new_papers'], 2)
+        self.assertIsNone(self.database.get_paper_by_arxiv_id("2401.00101v2"))
+        paper = self.database.get_paper_by_arxiv_id("2401.00101v1")
+        self.assertEqual(paper['title'], "Variational Quantum Eigensolvers on Noisy Superconducting Qubits")
+        self.assertEqual(paper['updated'], "2024-01-02T12:30:00Z")
+        self.assertEqual(self.database.get_statistics()['total_papers'], 3)
+        self.assertEqual(sum(self.database.get_job_counts().values()), 3)
+
+    def test_parsed_records_are_released(self):
+        page = (FIXTURES / "list_records_page1.xml").read_text()
+        head, rest = page.split("<ListRecords>")
+        records, tail = rest.split("<resumptionToken")
+        body = head + "<ListRecords>" + records * 200 + "<resumptionToken" + tail
+
+        seen = {}
+        iterparse = ET.iterparse
+
+        def tracking_iterparse(source, events=None):
+            for event, elem in iterparse(source, events=events):
+                if event == 'start' and elem.tag == OAI_NS + 'ListRecords':
+                    seen['list_records'] = elem
+                if event == 'end' and elem.tag == OAI_NS + 'record' and 'list_records' in seen:
+                    seen['max_children'] = max(seen.get('max_children', 0), len(seen['list_records']))
+                yield event, elem
+
+        page_info = {}
+        with mock.patch("oai_harvester.ET.iterparse", tracking_iterparse):
+            papers = list(self.harvester._iter_page(io.BytesIO(body.encode("utf-8")), page_info))
+
+        self.assertEqual(len(papers), 400)
+        self.assertEqual(page_info['resumption_token'], RESUMPTION_TOKEN)
+        # Only the records in the parser's read-ahead buffer are ever attached
+        self.assertLess(seen['max_children'], 50)
+        self.assertEqual(len(seen['list_records']), 1)  # the resumptionToken
+
+
+if __name__ == "__main__":
+    unittest.main()
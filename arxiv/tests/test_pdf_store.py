@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+PDFStore resume and revalidation against a local stub server
+
+Run from the arxiv directory:
+    python -m unittest discover tests
+"""
+
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from http_client import HTTPClient
+from pdf_store import PDFStore
+
+OLD_PDF = b"%PDF-1.4 old copy " + b"a" * 200
+NEW_PDF = b"%PDF-1.4 new copy " + b"b" * 300
+
+
+class StubPDFHandler(BaseHTTPRequestHandler):
+    """Serves one PDF with an ETag, honoring Range and If-Range"""
+
+    body = OLD_PDF
+    etag = '"old"'
+    status = None
+    truncate_at = None
+    requests_seen = []
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests_seen.append(dict(self.headers))
+        if cls.status:
+            self.send_error(cls.status)
+            return
+
+        body, status = cls.body, 200
+        headers = {"ETag": cls.etag}
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", cls.etag) == cls.etag:
+            start = int(range_header[len("bytes="):].rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            body, status = body[start:], 206
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if cls.truncate_at is not None:
+            # Drop the connection mid-body, like a network failure
+            cls.truncate_at, body = None, body[:cls.truncate_at]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PDFStoreTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPDFHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubPDFHandler.body, StubPDFHandler.etag, StubPDFHandler.status = OLD_PDF, '"old"', None
+        StubPDFHandler.truncate_at = None
+        StubPDFHandler.requests_seen = []
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = PDFStore(self.tmp_dir, http_client=HTTPClient(max_retries=0))
+        self.store.CHUNK_SIZE = 10  # so the bytes before a failure reach disk
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def interrupt_download(self, arxiv_id: str, received: int):
+        """Start a download that fails after received bytes"""
+        url = f"{self.base_url}/pdf/{arxiv_id}"
+        StubPDFHandler.truncate_at = received
+        with self.assertRaises(Exception):
+            self.store.get(url)
+        pdf_path = self.store.path_for(arxiv_id)
+        self.assertEqual(pdf_path.with_suffix(".pdf.part").stat().st_size, received)
+        StubPDFHandler.requests_seen = []
+        return url, pdf_path
+
+    def test_resume_appends_when_unchanged(self):
+        url, pdf_path = self.interrupt_download("2401.00001v1", 50)
+
+        self.store.get(url)
+
+        self.assertEqual(StubPDFHandler.requests_seen[0]["Range"], "bytes=50-")
+        self.assertEqual(StubPDFHandler.requests_seen[0]["If-Range"], '"old"')
+        self.assertEqual(pdf_path.read_bytes(), OLD_PDF)
+        self.assertFalse(pdf_path.with_suffix(".pdf.part.json").exists())
+
+    def test_resume_restarts_when_server_copy_changed(self):
+        url, pdf_path = self.interrupt_download("2401.00002v1", 50)
+        StubPDFHandler.body, StubPDFHandler.etag = NEW_PDF, '"new"'
+
+        self.store.get(url)
+
+        self.assertEqual(pdf_path.read_bytes(), NEW_PDF)
+
+    def test_revalidation_error_keeps_stored_copy(self):
+        url = f"{self.base_url}/pdf/2401.00003"
+        path = self.store.get(url)
+        StubPDFHandler.status = 503
+
+        self.assertEqual(self.store.get(url), path)
+        self.assertEqual(Path(path).read_bytes(), OLD_PDF)
+
+
+if __name__ == "__main__":
+    unittest.main()